@@ -1,13 +1,29 @@
-from flask import Flask, jsonify, send_from_directory, request
+from flask import Flask, Response, jsonify, send_from_directory, request, g, has_request_context
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
-from models import db, Scene, Actrice, Acteur, Tag, Favorite, History
+from models import (db, Scene, Actrice, Acteur, Tag, Favorite, History, ActriceTag, SelectionDuJour, ActivitePeriode,
+                    ViewEvent, DiskFile, DiskDirectory, scene_actrice, scene_tag)
+from sqlalchemy import event, text, bindparam
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import selectinload
 from datetime import datetime, date, timedelta
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import cached_property
 import random
 import re
+import unicodedata
 import os
+import json
+import sys
+import threading
+import time
+import atexit
+import uuid
 from urllib.parse import quote
 from werkzeug.utils import secure_filename
+from fingerprint import EMPREINTE_BLOC
 import subprocess
 import platform
 
@@ -16,8 +32,11 @@ app = Flask(__name__)
 CORS(app)  # Autorise les requêtes du frontend React
 
 # Config SQLite : le fichier sera créé dans backend/
+# (INTYMA_DB_URI permet de pointer vers une autre base, ex : benchmark.py)
 basedir = os.path.abspath(os.path.dirname(__file__))
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(basedir, 'intyma.db')
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get(
+    'INTYMA_DB_URI', 'sqlite:///' + os.path.join(basedir, 'intyma.db')
+)
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
 VIDEOS_PREFIX = '/Volumes/My Passport for Mac/Privé/M364TR0N/'
@@ -26,42 +45,705 @@ VIDEOS_PREFIX = '/Volumes/My Passport for Mac/Privé/M364TR0N/'
 db.init_app(app)
 
 
+# ==================== CACHE DES RÉPONSES ====================
+# Cache mémoire des réponses agrégées coûteuses. Chaque entrée déclare les tables
+# dont elle dépend ; un commit qui modifie l'une de ces tables l'invalide.
+
+_response_cache = {}  # clé -> (tables, expiration ou None, valeur)
+_response_cache_lock = threading.Lock()
+# Génération par table, incrémentée à chaque invalidation : une valeur construite pendant
+# qu'un commit invalidait l'une de ses tables n'est pas mise en cache (elle serait périmée)
+_table_generations = defaultdict(int)
+_cache_generation = [0]  # invalidation totale
+
+
+def _cache_generations(tables):
+    """Instantané des générations des tables (à appeler sous _response_cache_lock)"""
+    return (_cache_generation[0],) + tuple(_table_generations[table] for table in tables)
+
+
+def cache_get_or_build(key, tables, builder, ttl=None):
+    """
+    Retourne la valeur en cache pour `key`, ou la construit avec `builder()`
+    - tables : noms des tables dont dépend la valeur (invalidation sur écriture)
+    - ttl : durée de vie maximale en secondes (None = jusqu'à la prochaine écriture)
+    """
+    now = time.monotonic()
+    tables = frozenset(tables)
+    with _response_cache_lock:
+        entry = _response_cache.get(key)
+        if entry and (entry[1] is None or entry[1] > now):
+            return entry[2]
+        generations = _cache_generations(tables)
+
+    value = builder()
+    with _response_cache_lock:
+        if _cache_generations(tables) == generations:
+            _response_cache[key] = (tables, now + ttl if ttl else None, value)
+    return value
+
+
+def invalidate_cache(tables=None):
+    """Invalide les entrées dépendant de `tables` (toutes si None)"""
+    with _response_cache_lock:
+        if tables is None:
+            _cache_generation[0] += 1
+            _response_cache.clear()
+            return
+        for table in tables:
+            _table_generations[table] += 1
+        for key in [k for k, entry in _response_cache.items() if entry[0] & tables]:
+            del _response_cache[key]
+
+
+@event.listens_for(db.session, 'after_flush')
+def _track_written_tables(session, flush_context):
+    """Mémorise les tables modifiées par la transaction en cours"""
+    written = session.info.setdefault('written_tables', set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        table = getattr(obj, '__tablename__', None)
+        if table:
+            written.add(table)
+
+
+@event.listens_for(db.session, 'after_bulk_delete')
+@event.listens_for(db.session, 'after_bulk_update')
+def _track_bulk_written_tables(context):
+    """Même suivi pour les Query.delete() / Query.update()"""
+    context.session.info.setdefault('written_tables', set()).add(context.mapper.local_table.name)
+
+
+def mark_tables_written(*tables):
+    """Signale des écritures SQL brutes (text()) que le suivi ORM ne voit pas"""
+    db.session.info.setdefault('written_tables', set()).update(tables)
+
+
+@event.listens_for(db.session, 'after_commit')
+def _invalidate_cache_after_commit(session):
+    written = session.info.pop('written_tables', None)
+    if written:
+        invalidate_cache(written)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _reset_written_tables(session):
+    session.info.pop('written_tables', None)
+
+
+# ==================== INSTRUMENTATION DES REQUÊTES ====================
+# Compte les requêtes SQL et mesure le temps passé en base pour chaque requête HTTP.
+# Les mesures sont exposées via /api/admin/metrics et l'en-tête Server-Timing.
+
+METRICS_FENETRE = 1000  # nombre de mesures conservées par endpoint
+
+_request_metrics = defaultdict(lambda: deque(maxlen=METRICS_FENETRE))  # endpoint -> (wall_ms, db_ms, nb_requetes)
+_request_metrics_lock = threading.Lock()
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _sql_timer_start(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('sql_timer_start', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _sql_timer_stop(conn, cursor, statement, parameters, context, executemany):
+    start = conn.info['sql_timer_start'].pop()
+    # Les threads d'arrière-plan (file de rafraîchissement...) ne sont pas comptés
+    if has_request_context() and 'sql_queries' in g:
+        g.sql_queries += 1
+        g.sql_time += time.perf_counter() - start
+
+
+@app.before_request
+def _start_request_metrics():
+    g.request_start = time.perf_counter()
+    g.sql_queries = 0
+    g.sql_time = 0.0
+
+
+@app.after_request
+def _record_request_metrics(response):
+    if 'request_start' not in g:
+        return response
+
+    wall_ms = (time.perf_counter() - g.request_start) * 1000
+    db_ms = g.sql_time * 1000
+    endpoint = f"{request.method} {request.url_rule.rule}" if request.url_rule else "(non routé)"
+
+    with _request_metrics_lock:
+        _request_metrics[endpoint].append((wall_ms, db_ms, g.sql_queries))
+
+    # En-tête HTTP : ASCII uniquement
+    response.headers['Server-Timing'] = f'db;dur={db_ms:.1f};desc="{g.sql_queries} requetes SQL", total;dur={wall_ms:.1f}'
+    response.headers['Timing-Allow-Origin'] = '*'
+    return response
+
+
+def percentile(values, p):
+    """Percentile par rang le plus proche sur une liste déjà triée"""
+    if not values:
+        return None
+    rank = max(0, min(len(values) - 1, int(round(p / 100 * len(values) + 0.5)) - 1))
+    return values[rank]
+
+
+@app.route('/api/admin/metrics', methods=['GET'])
+def get_request_metrics():
+    """
+    Statistiques par endpoint sur les dernières requêtes :
+    temps total et temps SQL (p50/p95/p99, max), nombre de requêtes SQL (moyenne, max)
+    Triées par temps cumulé décroissant
+    """
+    try:
+        with _request_metrics_lock:
+            snapshot = {endpoint: list(samples) for endpoint, samples in _request_metrics.items()}
+
+        endpoints = []
+        for endpoint, samples in snapshot.items():
+            wall = sorted(sample[0] for sample in samples)
+            db_time = sorted(sample[1] for sample in samples)
+            queries = [sample[2] for sample in samples]
+            endpoints.append({
+                "endpoint": endpoint,
+                "count": len(samples),
+                "total_ms": round(sum(wall), 1),
+                "wall_ms": {
+                    "p50": round(percentile(wall, 50), 1),
+                    "p95": round(percentile(wall, 95), 1),
+                    "p99": round(percentile(wall, 99), 1),
+                    "max": round(wall[-1], 1)
+                },
+                "db_ms": {
+                    "p50": round(percentile(db_time, 50), 1),
+                    "p95": round(percentile(db_time, 95), 1),
+                    "p99": round(percentile(db_time, 99), 1),
+                    "max": round(db_time[-1], 1)
+                },
+                "queries": {
+                    "avg": round(sum(queries) / len(queries), 1),
+                    "max": max(queries)
+                }
+            })
+
+        endpoints.sort(key=lambda e: e["total_ms"], reverse=True)
+        return jsonify({"fenetre": METRICS_FENETRE, "endpoints": endpoints})
+
+    except Exception as e:
+        print(f"❌ Erreur get_request_metrics: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/api/admin/metrics', methods=['DELETE'])
+def reset_request_metrics():
+    """Remet les mesures à zéro (avant une nouvelle série de tests)"""
+    with _request_metrics_lock:
+        _request_metrics.clear()
+    return jsonify({"success": True})
+
+
 @app.route('/')
 def home():
     return "API Intyma – Backend prêt !"
 
 
+def serialize_scene(s):
+    """Sérialise une scène au format de /api/scenes (relations déjà chargées)"""
+    return {
+        "id": s.id,
+        "titre": s.titre,
+        "chemin": s.chemin,
+        "note_perso": s.note_perso,
+        "note_value": s.note_value,
+        "date_ajout": s.date_ajout.isoformat() if s.date_ajout else None,
+        "synopsis": s.synopsis,
+        "duree": s.duree,
+        "qualite": s.qualite,
+        "site": s.site,
+        "studio": s.studio,
+        "date_scene": s.date_scene.isoformat() if s.date_scene else None,
+        "image": s.image,
+        "niveau_plaisir": s.niveau_plaisir,
+        "actrices": [{"id": a.id, "nom": a.nom} for a in s.actrices],
+        "tags": [{"id": t.id, "nom": t.nom} for t in s.tags],
+    }
+
+
+SCENES_PAGE_DEFAUT = 50
+SCENES_PAGE_MAX = 500
+
+
+def parse_date_cursor(after):
+    """Décode un curseur "<YYYY-MM-DD>:<id>" (date vide si NULL)"""
+    date_part, _, id_part = after.rpartition(':')
+    date_value = datetime.strptime(date_part, '%Y-%m-%d').date() if date_part else None
+    return date_value, int(id_part)
+
+
+def make_date_cursor(date_value, row_id):
+    """Curseur "<YYYY-MM-DD>:<id>" pointant après la ligne donnée"""
+    return f"{date_value.isoformat() if date_value else ''}:{row_id}"
+
+
+def filter_after_date_cursor(query, date_col, id_col, after):
+    """
+    Keyset pour un tri (date décroissante, id décroissant) : lignes situées après le curseur.
+    En SQLite les NULL arrivent en dernier dans un tri décroissant.
+    """
+    after_date, after_id = parse_date_cursor(after)
+    if after_date is None:
+        return query.filter(date_col.is_(None), id_col < after_id)
+    return query.filter(db.or_(
+        date_col < after_date,
+        db.and_(date_col == after_date, id_col < after_id),
+        date_col.is_(None)
+    ))
+
+
+def parse_scenes_cursor(after, order):
+    """
+    Décode le curseur `after` de /api/scenes
+    - order=id : "<id>"
+    - order=date_ajout : "<YYYY-MM-DD>:<id>" (date vide si date_ajout est NULL)
+    """
+    if order == 'date_ajout':
+        return parse_date_cursor(after)
+    return None, int(after)
+
+
+def make_scenes_cursor(scene, order):
+    """Construit le curseur pointant après la scène donnée"""
+    if order == 'date_ajout':
+        return make_date_cursor(scene.date_ajout, scene.id)
+    return str(scene.id)
+
+
 @app.route('/api/scenes')
 def get_scenes():
-    scenes = Scene.query.all()
-    result = []
-    for s in scenes:
-        # Construire la liste des actrices avec leurs détails
-        actrices_data = []
-        for actrice in s.actrices:  # s.actrices est la relation many-to-many
-            actrices_data.append({
-                "id": actrice.id,
-                "nom": actrice.nom
-            })
+    """
+    Liste des scènes, paginée par curseur (keyset)
+    - ?limit=50 : taille de page (max 500)
+    - ?order=id (croissant, défaut) ou ?order=date_ajout (plus récentes d'abord)
+    - ?after=<curseur> : valeur `next_cursor` de la page précédente
+    - ?all=1 : ancien format, liste complète non paginée
+    Actrices et tags sont chargés en requêtes IN groupées (selectinload), pas scène par scène.
+    """
+    try:
+        query = Scene.query.options(selectinload(Scene.actrices), selectinload(Scene.tags))
 
-        result.append({
-            "id": s.id,
-            "titre": s.titre,
-            "chemin": s.chemin,
-            "note_perso": s.note_perso,
-            "date_ajout": s.date_ajout.isoformat() if s.date_ajout else None,
-            "synopsis": s.synopsis,
-            "duree": s.duree,
-            "qualite": s.qualite,
-            "site": s.site,
-            "studio": s.studio,
-            "date_scene": s.date_scene.isoformat() if s.date_scene else None,
-            "image": s.image,
-            "niveau_plaisir": s.niveau_plaisir,
-            "actrices": actrices_data,
-            "tags": [{"id": t.id, "nom": t.nom} for t in s.tags],
+        if request.args.get('all') in ('1', 'true'):
+            return jsonify([serialize_scene(s) for s in query.order_by(Scene.id).all()])
+
+        order = request.args.get('order', 'id')
+        if order not in ('id', 'date_ajout'):
+            return jsonify({"error": f"order invalide: {order}"}), 400
+
+        limit = min(max(request.args.get('limit', SCENES_PAGE_DEFAUT, type=int), 1), SCENES_PAGE_MAX)
+        after = request.args.get('after')
+
+        if order == 'date_ajout':
+            query = query.order_by(Scene.date_ajout.desc(), Scene.id.desc())
+            if after:
+                query = filter_after_date_cursor(query, Scene.date_ajout, Scene.id, after)
+        else:
+            query = query.order_by(Scene.id)
+            if after:
+                _, after_id = parse_scenes_cursor(after, order)
+                query = query.filter(Scene.id > after_id)
+
+        # Une ligne de plus pour savoir s'il reste une page
+        scenes = query.limit(limit + 1).all()
+        has_more = len(scenes) > limit
+        scenes = scenes[:limit]
+
+        return jsonify({
+            "scenes": [serialize_scene(s) for s in scenes],
+            "next_cursor": make_scenes_cursor(scenes[-1], order) if has_more else None,
+            "has_more": has_more,
+            "limit": limit,
+            "order": order
         })
-    return jsonify(result)
+
+    except ValueError as e:
+        return jsonify({"error": f"Curseur invalide: {e}"}), 400
+
+
+RECENT_DEFAUT = 12
+RECENT_MAX = 100
+
+
+def actress_card(actrice):
+    """Carte actrice minimale (id, nom, photo) pour les widgets de l'accueil"""
+    return {"id": actrice.id, "nom": actrice.nom, "photo": actrice.photo}
+
+
+@app.route('/api/scenes/recent')
+def get_recent_scenes():
+    """
+    Nouvelles sorties : les ?limit=12 (max 100) dernières scènes ajoutées,
+    lues dans l'index ix_scenes_date_ajout, prêtes à afficher (miniature, photos des actrices)
+    """
+    limit = min(max(request.args.get('limit', RECENT_DEFAUT, type=int), 1), RECENT_MAX)
+    scenes = Scene.query.options(selectinload(Scene.actrices), selectinload(Scene.tags)).filter(
+        Scene.date_ajout.isnot(None)
+    ).order_by(Scene.date_ajout.desc(), Scene.id.desc()).limit(limit).all()
+
+    return jsonify([{
+        **serialize_scene(s),
+        "miniature": construct_miniature_url(s),
+        "actrices": [actress_card(a) for a in s.actrices],
+    } for s in scenes])
+
+
+# ==================== RECHERCHE PLEIN TEXTE (FTS5) ====================
+
+# Table virtuelle FTS5 : rowid = scenes.id, une colonne par champ indexé.
+# Les noms d'actrices et de tags sont dénormalisés (séparés par des espaces).
+FTS_CREATE_SQL = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS scenes_fts USING fts5(
+        titre, synopsis, studio, site, actrices, tags,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+"""
+
+FTS_SELECT_SQL = """
+    SELECT s.id, s.titre, s.synopsis, s.studio, s.site,
+           (SELECT group_concat(a.nom, ' ') FROM scene_actrice sa
+                JOIN actrices a ON a.id = sa.actrice_id WHERE sa.scene_id = s.id),
+           (SELECT group_concat(t.nom, ' ') FROM scene_tag st
+                JOIN tags t ON t.id = st.tag_id WHERE st.scene_id = s.id)
+    FROM scenes s
+"""
+
+# Poids bm25 dans l'ordre des colonnes : titre, synopsis, studio, site, actrices, tags
+FTS_BM25_WEIGHTS = "10.0, 1.0, 3.0, 3.0, 8.0, 4.0"
+
+_fts_ready = False
+_fts_lock = threading.Lock()
+
+
+def ensure_scenes_fts():
+    """
+    Crée la table FTS si besoin et la remplit si elle est vide, dans sa propre transaction.
+    Appelée au démarrage et avant la première requête (jamais au milieu d'une écriture :
+    un commit de la session validerait une scène à moitié construite).
+    """
+    global _fts_ready
+    if _fts_ready:
+        return
+    with _fts_lock:
+        if _fts_ready:
+            return
+        with db.engine.begin() as connection:
+            connection.execute(text(FTS_CREATE_SQL))
+            nb_indexees = connection.execute(text("SELECT count(*) FROM scenes_fts")).scalar()
+            if nb_indexees == 0 and connection.execute(text("SELECT count(*) FROM scenes")).scalar() > 0:
+                connection.execute(text("INSERT INTO scenes_fts(rowid, titre, synopsis, studio, site, actrices, tags) "
+                                        + FTS_SELECT_SQL))
+                print("🔎 Index plein texte construit")
+        _fts_ready = True
+
+
+@app.before_request
+def _ensure_scenes_fts_before_request():
+    """Processus non lancés par __main__ (flask run, benchmark.py) : index prêt avant tout handler"""
+    ensure_scenes_fts()
+
+
+def rebuild_scenes_fts():
+    """Reconstruit entièrement l'index plein texte (sans commit)"""
+    db.session.execute(text(FTS_CREATE_SQL))
+    db.session.execute(text("DELETE FROM scenes_fts"))
+    db.session.execute(text(
+        "INSERT INTO scenes_fts(rowid, titre, synopsis, studio, site, actrices, tags) " + FTS_SELECT_SQL))
+
+
+def index_scenes_fts(scene_ids):
+    """
+    Réindexe les scènes données dans la transaction courante (sans commit).
+    Une scène absente de la table scenes est simplement retirée de l'index.
+    """
+    scene_ids = [sid for sid in set(scene_ids) if sid is not None]
+    if not scene_ids:
+        return
+    db.session.flush()  # Rendre visibles les relations actrices/tags en attente
+    db.session.execute(
+        text("DELETE FROM scenes_fts WHERE rowid IN :ids").bindparams(bindparam('ids', expanding=True)),
+        {"ids": scene_ids})
+    db.session.execute(
+        text("INSERT INTO scenes_fts(rowid, titre, synopsis, studio, site, actrices, tags) "
+             + FTS_SELECT_SQL + " WHERE s.id IN :ids").bindparams(bindparam('ids', expanding=True)),
+        {"ids": scene_ids})
+
+
+def build_fts_match(q):
+    """
+    Transforme une saisie utilisateur en expression MATCH FTS5 :
+    chaque mot devient un préfixe ("mot"*), tous les mots sont requis.
+    """
+    tokens = re.findall(r'\w+', q.lower())
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def fts_scene_ids_query(match):
+    """Sous-requête des ids de scènes correspondant à une expression MATCH"""
+    return db.select(db.literal_column('rowid')).select_from(text('scenes_fts')).where(
+        text('scenes_fts MATCH :fts_match').bindparams(fts_match=match))
+
+
+@app.route('/api/search')
+def search_fulltext():
+    """
+    Recherche plein texte classée (bm25) sur titre, synopsis, studio, site, actrices et tags
+    - ?q=texte : chaque mot est cherché en préfixe
+    - ?limit=20 (max 100)
+    """
+    try:
+        q = request.args.get('q', '').strip()
+        limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+        match = build_fts_match(q)
+        if not match:
+            return jsonify({"query": q, "results": [], "count": 0})
+
+        rows = db.session.execute(text(
+            f"SELECT rowid, bm25(scenes_fts, {FTS_BM25_WEIGHTS}) AS rank FROM scenes_fts "
+            "WHERE scenes_fts MATCH :match ORDER BY rank LIMIT :limit"
+        ), {"match": match, "limit": limit}).all()
+
+        scenes_by_id = {
+            s.id: s for s in Scene.query.options(
+                selectinload(Scene.actrices), selectinload(Scene.tags)
+            ).filter(Scene.id.in_([row[0] for row in rows])).all()
+        }
+
+        results = []
+        for scene_id, rank in rows:
+            scene = scenes_by_id.get(scene_id)
+            if scene:
+                data = serialize_scene(scene)
+                data["miniature"] = construct_miniature_url(scene)
+                data["score"] = round(-rank, 4)  # bm25 est négatif : plus petit = plus pertinent
+                results.append(data)
+
+        return jsonify({"query": q, "results": results, "count": len(results)})
+
+    except Exception as e:
+        print(f"❌ Erreur search_fulltext: {e}")
+        return jsonify({"error": str(e)}), 400
+
+
+def get_list_arg(name):
+    """Lit un paramètre multiple : ?tag=a&tag=b ou ?tag=a,b"""
+    values = []
+    for raw in request.args.getlist(name):
+        values.extend(v.strip() for v in raw.split(',') if v.strip())
+    return values
+
+
+def parse_date_arg(name):
+    """Lit un paramètre date au format YYYY-MM-DD (ValueError si invalide)"""
+    value = request.args.get(name)
+    return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+
+
+def note_sql_expression():
+    """Expression SQL numérique de la note d'une scène"""
+    return Scene.note_value
+
+
+def build_scene_filters(query, exclude=()):
+    """
+    Applique à `query` les filtres de recherche présents dans request.args
+    - q : recherche plein texte (titre, synopsis, studio, site, actrices, tags)
+    - qualite, studio, site : valeurs exactes (multiples possibles)
+    - tags : noms de tags, la scène doit tous les avoir
+    - actrice_ids : la scène doit avoir au moins une de ces actrices
+    - nb_actrices : nombre exact d'actrices, ou "4+"
+    - note_min, note_max, duree_min, duree_max
+    - date_ajout_from, date_ajout_to, date_scene_from, date_scene_to (YYYY-MM-DD)
+    - favoris=1, historique=1
+    `exclude` permet d'ignorer certains filtres (utile pour les facettes).
+    """
+    q = request.args.get('q', '').strip()
+    if q and 'q' not in exclude:
+        match = build_fts_match(q)
+        if match:
+            query = query.filter(Scene.id.in_(fts_scene_ids_query(match)))
+
+    for field in ('qualite', 'studio', 'site'):
+        values = get_list_arg(field)
+        if values and field not in exclude:
+            query = query.filter(getattr(Scene, field).in_(values))
+
+    tags = get_list_arg('tags')
+    if tags and 'tags' not in exclude:
+        scenes_avec_tags = db.session.query(scene_tag.c.scene_id).join(
+            Tag, Tag.id == scene_tag.c.tag_id
+        ).filter(Tag.nom.in_(tags)).group_by(scene_tag.c.scene_id).having(
+            db.func.count(db.distinct(Tag.nom)) == len(set(tags)))
+        query = query.filter(Scene.id.in_(scenes_avec_tags))
+
+    actrice_ids = [int(v) for v in get_list_arg('actrice_ids')]
+    if actrice_ids and 'actrices' not in exclude:
+        query = query.filter(Scene.id.in_(
+            db.session.query(scene_actrice.c.scene_id).filter(scene_actrice.c.actrice_id.in_(actrice_ids))))
+
+    nb_actrices = request.args.get('nb_actrices')
+    if nb_actrices and 'nb_actrices' not in exclude:
+        compte = db.session.query(db.func.count(scene_actrice.c.actrice_id)).filter(
+            scene_actrice.c.scene_id == Scene.id).scalar_subquery()
+        if nb_actrices.endswith('+'):
+            query = query.filter(compte >= int(nb_actrices[:-1]))
+        else:
+            query = query.filter(compte == int(nb_actrices))
+
+    note_min = request.args.get('note_min', type=float)
+    note_max = request.args.get('note_max', type=float)
+    if note_min is not None and 'note' not in exclude:
+        query = query.filter(note_sql_expression() >= note_min)
+    if note_max is not None and 'note' not in exclude:
+        query = query.filter(note_sql_expression() <= note_max)
+
+    duree_min = request.args.get('duree_min', type=int)
+    duree_max = request.args.get('duree_max', type=int)
+    if duree_min is not None and 'duree' not in exclude:
+        query = query.filter(Scene.duree >= duree_min)
+    if duree_max is not None and 'duree' not in exclude:
+        query = query.filter(Scene.duree <= duree_max)
+
+    for field in ('date_ajout', 'date_scene'):
+        date_from = parse_date_arg(f'{field}_from')
+        date_to = parse_date_arg(f'{field}_to')
+        if date_from and field not in exclude:
+            query = query.filter(getattr(Scene, field) >= date_from)
+        if date_to and field not in exclude:
+            query = query.filter(getattr(Scene, field) <= date_to)
+
+    if request.args.get('favoris') in ('1', 'true') and 'favoris' not in exclude:
+        query = query.filter(Scene.id.in_(db.session.query(Favorite.scene_id)))
+    if request.args.get('historique') in ('1', 'true') and 'historique' not in exclude:
+        query = query.filter(Scene.id.in_(db.session.query(History.scene_id)))
+
+    return query
+
+
+SCENES_SORT_KEYS = {
+    'id': lambda: Scene.id,
+    'titre': lambda: Scene.titre,
+    'date_ajout': lambda: Scene.date_ajout,
+    'date_scene': lambda: Scene.date_scene,
+    'duree': lambda: Scene.duree,
+    'note': note_sql_expression,
+}
+
+
+@app.route('/api/scenes/search')
+def search_scenes():
+    """
+    Recherche de scènes côté serveur : filtres (voir build_scene_filters), tri et pagination
+    - ?sort=date_ajout|date_scene|titre|note|duree|id (défaut: date_ajout)
+    - ?order=desc|asc (défaut: desc)
+    - ?page=1&limit=50 (max 500)
+    Retourne une page de scènes et le nombre total de résultats.
+    """
+    try:
+        sort = request.args.get('sort', 'date_ajout')
+        order = request.args.get('order', 'desc')
+        if sort not in SCENES_SORT_KEYS or order not in ('asc', 'desc'):
+            return jsonify({"error": f"Tri invalide: {sort} {order}"}), 400
+
+        limit = min(max(request.args.get('limit', SCENES_PAGE_DEFAUT, type=int), 1), SCENES_PAGE_MAX)
+        page = max(request.args.get('page', 1, type=int), 1)
+
+        query = build_scene_filters(Scene.query)
+        total = query.order_by(None).count()
+
+        sort_column = SCENES_SORT_KEYS[sort]()
+        sort_id = Scene.id.desc() if order == 'desc' else Scene.id.asc()
+        # Les scènes sans valeur pour la clé de tri passent toujours en dernier
+        query = query.order_by(
+            sort_column.is_(None),
+            sort_column.desc() if order == 'desc' else sort_column.asc(),
+            sort_id
+        )
+
+        scenes = query.options(
+            selectinload(Scene.actrices), selectinload(Scene.tags)
+        ).offset((page - 1) * limit).limit(limit).all()
+
+        return jsonify({
+            "scenes": [serialize_scene(s) for s in scenes],
+            "total": total,
+            "page": page,
+            "limit": limit,
+            "pages": (total + limit - 1) // limit,
+            "sort": sort,
+            "order": order
+        })
+
+    except ValueError as e:
+        return jsonify({"error": f"Paramètre invalide: {e}"}), 400
+
+
+FACETS_TABLES = ('scenes', 'tags', 'actrices', 'favorites', 'history')
+
+
+def build_facets():
+    """
+    Comptes GROUP BY pour chaque facette, restreints par les filtres actifs.
+    Chaque facette ignore son propre filtre (sélection multiple dans une même facette).
+    """
+    top = request.args.get('top', type=int)
+    facets = {}
+
+    for field, exclude in (('qualite', 'qualite'), ('studio', 'studio'), ('site', 'site')):
+        column = getattr(Scene, field)
+        count = db.func.count(Scene.id)
+        query = build_scene_filters(
+            db.session.query(column, count), exclude=(exclude,)
+        ).filter(column.isnot(None), column != '').group_by(column).order_by(count.desc(), column)
+        if top:
+            query = query.limit(top)
+        facets[field] = [{"valeur": value, "count": n} for value, n in query.all()]
+
+    count = db.func.count(scene_tag.c.scene_id)
+    query = build_scene_filters(
+        db.session.query(Tag.id, Tag.nom, count).join(scene_tag, scene_tag.c.tag_id == Tag.id).join(
+            Scene, Scene.id == scene_tag.c.scene_id),
+        exclude=('tags',)
+    ).group_by(Tag.id).order_by(count.desc(), Tag.nom)
+    if top:
+        query = query.limit(top)
+    facets["tags"] = [{"id": tag_id, "nom": nom, "count": n} for tag_id, nom, n in query.all()]
+
+    count = db.func.count(scene_actrice.c.scene_id)
+    query = build_scene_filters(
+        db.session.query(Actrice.id, Actrice.nom, count).join(
+            scene_actrice, scene_actrice.c.actrice_id == Actrice.id).join(
+            Scene, Scene.id == scene_actrice.c.scene_id),
+        exclude=('actrices',)
+    ).group_by(Actrice.id).order_by(count.desc(), Actrice.nom)
+    if top:
+        query = query.limit(top)
+    facets["actrices"] = [{"id": actrice_id, "nom": nom, "count": n} for actrice_id, nom, n in query.all()]
+
+    facets["total"] = build_scene_filters(Scene.query).order_by(None).count()
+    return facets
+
+
+@app.route('/api/facets')
+def get_facets():
+    """
+    Comptes par qualité, studio, site, tag et actrice
+    - accepte les mêmes filtres que /api/scenes/search
+    - ?top=N : limite chaque facette aux N valeurs les plus fréquentes
+    Résultat mis en cache jusqu'à la prochaine écriture sur les tables concernées.
+    """
+    try:
+        key = ('facets',) + tuple(sorted(request.args.items(multi=True)))
+        return jsonify(cache_get_or_build(key, FACETS_TABLES, build_facets))
+
+    except ValueError as e:
+        return jsonify({"error": f"Paramètre invalide: {e}"}), 400
 
 
 @app.route('/api/actrices')
@@ -91,40 +773,188 @@ def get_tags():
     return jsonify(result)
 
 
+def serialize_scene_entry(row, entry_fields):
+    """Champs communs d'une entrée d'historique ou de favori (ligne jointe à sa scène)"""
+    return {
+        "scene_id": row.scene_id,
+        "titre": row.titre,
+        "chemin": row.chemin,
+        "miniature": construct_miniature_url(row),
+        "duree": row.duree,
+        "actrice_ids": sorted(int(a) for a in row.actrice_ids.split(',')) if row.actrice_ids else [],
+        "nb_vues": row.nb_vues or 0,
+        "date_premiere_vue": row.date_premiere_vue.isoformat() if row.date_premiere_vue else None,
+        "derniere_vue": row.derniere_vue.isoformat() if row.derniere_vue else None,
+        **entry_fields
+    }
+
+
+def pending_views_for_read():
+    """
+    Vues en tampon à ajouter aux lignes lues (voir with_pending_views).
+    Une première vue n'a pas encore de ligne History à compléter : si le tampon en contient,
+    il est écrit avant la lecture (une fois par scène, les vues suivantes ne bloquent pas).
+    """
+    pending = view_event_buffer.pending_views()
+    if pending:
+        connues = {scene_id for scene_id, in db.session.query(History.scene_id).filter(
+            History.scene_id.in_(pending))}
+        if len(connues) < len(pending):
+            view_event_buffer.flush(timeout=5)
+            pending = view_event_buffer.pending_views()
+    return pending
+
+
+def with_pending_views(data, pending):
+    """Ajoute à une entrée sérialisée les vues encore dans le tampon (voir ViewEventBuffer.pending_views)"""
+    vues = pending.get(data["scene_id"])
+    if vues:
+        derniere = vues["derniere"].date().isoformat()
+        data["nb_vues"] += vues["nb"]
+        data["derniere_vue"] = max(data["derniere_vue"] or derniere, derniere)
+        data["date_premiere_vue"] = data["date_premiere_vue"] or vues["premiere"].date().isoformat()
+    return data
+
+
+def list_scene_entries(query, orders, default_order, id_col, key, serializer):
+    """
+    Réponse commune de /api/history et /api/favorites
+    - sans limit ni after : liste complète (format historique)
+    - ?limit=N&after=<curseur> : page triée par date décroissante,
+      {key: [...], next_cursor, has_more, limit, order}
+    """
+    order = request.args.get('order', default_order)
+    if order not in orders:
+        return jsonify({"error": f"order invalide: {order} ({', '.join(orders)})"}), 400
+    order_col = orders[order]
+    query = query.order_by(order_col.desc(), id_col.desc())
+
+    if 'limit' not in request.args and 'after' not in request.args:
+        return jsonify([serializer(row) for row in query.all()])
+
+    try:
+        limit = min(max(request.args.get('limit', SCENES_PAGE_DEFAUT, type=int), 1), SCENES_PAGE_MAX)
+        after = request.args.get('after')
+        if after:
+            query = filter_after_date_cursor(query, order_col, id_col, after)
+    except ValueError as e:
+        return jsonify({"error": f"Curseur invalide: {e}"}), 400
+
+    # Une ligne de plus pour savoir s'il reste une page
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return jsonify({
+        key: [serializer(row) for row in rows],
+        "next_cursor": make_date_cursor(getattr(rows[-1], order), rows[-1].id) if has_more else None,
+        "has_more": has_more,
+        "limit": limit,
+        "order": order
+    })
+
+
+def scene_entry_columns():
+    """Colonnes de la scène jointe + ids des actrices (group_concat, une seule requête)"""
+    return (Scene.titre, Scene.chemin, Scene.image, Scene.duree,
+            db.func.group_concat(scene_actrice.c.actrice_id).label('actrice_ids'))
+
+
 @app.route('/api/favorites')
 def get_favorites():
-    favs = Favorite.query.all()
-    result = []
-    for f in favs:
-        scene = db.session.get(Scene, f.scene_id)  # Fix: Utiliser db.session.get() au lieu de Scene.query.get()
-        if scene:
-            result.append({
-                "id": f.id,
-                "scene_id": scene.id,
-                "titre": scene.titre,
-                "chemin": scene.chemin,
-                "date_ajout": f.date_ajout.isoformat() if f.date_ajout else None,
-            })
-    return jsonify(result)
+    """
+    Favoris joints à leur scène et à son historique (une requête)
+    - ?order=date_ajout (défaut) ou derniere_vue, du plus récent au plus ancien
+    - ?limit=N&after=<curseur> : pagination par curseur (voir list_scene_entries)
+    """
+    pending = pending_views_for_read()  # Vues encore en tampon, ajoutées à nb_vues
+    query = db.session.query(
+        Favorite.id, Favorite.scene_id, Favorite.date_ajout,
+        History.nb_vues, History.date_premiere_vue, History.derniere_vue, *scene_entry_columns()
+    ).join(Scene, Scene.id == Favorite.scene_id).outerjoin(
+        History, History.scene_id == Favorite.scene_id
+    ).outerjoin(scene_actrice, scene_actrice.c.scene_id == Favorite.scene_id).group_by(Favorite.id)
+
+    return list_scene_entries(
+        query, {'date_ajout': Favorite.date_ajout, 'derniere_vue': History.derniere_vue}, 'date_ajout',
+        Favorite.id, 'favorites',
+        lambda row: with_pending_views(serialize_scene_entry(row, {
+            "id": row.id,
+            "date_ajout": row.date_ajout.isoformat() if row.date_ajout else None,
+            "is_favorite": True
+        }), pending))
 
 
 @app.route('/api/history')
 def get_history():
-    hists = History.query.all()
-    result = []
-    for h in hists:
-        scene = db.session.get(Scene, h.scene_id)  # Fix: Utiliser db.session.get()
-        if scene:
-            result.append({
-                "id": h.id,
-                "scene_id": scene.id,
-                "titre": scene.titre,
-                "chemin": scene.chemin,
-                "date_vue": h.date_vue.isoformat() if h.date_vue else None,
-                "note_session": h.note_session,
-                "commentaire_session": h.commentaire_session,
-            })
-    return jsonify(result)
+    """
+    Historique (résumé par scène) joint à la scène et aux favoris (une requête)
+    - ?order=derniere_vue (défaut) ou date_premiere_vue, du plus récent au plus ancien
+    - ?limit=N&after=<curseur> : pagination par curseur (voir list_scene_entries)
+    """
+    pending = pending_views_for_read()  # Vues encore en tampon, ajoutées à nb_vues
+    query = db.session.query(
+        History.id, History.scene_id, History.date_vue, History.note_session, History.commentaire_session,
+        History.nb_vues, History.date_premiere_vue, History.derniere_vue,
+        Favorite.id.label('favorite_id'), *scene_entry_columns()
+    ).join(Scene, Scene.id == History.scene_id).outerjoin(
+        Favorite, Favorite.scene_id == History.scene_id
+    ).outerjoin(scene_actrice, scene_actrice.c.scene_id == History.scene_id).group_by(History.id)
+
+    return list_scene_entries(
+        query, {'derniere_vue': History.derniere_vue, 'date_premiere_vue': History.date_premiere_vue},
+        'derniere_vue', History.id, 'history',
+        lambda row: with_pending_views(serialize_scene_entry(row, {
+            "id": row.id,
+            "date_vue": row.date_vue.isoformat() if row.date_vue else None,
+            "note_session": row.note_session,
+            "commentaire_session": row.commentaire_session,
+            "is_favorite": row.favorite_id is not None
+        }), pending))
+
+
+@app.route('/api/history/recent')
+def get_recent_history():
+    """
+    Vus récemment : les ?limit=12 (max 100) dernières scènes vues (index ix_history_derniere_vue)
+    et les actrices de ces scènes, avec leur dernière vue et leur nombre de scènes.
+    Trois requêtes, quelle que soit la taille du catalogue.
+    """
+    limit = min(max(request.args.get('limit', RECENT_DEFAUT, type=int), 1), RECENT_MAX)
+    pending = pending_views_for_read()  # Vues encore en tampon, ajoutées à nb_vues
+
+    rows = db.session.query(History, Scene).join(Scene, Scene.id == History.scene_id).options(
+        selectinload(Scene.actrices)
+    ).filter(History.derniere_vue.isnot(None)).order_by(
+        History.derniere_vue.desc(), History.id.desc()
+    ).limit(limit).all()
+
+    scenes = []
+    actrices = {}
+    for history, scene in rows:
+        derniere_vue = history.derniere_vue.isoformat()
+        scenes.append({
+            "id": history.id,
+            "scene_id": scene.id,
+            "titre": scene.titre or 'Sans titre',
+            "image": scene.image,
+            "miniature": construct_miniature_url(scene),
+            "duree": scene.duree,
+            "note_perso": scene.note_perso,
+            "actrice": scene.actrices[0].nom if scene.actrices else None,
+            "nb_vues": (history.nb_vues or 0) + pending.get(scene.id, {}).get("nb", 0),
+            "date_vue": derniere_vue,
+        })
+        # Lignes triées par dernière vue : la première rencontre d'une actrice est la plus récente
+        for actrice in scene.actrices:
+            actrices.setdefault(actrice.id, {**actress_card(actrice), "date_vue": derniere_vue})
+
+    if actrices:
+        nb_scenes = dict(db.session.query(scene_actrice.c.actrice_id, db.func.count()).filter(
+            scene_actrice.c.actrice_id.in_(actrices)).group_by(scene_actrice.c.actrice_id))
+        for actrice_id, card in actrices.items():
+            card["nb_scenes"] = nb_scenes.get(actrice_id, 0)
+
+    return jsonify({"scenes": scenes, "actrices": list(actrices.values())})
 
 
 @app.route('/miniatures/<actrice>/<filename>')
@@ -145,9 +975,10 @@ def serve_collection_image(filename):
     return send_from_directory(path, filename)
 
 
-def get_actrice_collection_image(actrice, base_dir="/Volumes/My Passport for Mac/Intyma"):
+def get_actrice_collection_image(actrice, best_scene=None, base_dir="/Volumes/My Passport for Mac/Intyma"):
     """
     Retourne l'URL de l'image de collection pour une actrice
+    - best_scene : meilleure scène de l'actrice, déjà chargée (voir best_scene_by_actrice)
     """
     try:
         # 1. Cherche collection.jpg dans le dossier actrice
@@ -158,27 +989,9 @@ def get_actrice_collection_image(actrice, base_dir="/Volumes/My Passport for Mac
             return f"/images/{encoded_name}/collection.jpg"
 
         # 2. Sinon, prend la première miniature de la meilleure scène de l'actrice
-        def get_note_value(scene):
-            try:
-                note_str = str(scene.note_perso or '0')
-                match = re.search(r'(\d+(?:\.\d+)?)', note_str)
-                if match:
-                    return float(match.group(1))
-                return 0.0
-            except Exception as e:
-                print(f"Erreur get_note_value pour scene {scene.id}: {e}")
-                return 0.0
-
-        scenes_sorted = sorted(
-            actrice.scenes,
-            key=get_note_value,
-            reverse=True
-        )
-        if scenes_sorted:
-            first_scene = scenes_sorted[0]
-            if first_scene.image:
-                # Utiliser construct_miniature_url comme dans scenes_du_jour()
-                return construct_miniature_url(first_scene)
+        if best_scene and best_scene.image:
+            # Utiliser construct_miniature_url comme dans scenes_du_jour()
+            return construct_miniature_url(best_scene)
 
         # 3. Sinon, portrait de l'actrice (même approche que pour la photo dans actrice_du_jour())
         if actrice.photo:
@@ -198,96 +1011,164 @@ def get_actrice_collection_image(actrice, base_dir="/Volumes/My Passport for Mac
         return "/collections/premium.png"
 
 
-@app.route('/api/actrice_du_jour')
-def actrice_du_jour():
+# ==================== PAGE D'ACCUEIL ====================
+# Chaque section de l'accueil a son builder (mis en cache) ; les routes individuelles
+# et /api/home les partagent. HomeContext charge une seule fois les lignes communes.
+
+class HomeContext:
+    """Lignes partagées entre les sections de l'accueil, chargées à la demande une seule fois"""
+
+    @cached_property
+    def selection_du_jour(self):
+        """Sélection du jour (actrice + scènes), lue par clé primaire ou calculée une fois"""
+        return get_selection_du_jour(date.today())
+
+    @cached_property
+    def recent_history(self):
+        """5 dernières entrées de l'historique (scènes existantes) : lignes (id, scene_id)"""
+        return db.session.query(History.id, History.scene_id).join(Scene, Scene.id == History.scene_id).order_by(
+            History.date_vue.desc(), History.id.desc()).limit(5).all()
+
+
+def actress_photo_url(nom, photo, default):
+    """URL de la photo d'une actrice servie par /images/<actrice>/<fichier>"""
+    if not photo:
+        return default
+    try:
+        # Extraire le nom de fichier du chemin complet
+        filename = os.path.basename(photo)
+        encoded_name = quote(nom, safe='')
+        return f"/images/{encoded_name}/{quote(filename, safe='')}"
+    except Exception as e:
+        print(f"Erreur construction URL photo: {e}")
+        return default
+
+
+ACTRICE_DU_JOUR_FALLBACK = {
+    "nom": "Stacy Rouse",
+    "photo": "/static/img/actrices/stacy_rouse.jpg",
+    "nb_scenes": 42,
+    "note_moyenne": 4.8,
+    "id": 1,
+    "bio": "Actrice iconique, star de nombreuses scènes glamour.",
+    "tags": ["glamour", "milf", "star"]
+}
+
+
+SCENES_DU_JOUR_NB = 6
+QUALITES_HD = ['HD', '4K', 'Full HD']
+
+
+def compute_selection_du_jour(day):
     """
-    Retourne l'actrice mise en avant du jour avec ses informations principales
+    Tire la sélection du jour : actrice (pondérée par son nombre de scènes), 3 de ses scènes,
+    les ajouts récents puis des scènes de qualité pour compléter jusqu'à 6.
+    Générateur isolé, graine = la date : reproductible, sans toucher au module random.
+    Retourne (actrice_id, [[scene_id, type], ...]) ; actrice_id None si aucune actrice n'a de scène
+    """
+    rng = random.Random(day.toordinal())
+    selection = []
+
+    # 1. Actrice du jour et 3 de ses scènes
+    candidats = db.session.query(scene_actrice.c.actrice_id, db.func.count()).group_by(
+        scene_actrice.c.actrice_id).order_by(scene_actrice.c.actrice_id).all()
+    actrice_id = None
+    if candidats:
+        actrice_id = rng.choices([c[0] for c in candidats], weights=[c[1] for c in candidats])[0]
+        scene_ids = [row[0] for row in db.session.query(scene_actrice.c.scene_id).filter(
+            scene_actrice.c.actrice_id == actrice_id).order_by(scene_actrice.c.scene_id)]
+        selection.extend([sid, 'actrice_du_jour'] for sid in rng.sample(scene_ids, min(3, len(scene_ids))))
+
+    # 2. Scènes récentes
+    for (scene_id,) in db.session.query(Scene.id).filter(Scene.date_ajout.isnot(None)).order_by(
+            Scene.date_ajout.desc(), Scene.id.desc()).limit(3):
+        if len(selection) < SCENES_DU_JOUR_NB:
+            selection.append([scene_id, 'recent'])
+
+    # 3. Compléter avec des scènes de qualité
+    if len(selection) < SCENES_DU_JOUR_NB:
+        deja = {sid for sid, _ in selection}
+        quality_ids = [row[0] for row in db.session.query(Scene.id).filter(
+            Scene.qualite.in_(QUALITES_HD)).order_by(Scene.id) if row[0] not in deja]
+        nb = min(SCENES_DU_JOUR_NB - len(selection), len(quality_ids))
+        selection.extend([sid, 'quality'] for sid in rng.sample(quality_ids, nb))
+
+    return actrice_id, selection
+
+
+def get_selection_du_jour(day):
+    """
+    Sélection du jour stockée dans selections_du_jour (lecture par clé primaire).
+    Calculée et enregistrée au premier appel de la journée ; recalculée si l'actrice
+    retenue a été supprimée depuis.
     """
+    snapshot = db.session.get(SelectionDuJour, day)
+    if snapshot and (snapshot.actrice_id is None or db.session.get(Actrice, snapshot.actrice_id)):
+        return snapshot
+
+    actrice_id, selection = compute_selection_du_jour(day)
+    if actrice_id is None:
+        # Bibliothèque vide : rien à figer, on réessaiera au prochain appel
+        return SelectionDuJour(date=day, actrice_id=None, scenes=json.dumps(selection))
+
+    if snapshot:
+        snapshot.actrice_id = actrice_id
+        snapshot.scenes = json.dumps(selection)
+        snapshot.date_calcul = datetime.now()
+    else:
+        snapshot = SelectionDuJour(date=day, actrice_id=actrice_id, scenes=json.dumps(selection),
+                                   date_calcul=datetime.now())
+        db.session.add(snapshot)
     try:
-        # Logique pour sélectionner l'actrice du jour
-        # Sélection basée sur la date du jour pour avoir une consistance
-        actrices_avec_scenes = db.session.query(Actrice).join(Actrice.scenes).all()
+        db.session.commit()
+    except IntegrityError:
+        # Calculée en parallèle par une autre requête : on relit celle-ci
+        db.session.rollback()
+        snapshot = db.session.get(SelectionDuJour, day)
+    return snapshot
 
-        if not actrices_avec_scenes:
-            # Données fallback si pas d'actrices
-            return jsonify({
-                "nom": "Stacy Rouse",
-                "photo": "/static/img/actrices/stacy_rouse.jpg",
-                "nb_scenes": 42,
-                "note_moyenne": 4.8,
-                "id": 1,
-                "bio": "Actrice iconique, star de nombreuses scènes glamour.",
-                "tags": ["glamour", "milf", "star"]
-            })
 
-        # Sélection déterministe basée sur la date
-        today_seed = datetime.now().day
-        random.seed(today_seed)
-        actrice = random.choice(actrices_avec_scenes)
+def build_actrice_du_jour(ctx):
+    """Actrice de la sélection du jour, avec ses informations principales"""
+    actrice_id = ctx.selection_du_jour.actrice_id
+    actrice = db.session.get(Actrice, actrice_id) if actrice_id else None
+    if not actrice:
+        # Données fallback si pas d'actrices
+        return ACTRICE_DU_JOUR_FALLBACK
 
-        # Calcul du nombre de scènes
-        nb_scenes = len(actrice.scenes)
+    nb_scenes = db.session.query(db.func.count()).select_from(scene_actrice).filter(
+        scene_actrice.c.actrice_id == actrice.id).scalar()
 
-        # Calcul de la note moyenne
-        notes = [scene.note_perso for scene in actrice.scenes if scene.note_perso]
-        note_moyenne = 4.5  # Default
-        if notes:
-            try:
-                notes_float = []
-                for note in notes:
-                    if isinstance(note, str):
-                        match = re.search(r'(\d+(?:\.\d+)?)', note)
-                        if match:  # Vérifier que match n'est pas None
-                            notes_float.append(float(match.group(1)))
-                    elif isinstance(note, (int, float)):
-                        notes_float.append(float(note))
-
-                if notes_float:
-                    max_note = max(notes_float)
-                    if max_note > 5:
-                        notes_float = [n * 5 / max_note for n in notes_float]
-                    note_moyenne = round(sum(notes_float) / len(notes_float), 1)
-            except Exception as e:
-                print(f"Erreur calcul note moyenne: {e}")
-                note_moyenne = 4.5
+    # Note moyenne maintenue par les agrégats (notes normalisées sur 5)
+    note_moyenne = round(actrice.note_somme / actrice.note_count, 1) if actrice.note_count else 4.5  # Default
 
-        # Tags typiques
-        tags = []
-        if actrice.tags_typiques:
-            tags = [tag.strip() for tag in actrice.tags_typiques.split(',')]
+    # Tags typiques
+    tags = []
+    if actrice.tags_typiques:
+        tags = [tag.strip() for tag in actrice.tags_typiques.split(',')]
 
-        # Construire l'URL photo correctement
-        photo_url = "/static/img/default_actress.jpg"
-        if actrice.photo:
-            try:
-                # Extraire le nom de fichier du chemin complet
-                filename = os.path.basename(actrice.photo)
-                encoded_name = quote(actrice.nom, safe='')
-                photo_url = f"/images/{encoded_name}/{quote(filename, safe='')}"
-            except Exception as e:
-                print(f"Erreur construction URL photo: {e}")
+    return {
+        "nom": actrice.nom,
+        "photo": actress_photo_url(actrice.nom, actrice.photo, "/static/img/default_actress.jpg"),
+        "nb_scenes": nb_scenes,
+        "note_moyenne": note_moyenne,
+        "id": actrice.id,
+        "bio": actrice.biographie or f"Découvrez {actrice.nom}, une actrice talentueuse avec {nb_scenes} scènes à son actif.",
+        "tags": tags[:3] if tags else ["star", "premium"]
+    }
 
-        return jsonify({
-            "nom": actrice.nom,
-            "photo": photo_url,
-            "nb_scenes": nb_scenes,
-            "note_moyenne": note_moyenne,
-            "id": actrice.id,
-            "bio": actrice.biographie or f"Découvrez {actrice.nom}, une actrice talentueuse avec {nb_scenes} scènes à son actif.",
-            "tags": tags[:3] if tags else ["star", "premium"]
-        })
+
+@app.route('/api/actrice_du_jour')
+def actrice_du_jour():
+    """
+    Retourne l'actrice mise en avant du jour avec ses informations principales
+    """
+    try:
+        return jsonify(home_section('actrice_du_jour', HomeContext()))
 
     except Exception as e:
         print(f"Erreur actrice_du_jour: {e}")
-        return jsonify({
-            "nom": "Stacy Rouse",
-            "photo": "/static/img/actrices/stacy_rouse.jpg",
-            "nb_scenes": 42,
-            "note_moyenne": 4.8,
-            "id": 1,
-            "bio": "Actrice iconique, star de nombreuses scènes glamour.",
-            "tags": ["glamour", "milf", "star"]
-        })
+        return jsonify(ACTRICE_DU_JOUR_FALLBACK)
 
 
 def construct_miniature_url(scene):
@@ -309,268 +1190,313 @@ def construct_miniature_url(scene):
     return "/static/img/default_scene.jpg"
 
 
+SCENES_DU_JOUR_FALLBACK = [
+    {
+        "id": 1,
+        "titre": "Scène Premium #1",
+        "miniature": "/static/img/scenes/premium1.jpg",
+        "duree": 32,
+        "note": 4.8,
+        "tags": ["hot", "premium"],
+        "type": "featured"
+    }
+]
+
+
+def build_scenes_du_jour(ctx):
+    """Scènes de la sélection du jour (les scènes supprimées depuis sont ignorées)"""
+    selection = json.loads(ctx.selection_du_jour.scenes or '[]')
+    scenes = {scene.id: scene for scene in db.session.query(
+        Scene.id, Scene.titre, Scene.image, Scene.duree, Scene.qualite
+    ).filter(Scene.id.in_([sid for sid, _ in selection]))}
+
+    scenes_selection = []
+    for scene_id, scene_type in selection:
+        scene = scenes.get(scene_id)
+        if not scene:
+            continue
+        if scene_type == 'actrice_du_jour':
+            duree, note, tags = scene.duree or 30, 4.5, ["actrice du jour", "premium"]
+        elif scene_type == 'recent':
+            duree, note, tags = scene.duree or 25, 4.3, ["nouveau", "récent"]
+        else:
+            duree, note, tags = scene.duree or 28, 4.4, ["hot", scene.qualite.lower() if scene.qualite else "hd"]
+        scenes_selection.append({
+            "id": scene.id,
+            "titre": scene.titre,
+            "miniature": construct_miniature_url(scene),
+            "duree": duree,
+            "note": note,
+            "tags": tags,
+            "type": scene_type
+        })
+
+    # Fallback si pas de scènes
+    return scenes_selection[:SCENES_DU_JOUR_NB] or SCENES_DU_JOUR_FALLBACK
+
+
 @app.route('/api/scenes_du_jour')
 def scenes_du_jour():
     """
     Retourne une sélection de scènes à mettre en avant aujourd'hui
     """
     try:
-        scenes_selection = []
-
-        # 1. Récupérer l'actrice du jour et ses scènes (2-3 scènes)
-        actrice_response = actrice_du_jour()
-        actrice_data = actrice_response.get_json()
-        actrice_id = actrice_data.get('id')
-
-        if actrice_id and actrice_id != 1:  # Éviter le fallback
-            actrice = db.session.get(Actrice, actrice_id)  # Fix: Utiliser db.session.get()
-            if actrice and actrice.scenes:
-                scenes_actrice = random.sample(actrice.scenes, min(3, len(actrice.scenes)))
-                for scene in scenes_actrice:
-                    scenes_selection.append({
-                        "id": scene.id,
-                        "titre": scene.titre,
-                        "miniature": construct_miniature_url(scene),
-                        "duree": scene.duree or 30,
-                        "note": 4.5,
-                        "tags": ["actrice du jour", "premium"],
-                        "type": "actrice_du_jour"
-                    })
-
-        # 2. Scènes récentes (2-3 scènes)
-        scenes_recentes = Scene.query.filter(Scene.date_ajout.isnot(None)).order_by(Scene.date_ajout.desc()).limit(
-            3).all()
-        for scene in scenes_recentes:
-            if len(scenes_selection) < 6:
-                scenes_selection.append({
-                    "id": scene.id,
-                    "titre": scene.titre,
-                    "miniature": construct_miniature_url(scene),
-                    "duree": scene.duree or 25,
-                    "note": 4.3,
-                    "tags": ["nouveau", "récent"],
-                    "type": "recent"
-                })
-
-        # 3. Compléter avec des scènes de qualité
-        if len(scenes_selection) < 6:
-            scenes_quality = Scene.query.filter(Scene.qualite.in_(['HD', '4K', 'Full HD'])).all()
-            if scenes_quality:
-                scenes_random = random.sample(scenes_quality, min(6 - len(scenes_selection), len(scenes_quality)))
-                for scene in scenes_random:
-                    scenes_selection.append({
-                        "id": scene.id,
-                        "titre": scene.titre,
-                        "miniature": construct_miniature_url(scene),
-                        "duree": scene.duree or 28,
-                        "note": 4.4,
-                        "tags": ["hot", scene.qualite.lower() if scene.qualite else "hd"],
-                        "type": "quality"
-                    })
-
-        # Fallback si pas de scènes
-        if not scenes_selection:
-            scenes_selection = [
-                {
-                    "id": 1,
-                    "titre": "Scène Premium #1",
-                    "miniature": "/static/img/scenes/premium1.jpg",
-                    "duree": 32,
-                    "note": 4.8,
-                    "tags": ["hot", "premium"],
-                    "type": "featured"
-                }
-            ]
-
-        return jsonify(scenes_selection[:6])
+        return jsonify(home_section('scenes_du_jour', HomeContext()))
 
     except Exception as e:
         print(f"Erreur scenes_du_jour: {e}")
-        return jsonify([
-            {
-                "id": 1,
-                "titre": "Scène Premium #1",
-                "miniature": "/static/img/scenes/premium1.jpg",
-                "duree": 32,
-                "note": 4.8,
-                "tags": ["hot", "premium"],
-                "type": "featured"
-            }
-        ])
+        return jsonify(SCENES_DU_JOUR_FALLBACK)
 
-@app.route('/api/collections_favorites')
-def collections_favorites():
-    try:
-        collections = []
 
-        # 1. Collection "Mes Favoris"
-        favoris = Favorite.query.all()
-        if favoris:
-            collections.append({
-                "id": "favoris",
-                "titre": "Mes Favoris ❤️",
-                "image": "/collections/favoris.png",
-                "nb_videos": len(favoris),
-                "nb_vues": sum([len(fav.scene.histories) if fav.scene else 0 for fav in favoris]),
-                "type": "favoris"
-            })
+COLLECTIONS_TABLES = ('scenes', 'actrices', 'favorites', 'history', 'tags')
+# Durée de vie du cache : les images de collection sur disque et la fenêtre
+# "ajouts récents" (30 jours) changent sans écriture en base
+COLLECTIONS_CACHE_TTL = 300
+COLLECTIONS_NB_ACTRICES = 6
+HOT_TAGS = ('hot', 'sexy', 'intense', 'hardcore')
 
-        # 2. Collections par actrices populaires (augmenté à 6) avec données enrichies
-        actrices_populaires = db.session.query(Actrice).join(Actrice.scenes).group_by(Actrice.id).order_by(
-            db.func.count(Scene.id).desc()).limit(6).all()
-
-        # Déterminer l'actrice la plus regardée
-        top_actress_id = None
-        if actrices_populaires:
-            actress_views = {}
-            for actrice in actrices_populaires:
-                total_views = sum([len(scene.histories) for scene in actrice.scenes if scene.histories])
-                actress_views[actrice.id] = total_views
-
-            if actress_views:
-                top_actress_id = max(actress_views, key=actress_views.get)
-
-        for actrice in actrices_populaires:
-            # Calculer le nombre de scènes "hot" (note élevée ou tags spéciaux)
-            hot_scenes_count = 0
-            total_note = 0
-            note_count = 0
-
-            for scene in actrice.scenes:
-                # Compter les scènes avec note élevée (>= 4.0)
-                if scene.note_perso:
-                    try:
-                        if isinstance(scene.note_perso, str):
-                            match = re.search(r'(\d+(?:\.\d+)?)', scene.note_perso)
-                            if match:
-                                note = float(match.group(1))
-                                if note > 5:  # Normaliser si note sur plus de 5
-                                    note = note * 5 / 10  # Exemple: note sur 10 -> sur 5
-                                total_note += note
-                                note_count += 1
-                                if note >= 4.0:
-                                    hot_scenes_count += 1
-                        elif isinstance(scene.note_perso, (int, float)):
-                            note = float(scene.note_perso)
-                            if note > 5:
-                                note = note * 5 / 10
-                            total_note += note
-                            note_count += 1
-                            if note >= 4.0:
-                                hot_scenes_count += 1
-                    except:
-                        pass
+COLLECTIONS_FALLBACK = [
+    {
+        "id": "premium",
+        "titre": "Collection Premium",
+        "image": "/collections/premium.png",
+        "nb_videos": 25,
+        "nb_vues": 156,
+        "type": "premium"
+    }
+]
 
-                # Compter les scènes avec tags "hot"
-                if scene.tags:
-                    for tag in scene.tags:
-                        if tag.nom.lower() in ['hot', 'sexy', 'intense', 'hardcore']:
-                            hot_scenes_count += 1
-                            break
 
-            # Calculer la note moyenne
-            note_moyenne = total_note / note_count if note_count > 0 else 0
+def best_scene_by_actrice(actrice_ids):
+    """
+    Meilleure scène (note la plus haute, puis plus petit id) de chaque actrice, en une requête
+    Retourne {actrice_id: ligne (id, image)}
+    """
+    if not actrice_ids:
+        return {}
+    rows = db.session.execute(text(
+        "SELECT actrice_id, id, image FROM ("
+        "  SELECT sa.actrice_id, s.id, s.image, ROW_NUMBER() OVER ("
+        "    PARTITION BY sa.actrice_id ORDER BY s.note_value IS NULL, s.note_value DESC, s.id) AS rang"
+        "  FROM scene_actrice sa JOIN scenes s ON s.id = sa.scene_id"
+        "  WHERE sa.actrice_id IN :ids"
+        ") WHERE rang = 1"
+    ).bindparams(bindparam('ids', expanding=True)), {"ids": list(actrice_ids)})
+    return {row.actrice_id: row for row in rows}
+
+
+def build_collections_favorites(ctx=None):
+    """
+    Construit les cartes de collections à partir de requêtes d'agrégat
+    (aucun chargement paresseux de scènes, historiques ou tags)
+    """
+    collections = []
+
+    # 1. Collection "Mes Favoris" : nb_vues = entrées d'historique des scènes favorites
+    nb_favoris = db.session.query(db.func.count(Favorite.id)).scalar()
+    if nb_favoris:
+        nb_vues_favoris = db.session.query(db.func.count(History.id)).join(
+            Favorite, Favorite.scene_id == History.scene_id
+        ).join(Scene, Scene.id == Favorite.scene_id).scalar()
+        collections.append({
+            "id": "favoris",
+            "titre": "Mes Favoris ❤️",
+            "image": "/collections/favoris.png",
+            "nb_videos": nb_favoris,
+            "nb_vues": nb_vues_favoris,
+            "type": "favoris"
+        })
 
-            collections.append({
-                "id": f"actrice_{actrice.id}",
-                "titre": f"Collection {actrice.nom}",
-                "image": get_actrice_collection_image(actrice),
-                "nb_videos": len(actrice.scenes),
-                "nb_vues": sum([len(scene.histories) for scene in actrice.scenes if scene.histories]),
-                "type": "actrice",
-                # ✨ NOUVELLES DONNÉES pour les badges
-                "is_top_actress": actrice.id == top_actress_id,
-                "hot_scenes_count": hot_scenes_count,
-                "note_moyenne": round(note_moyenne, 1) if note_moyenne > 0 else None
-            })
+    # 2. Collections par actrices populaires (les 6 avec le plus de scènes)
+    nb_scenes_col = db.func.count(scene_actrice.c.scene_id)
+    actrices_populaires = db.session.query(Actrice.id, Actrice.nom, Actrice.photo, nb_scenes_col).join(
+        scene_actrice, scene_actrice.c.actrice_id == Actrice.id
+    ).group_by(Actrice.id).order_by(nb_scenes_col.desc(), Actrice.id).limit(COLLECTIONS_NB_ACTRICES).all()
+    actrice_ids = [a.id for a in actrices_populaires]
+
+    notes = {}
+    vues = {}
+    scenes_tag_hot = {}
+    if actrice_ids:
+        # Notes : moyenne et nombre de scènes notées >= 4
+        for actrice_id, note_avg, nb_notes_hautes in db.session.query(
+                scene_actrice.c.actrice_id,
+                db.func.avg(Scene.note_value),
+                db.func.sum(db.case((Scene.note_value >= 4.0, 1), else_=0))
+        ).join(Scene, Scene.id == scene_actrice.c.scene_id).filter(
+            scene_actrice.c.actrice_id.in_(actrice_ids)
+        ).group_by(scene_actrice.c.actrice_id):
+            notes[actrice_id] = (note_avg, nb_notes_hautes or 0)
+
+        # Vues : entrées d'historique des scènes de chaque actrice
+        vues = dict(db.session.query(scene_actrice.c.actrice_id, db.func.count(History.id)).join(
+            History, History.scene_id == scene_actrice.c.scene_id
+        ).filter(scene_actrice.c.actrice_id.in_(actrice_ids)).group_by(scene_actrice.c.actrice_id).all())
+
+        # Scènes portant au moins un tag "hot"
+        scenes_tag_hot = dict(db.session.query(
+            scene_actrice.c.actrice_id, db.func.count(db.distinct(scene_actrice.c.scene_id))
+        ).join(scene_tag, scene_tag.c.scene_id == scene_actrice.c.scene_id).join(
+            Tag, Tag.id == scene_tag.c.tag_id
+        ).filter(
+            scene_actrice.c.actrice_id.in_(actrice_ids), db.func.lower(Tag.nom).in_(HOT_TAGS)
+        ).group_by(scene_actrice.c.actrice_id).all())
+
+    best_scenes = best_scene_by_actrice(actrice_ids)
+
+    # Actrice la plus regardée parmi les populaires (la plus populaire en cas d'égalité)
+    top_actress_id = max(actrice_ids, key=lambda aid: vues.get(aid, 0)) if actrice_ids else None
+
+    for actrice in actrices_populaires:
+        note_avg, nb_notes_hautes = notes.get(actrice.id, (None, 0))
+        # Une scène compte pour sa note élevée et pour ses tags "hot"
+        hot_scenes_count = nb_notes_hautes + scenes_tag_hot.get(actrice.id, 0)
+
+        collections.append({
+            "id": f"actrice_{actrice.id}",
+            "titre": f"Collection {actrice.nom}",
+            "image": get_actrice_collection_image(actrice, best_scenes.get(actrice.id)),
+            "nb_videos": actrice[3],
+            "nb_vues": vues.get(actrice.id, 0),
+            "type": "actrice",
+            # ✨ NOUVELLES DONNÉES pour les badges
+            "is_top_actress": actrice.id == top_actress_id,
+            "hot_scenes_count": hot_scenes_count,
+            "note_moyenne": round(note_avg, 1) if note_avg and note_avg > 0 else None
+        })
 
-        # 3. Collection HD Premium
-        hd_count = Scene.query.filter(Scene.qualite.in_(['HD', '4K', 'Full HD'])).count()
-        if hd_count > 0:
-            collections.append({
-                "id": "hd_premium",
-                "titre": "HD Premium",
-                "image": "/collections/hd_premium.png",
-                "nb_videos": hd_count,
-                "nb_vues": 200,
-                "type": "qualite"
-            })
+    # 3. Collection HD Premium
+    hd_count = Scene.query.filter(Scene.qualite.in_(['HD', '4K', 'Full HD'])).count()
+    if hd_count > 0:
+        collections.append({
+            "id": "hd_premium",
+            "titre": "HD Premium",
+            "image": "/collections/hd_premium.png",
+            "nb_videos": hd_count,
+            "nb_vues": 200,
+            "type": "qualite"
+        })
 
-        # 4. Collection par studio populaire
-        studios_populaires = db.session.query(Scene.studio, db.func.count(Scene.id).label('count')).filter(
-            Scene.studio.isnot(None)
-        ).group_by(Scene.studio).order_by(db.func.count(Scene.id).desc()).limit(2).all()
-
-        for studio, count in studios_populaires:
-            if count > 3:  # Seulement si le studio a plus de 3 scènes
-                collections.append({
-                    "id": f"studio_{studio.replace(' ', '_').lower()}",
-                    "titre": f"Collection {studio}",
-                    "image": "/collections/studio_default.png",
-                    "nb_videos": count,
-                    "nb_vues": count * 15,
-                    "type": "studio"
-                })
+    # 4. Collection par studio populaire
+    studios_populaires = db.session.query(Scene.studio, db.func.count(Scene.id).label('count')).filter(
+        Scene.studio.isnot(None)
+    ).group_by(Scene.studio).order_by(db.func.count(Scene.id).desc()).limit(2).all()
 
-        # 5. Collection par site populaire
-        sites_populaires = db.session.query(Scene.site, db.func.count(Scene.id).label('count')).filter(
-            Scene.site.isnot(None)
-        ).group_by(Scene.site).order_by(db.func.count(Scene.id).desc()).limit(2).all()
-
-        for site, count in sites_populaires:
-            if count > 3:  # Seulement si le site a plus de 3 scènes
-                collections.append({
-                    "id": f"site_{site.replace(' ', '_').lower()}",
-                    "titre": f"Collection {site}",
-                    "image": "/collections/site_default.png",
-                    "nb_videos": count,
-                    "nb_vues": count * 12,
-                    "type": "site"
-                })
+    for studio, count in studios_populaires:
+        if count > 3:  # Seulement si le studio a plus de 3 scènes
+            collections.append({
+                "id": f"studio_{studio.replace(' ', '_').lower()}",
+                "titre": f"Collection {studio}",
+                "image": "/collections/studio_default.png",
+                "nb_videos": count,
+                "nb_vues": count * 15,
+                "type": "studio"
+            })
 
-        # 6. Collection des scènes récentes
-        recent_count = Scene.query.filter(
-            Scene.date_ajout >= (datetime.now() - timedelta(days=30)).date()).count() if Scene.query.filter(
-            Scene.date_ajout.isnot(None)).first() else 0
+    # 5. Collection par site populaire
+    sites_populaires = db.session.query(Scene.site, db.func.count(Scene.id).label('count')).filter(
+        Scene.site.isnot(None)
+    ).group_by(Scene.site).order_by(db.func.count(Scene.id).desc()).limit(2).all()
 
-        if recent_count > 0:
+    for site, count in sites_populaires:
+        if count > 3:  # Seulement si le site a plus de 3 scènes
             collections.append({
-                "id": "recent",
-                "titre": "Ajouts Récents",
-                "image": "/collections/recent.png",
-                "nb_videos": recent_count,
-                "nb_vues": recent_count * 8,
-                "type": "recent"
+                "id": f"site_{site.replace(' ', '_').lower()}",
+                "titre": f"Collection {site}",
+                "image": "/collections/site_default.png",
+                "nb_videos": count,
+                "nb_vues": count * 12,
+                "type": "site"
             })
 
-        # Fallback si pas de collections
-        if not collections:
-            collections = [
-                {
-                    "id": "premium",
-                    "titre": "Collection Premium",
-                    "image": "/collections/premium.png",
-                    "nb_videos": 25,
-                    "nb_vues": 156,
-                    "type": "premium"
-                }
-            ]
+    # 6. Collection des scènes récentes
+    recent_count = Scene.query.filter(
+        Scene.date_ajout >= (datetime.now() - timedelta(days=30)).date()).count()
+
+    if recent_count > 0:
+        collections.append({
+            "id": "recent",
+            "titre": "Ajouts Récents",
+            "image": "/collections/recent.png",
+            "nb_videos": recent_count,
+            "nb_vues": recent_count * 8,
+            "type": "recent"
+        })
+
+    # Fallback si pas de collections ; retourner jusqu'à 8 collections au lieu de 4
+    return collections[:8] or COLLECTIONS_FALLBACK
+
 
-        # Retourner jusqu'à 8 collections au lieu de 4
-        return jsonify(collections[:8])
+@app.route('/api/collections_favorites')
+def collections_favorites():
+    try:
+        return jsonify(home_section('collections', HomeContext()))
 
     except Exception as e:
         print(f"Erreur collections_favorites: {e}")
-        return jsonify([
-            {
-                "id": "premium",
-                "titre": "Collection Premium",
-                "image": "/collections/premium.png",
-                "nb_videos": 25,
-                "nb_vues": 156,
-                "type": "premium"
-            }
-        ])
+        return jsonify(COLLECTIONS_FALLBACK)
+
+STATS_FALLBACK = {
+    "total_videos": 150,
+    "heures_visionnage": 42.5,
+    "top_actrice": {
+        "nom": "Sarah Connor",
+        "portrait": "/static/img/top_actress.jpg",
+        "nb_vues": 15
+    },
+    "nb_favoris": 23,
+    "nouvelles_scenes": 5,
+    "total_actrices": 45,
+    "videos_regardees": 67
+}
+
+
+def build_stats(ctx):
+    """Statistiques de visionnage et de la collection"""
+    # Compteurs de la collection, en une requête
+    total_scenes, nb_favoris, total_actrices, videos_regardees, nouvelles_scenes = db.session.execute(text(
+        "SELECT (SELECT count(*) FROM scenes), (SELECT count(*) FROM favorites), (SELECT count(*) FROM actrices), "
+        "(SELECT count(DISTINCT scene_id) FROM history), "
+        "(SELECT count(*) FROM scenes WHERE date_ajout >= :une_semaine)"
+    ), {"une_semaine": (datetime.now() - timedelta(days=7)).date().isoformat()}).one()
+
+    # Temps total de visionnage : durée de la scène x nombre de vues
+    temps_total = db.session.query(
+        db.func.sum(Scene.duree * db.func.coalesce(History.nb_vues, 1))
+    ).select_from(History).join(Scene, Scene.id == History.scene_id).scalar() or 0
+    heures_visionnage = round(temps_total / 60, 1) if temps_total > 0 else 0
+
+    # Top actrice regardée : vues cumulées de ses scènes (la première vue l'emporte en cas d'égalité)
+    vues_col = db.func.sum(db.func.coalesce(History.nb_vues, 1))
+    top = db.session.query(Actrice.nom, Actrice.photo, vues_col.label('vues')).join(
+        scene_actrice, scene_actrice.c.actrice_id == Actrice.id
+    ).join(History, History.scene_id == scene_actrice.c.scene_id).group_by(Actrice.id).order_by(
+        vues_col.desc(), db.func.min(History.id)).first()
+
+    if top:
+        top_actrice = {
+            "nom": top.nom,
+            # Construire l'URL portrait correctement (même logique que actrice_du_jour)
+            "portrait": actress_photo_url(top.nom, top.photo, "/static/img/default_actress_mini.jpg"),
+            "nb_vues": top.vues
+        }
+    else:
+        top_actrice = {
+            "nom": "En cours...",
+            "portrait": "/static/img/default_actress_mini.jpg",
+            "nb_vues": 0
+        }
+
+    return {
+        "total_videos": total_scenes,
+        "heures_visionnage": heures_visionnage,
+        "top_actrice": top_actrice,
+        "nb_favoris": nb_favoris,
+        "nouvelles_scenes": nouvelles_scenes,
+        "total_actrices": total_actrices,
+        "videos_regardees": videos_regardees
+    }
+
 
 @app.route('/api/stats')
 def get_stats():
@@ -578,93 +1504,57 @@ def get_stats():
     Retourne les statistiques de visionnage et de la collection
     """
     try:
-        # Nombre total de scènes
-        total_scenes = Scene.query.count()
-
-        # Temps total de visionnage
-        histories = History.query.all()
-        temps_total = 0
-        for history in histories:
-            if history.scene and history.scene.duree:
-                temps_total += history.scene.duree
-        heures_visionnage = round(temps_total / 60, 1) if temps_total > 0 else 0
-
-        # Top actrice regardée
-        top_actrice = None
-        if histories:
-            actrice_vues = {}
-            for history in histories:
-                if history.scene:
-                    for actrice in history.scene.actrices:
-                        if actrice.id not in actrice_vues:
-                            actrice_vues[actrice.id] = {
-                                'actrice': actrice,
-                                'vues': 0
-                            }
-                        actrice_vues[actrice.id]['vues'] += 1
-
-            if actrice_vues:
-                top_actrice_data = max(actrice_vues.values(), key=lambda x: x['vues'])
-                actrice = top_actrice_data['actrice']
-
-                # Construire l'URL portrait correctement (même logique que actrice_du_jour)
-                portrait_url = "/static/img/default_actress_mini.jpg"
-                if actrice.photo:
-                    try:
-                        # Extraire le nom de fichier du chemin complet
-                        filename = os.path.basename(actrice.photo)
-                        encoded_name = quote(actrice.nom, safe='')
-                        portrait_url = f"/images/{encoded_name}/{quote(filename, safe='')}"
-                    except Exception as e:
-                        print(f"Erreur construction URL portrait: {e}")
-
-                top_actrice = {
-                    "nom": actrice.nom,
-                    "portrait": portrait_url,
-                    "nb_vues": top_actrice_data['vues']
-                }
-
-        if not top_actrice:
-            top_actrice = {
-                "nom": "En cours...",
-                "portrait": "/static/img/default_actress_mini.jpg",
-                "nb_vues": 0
-            }
-
-        # Autres stats
-        nb_favoris = Favorite.query.count()
-        une_semaine = datetime.now() - timedelta(days=7)
-        nouvelles_scenes = Scene.query.filter(Scene.date_ajout >= une_semaine.date()).count() if Scene.query.filter(
-            Scene.date_ajout.isnot(None)).first() else 0
-
-        # Nombre de vidéos uniques regardées (dans l'historique)
-        videos_regardees = History.query.with_entities(History.scene_id).distinct().count()
-
-        return jsonify({
-            "total_videos": total_scenes,
-            "heures_visionnage": heures_visionnage,
-            "top_actrice": top_actrice,
-            "nb_favoris": nb_favoris,
-            "nouvelles_scenes": nouvelles_scenes,
-            "total_actrices": Actrice.query.count(),
-            "videos_regardees": videos_regardees
-        })
+        return jsonify(home_section('stats', HomeContext()))
 
     except Exception as e:
         print(f"Erreur stats: {e}")
-        return jsonify({
-            "total_videos": 150,
-            "heures_visionnage": 42.5,
-            "top_actrice": {
-                "nom": "Sarah Connor",
-                "portrait": "/static/img/top_actress.jpg",
-                "nb_vues": 15
-            },
-            "nb_favoris": 23,
-            "nouvelles_scenes": 5,
-            "total_actrices": 45,
-            "videos_regardees": 67
-        })
+        return jsonify(STATS_FALLBACK)
+
+
+SUGGESTIONS_FALLBACK = [
+    {
+        "id": 1,
+        "titre": "Suggestion Premium",
+        "miniature": "/static/img/suggestions/default.jpg",
+        "duree": 30,
+        "note": 4.5,
+        "raison": "Recommandé pour vous",
+        "type": "featured"
+    }
+]
+
+
+def build_suggestions(ctx):
+    """Suggestions personnalisées basées sur les actrices de l'historique récent"""
+    suggestions = []
+
+    # Basé sur l'historique récent (5 dernières entrées)
+    recent_histories = ctx.recent_history
+    actrice_ids_vues = {row[0] for row in db.session.query(scene_actrice.c.actrice_id).filter(
+        scene_actrice.c.scene_id.in_([h.scene_id for h in recent_histories]))} if recent_histories else set()
+
+    # Suggérer des scènes d'actrices similaires
+    if actrice_ids_vues:
+        scenes_similaires = db.session.query(Scene.id, Scene.titre, Scene.image, Scene.duree).join(
+            scene_actrice, scene_actrice.c.scene_id == Scene.id
+        ).filter(
+            scene_actrice.c.actrice_id.in_(actrice_ids_vues),
+            ~Scene.id.in_([h.scene_id for h in recent_histories])
+        ).distinct().limit(4).all()
+
+        for scene in scenes_similaires:
+            suggestions.append({
+                "id": scene.id,
+                "titre": scene.titre,
+                "miniature": construct_miniature_url(scene),
+                "duree": scene.duree or 30,
+                "note": 4.4,
+                "raison": "Basé sur vos goûts récents",
+                "type": "similar_actress"
+            })
+
+    # Fallback
+    return suggestions[:4] or SUGGESTIONS_FALLBACK
 
 
 @app.route('/api/suggestions')
@@ -673,65 +1563,56 @@ def get_suggestions():
     Retourne des suggestions personnalisées basées sur l'historique
     """
     try:
-        suggestions = []
-
-        # Basé sur l'historique récent
-        recent_histories = History.query.order_by(History.date_vue.desc()).limit(5).all()
-        actrice_ids_vues = set()
-
-        for history in recent_histories:
-            if history.scene:
-                for actrice in history.scene.actrices:
-                    actrice_ids_vues.add(actrice.id)
-
-        # Suggérer des scènes d'actrices similaires
-        if actrice_ids_vues:
-            scenes_similaires = Scene.query.join(Scene.actrices).filter(
-                Actrice.id.in_(actrice_ids_vues)
-            ).filter(
-                ~Scene.id.in_([h.scene_id for h in recent_histories if h.scene_id])
-            ).limit(4).all()
-
-            for scene in scenes_similaires:
-                suggestions.append({
-                    "id": scene.id,
-                    "titre": scene.titre,
-                    "miniature": construct_miniature_url(scene),
-                    "duree": scene.duree or 30,
-                    "note": 4.4,
-                    "raison": "Basé sur vos goûts récents",
-                    "type": "similar_actress"
-                })
-
-        # Fallback
-        if not suggestions:
-            suggestions = [
-                {
-                    "id": 1,
-                    "titre": "Suggestion Premium",
-                    "miniature": "/static/img/suggestions/default.jpg",
-                    "duree": 30,
-                    "note": 4.5,
-                    "raison": "Recommandé pour vous",
-                    "type": "featured"
-                }
-            ]
-
-        return jsonify(suggestions[:4])
+        return jsonify(home_section('suggestions', HomeContext()))
 
     except Exception as e:
         print(f"Erreur suggestions: {e}")
-        return jsonify([
-            {
-                "id": 1,
-                "titre": "Suggestion Premium",
-                "miniature": "/static/img/suggestions/default.jpg",
-                "duree": 30,
-                "note": 4.5,
-                "raison": "Recommandé pour vous",
-                "type": "featured"
-            }
-        ])
+        return jsonify(SUGGESTIONS_FALLBACK)
+
+
+# Sections de l'accueil : nom -> (builder, tables dont elle dépend, TTL, fallback)
+# Les sections "du jour" sont en plus indexées par la date (voir home_section)
+HOME_SECTIONS = {
+    'actrice_du_jour': (build_actrice_du_jour, ('actrices', 'scenes', 'selections_du_jour'), None,
+                        ACTRICE_DU_JOUR_FALLBACK),
+    'scenes_du_jour': (build_scenes_du_jour, ('actrices', 'scenes', 'selections_du_jour'), None,
+                       SCENES_DU_JOUR_FALLBACK),
+    'collections': (build_collections_favorites, COLLECTIONS_TABLES, COLLECTIONS_CACHE_TTL, COLLECTIONS_FALLBACK),
+    'stats': (build_stats, ('scenes', 'actrices', 'favorites', 'history'), None, STATS_FALLBACK),
+    'suggestions': (build_suggestions, ('scenes', 'actrices', 'history'), None, SUGGESTIONS_FALLBACK),
+}
+
+
+def home_section(name, ctx):
+    """Retourne une section de l'accueil depuis le cache, ou la construit avec le contexte partagé"""
+    builder, tables, ttl, _ = HOME_SECTIONS[name]
+    # La date fait partie de la clé : sélections du jour et fenêtres "7 derniers jours"
+    return cache_get_or_build(('home', name, date.today().isoformat()), tables, lambda: builder(ctx), ttl=ttl)
+
+
+@app.route('/api/home')
+def get_home():
+    """
+    Toutes les sections de la page d'accueil en un seul appel
+    - sections : liste séparée par des virgules (défaut : toutes)
+    Une section en erreur est remplacée par son contenu de secours, sans bloquer les autres
+    """
+    names = get_list_arg('sections') or list(HOME_SECTIONS)
+    unknown = [name for name in names if name not in HOME_SECTIONS]
+    if unknown:
+        return jsonify({"error": f"Sections inconnues: {', '.join(unknown)}",
+                        "sections": list(HOME_SECTIONS)}), 400
+
+    ctx = HomeContext()
+    home = {}
+    for name in names:
+        try:
+            home[name] = home_section(name, ctx)
+        except Exception as e:
+            print(f"Erreur home ({name}): {e}")
+            db.session.rollback()
+            home[name] = HOME_SECTIONS[name][3]
+    return jsonify(home)
 
 
 @app.route('/api/surprends_moi', methods=['POST'])
@@ -816,163 +1697,425 @@ def surprends_moi():
         })
 
 
-def update_actrice_note_moyenne(actrice_id):
-    """Met à jour la note moyenne d'une actrice basée sur ses scènes"""
-    try:
-        actrice = db.session.get(Actrice, actrice_id)
-        if not actrice:
-            print(f"❌ Actrice {actrice_id} non trouvée")
-            return
+# ==================== AGRÉGATS DES ACTRICES ====================
+# note_moyenne et tags_typiques sont dérivés de compteurs maintenus par deltas
+# (actrices.note_somme / note_count et table actrice_tags) dans la transaction
+# de chaque écriture de scène, au lieu d'être recalculés depuis toutes ses scènes.
+# Le rafraîchissement des champs dérivés est fait en arrière-plan, après le commit.
 
-        print(f"🔍 Calcul note moyenne pour {actrice.nom} (ID: {actrice_id})")
-        print(f"📊 Nombre de scènes: {len(actrice.scenes)}")
+TAGS_GENERIQUES = {'hd', '4k', 'new', 'recent', 'premium', 'video', 'hot', 'sexy'}
+TAGS_TYPIQUES_MIN_OCCURRENCES = 2
+TAGS_TYPIQUES_MAX = 8
 
-        # Récupérer toutes les notes des scènes de cette actrice
-        notes = []
-        for i, scene in enumerate(actrice.scenes):
-            print(f"  📝 Scène {i + 1}: '{scene.titre}'")
-            print(f"      note_perso: '{scene.note_perso}' (type: {type(scene.note_perso)})")
 
-            if scene.note_perso:
-                try:
-                    note_value = None
-
-                    if isinstance(scene.note_perso, str):
-                        note_str = scene.note_perso.strip()
-
-                        # 1. Compter les étoiles ⭐️ ou ⭐
-                        star_count = note_str.count('⭐️') + note_str.count('⭐')
-                        if star_count > 0:
-                            note_value = float(star_count)
-                            print(f"      ⭐ {star_count} étoiles trouvées → note: {note_value}")
-
-                        # 2. Chercher un nombre explicite (ex: "4.5", "8/10")
-                        elif '/' in note_str:
-                            # Format "8/10" ou "4/5"
-                            match = re.search(r'(\d+(?:\.\d+)?)/(\d+(?:\.\d+)?)', note_str)
-                            if match:
-                                numerator = float(match.group(1))
-                                denominator = float(match.group(2))
-                                note_value = (numerator / denominator) * 5  # Normaliser sur 5
-                                print(f"      🔢 Fraction {numerator}/{denominator} → note: {note_value}")
-
-                        else:
-                            # Chercher un nombre simple
-                            match = re.search(r'(\d+(?:\.\d+)?)', note_str)
-                            if match:
-                                note_value = float(match.group(1))
-                                print(f"      🔢 Nombre trouvé: {note_value}")
-
-                        # Si aucun pattern reconnu, essayer d'assigner une note basée sur des mots-clés
-                        if note_value is None:
-                            note_str_lower = note_str.lower()
-                            if any(word in note_str_lower for word in ['excellent', 'parfait', 'incroyable', 'ouf']):
-                                note_value = 5.0
-                                print(f"      💯 Mot-clé 'excellent' → note: {note_value}")
-                            elif any(word in note_str_lower for word in ['très bon', 'super', 'top', 'génial']):
-                                note_value = 4.5
-                                print(f"      👍 Mot-clé 'très bon' → note: {note_value}")
-                            elif any(word in note_str_lower for word in ['bon', 'bien', 'cool', 'sympa']):
-                                note_value = 4.0
-                                print(f"      👌 Mot-clé 'bon' → note: {note_value}")
-                            elif any(word in note_str_lower for word in ['moyen', 'correct', 'ok']):
-                                note_value = 3.0
-                                print(f"      😐 Mot-clé 'moyen' → note: {note_value}")
-                            else:
-                                print(f"      ❓ Aucun pattern reconnu dans '{note_str}'")
-
-                    elif isinstance(scene.note_perso, (int, float)):
-                        note_value = float(scene.note_perso)
-                        print(f"      ✅ Note numérique: {note_value}")
-
-                    # Ajouter la note si trouvée
-                    if note_value is not None:
-                        # Normaliser si note > 5
-                        if note_value > 5:
-                            note_value = note_value * 5 / 10
-                            print(f"      📐 Note normalisée: {note_value}")
-                        notes.append(note_value)
-
-                except Exception as e:
-                    print(f"      ❌ Erreur parsing note: {e}")
-                    continue
-            else:
-                print(f"      ⚪ Pas de note")
+def normalize_tag_name(nom):
+    return nom.lower().strip()
 
-        print(f"📋 Notes collectées: {notes}")
 
-        # Calculer la moyenne
-        if notes:
-            moyenne = sum(notes) / len(notes)
-            actrice.note_moyenne = round(moyenne, 1)
-            print(f"✅ Note moyenne calculée: {actrice.note_moyenne}")
-        else:
-            actrice.note_moyenne = None
-            print(f"⚪ Aucune note trouvée, note_moyenne = None")
+def select_tags_typiques(tag_counts, min_occurrences=TAGS_TYPIQUES_MIN_OCCURRENCES):
+    """
+    Règle des tags typiques : au moins `min_occurrences` scènes, hors tags génériques,
+    8 maximum par ordre alphabétique. Retourne la chaîne à stocker ou None.
+    """
+    useful_tags = {tag for tag, count in tag_counts.items() if count >= min_occurrences} - TAGS_GENERIQUES
+    final_tags = sorted(useful_tags)[:TAGS_TYPIQUES_MAX]
+    return ','.join(final_tags) if final_tags else None
 
-        # Mettre à jour la dernière vue
-        actrice.derniere_vue = datetime.now().date()
 
-        db.session.commit()
-        print(f"💾 Sauvegarde terminée pour {actrice.nom}")
+def scene_aggregate_state(scene):
+    """Contribution d'une scène aux agrégats de ses actrices : (actrice_ids, tags, note)"""
+    if scene is None:
+        return (), Counter(), None
+    return (
+        tuple(a.id for a in scene.actrices),
+        Counter(normalize_tag_name(t.nom) for t in scene.tags),
+        scene.note_value,
+    )
 
-    except Exception as e:
-        print(f"❌ Erreur update_actrice_note_moyenne: {e}")
-        db.session.rollback()
 
+def apply_scene_aggregate_delta(before, after):
+    """
+    Applique aux compteurs des actrices la différence entre deux états d'une scène
+    (voir scene_aggregate_state), puis rafraîchit leurs champs dérivés. Sans commit :
+    les compteurs sont écrits dans la même transaction que la scène.
+    """
+    tag_deltas = defaultdict(Counter)
+    note_deltas = defaultdict(lambda: [0.0, 0])
 
-def update_actrice_tags_typiques(actrice_id, min_occurrences=2):
+    for (actrice_ids, tags, note), sign in ((before, -1), (after, 1)):
+        for actrice_id in actrice_ids:
+            for tag_nom, n in tags.items():
+                tag_deltas[actrice_id][tag_nom] += sign * n
+            if note is not None:
+                note_deltas[actrice_id][0] += sign * note
+                note_deltas[actrice_id][1] += sign
+
+    note_rows = [
+        {"id": actrice_id, "somme": somme, "count": count}
+        for actrice_id, (somme, count) in note_deltas.items() if count or somme
+    ]
+    if note_rows:
+        db.session.execute(text(
+            "UPDATE actrices SET note_somme = coalesce(note_somme, 0) + :somme, "
+            "note_count = coalesce(note_count, 0) + :count WHERE id = :id"
+        ), note_rows)
+
+    tag_rows = [
+        {"actrice_id": actrice_id, "tag_nom": tag_nom, "nb": n}
+        for actrice_id, counts in tag_deltas.items() for tag_nom, n in counts.items() if n
+    ]
+    if tag_rows:
+        db.session.execute(text(
+            "INSERT INTO actrice_tags (actrice_id, tag_nom, nb) VALUES (:actrice_id, :tag_nom, :nb) "
+            "ON CONFLICT (actrice_id, tag_nom) DO UPDATE SET nb = nb + excluded.nb"
+        ), tag_rows)
+        db.session.execute(text(
+            "DELETE FROM actrice_tags WHERE nb <= 0 AND actrice_id IN :ids"
+        ).bindparams(bindparam('ids', expanding=True)), {"ids": list(tag_deltas)})
+
+    mark_tables_written('actrices', 'actrice_tags')
+    schedule_actrice_refresh(set(before[0]) | set(after[0]))
+
+
+def refresh_actrice_derived(actrice_ids):
+    """Recalcule note_moyenne et tags_typiques depuis les compteurs (2 requêtes pour tout le lot)"""
+    actrice_ids = list(set(actrice_ids))
+    if not actrice_ids:
+        return
+
+    tag_counts = defaultdict(dict)
+    for actrice_id, tag_nom, nb in db.session.query(ActriceTag.actrice_id, ActriceTag.tag_nom, ActriceTag.nb).filter(
+            ActriceTag.actrice_id.in_(actrice_ids), ActriceTag.nb >= TAGS_TYPIQUES_MIN_OCCURRENCES):
+        tag_counts[actrice_id][tag_nom] = nb
+
+    sums = db.session.query(Actrice.id, Actrice.note_somme, Actrice.note_count).filter(
+        Actrice.id.in_(actrice_ids)).all()
+
+    today = datetime.now().date()
+    db.session.execute(text(
+        "UPDATE actrices SET note_moyenne = :note_moyenne, tags_typiques = :tags_typiques, "
+        "derniere_vue = :derniere_vue WHERE id = :id"
+    ), [{
+        "id": actrice_id,
+        "note_moyenne": round(somme / count, 1) if count else None,
+        "tags_typiques": select_tags_typiques(tag_counts[actrice_id]),
+        "derniere_vue": today,
+    } for actrice_id, somme, count in sums])
+    mark_tables_written('actrices')
+
+
+class ActriceRefreshQueue:
     """
-    Met à jour les tags typiques d'une actrice basés sur ses scènes
-    min_occurrences: nombre minimum d'apparitions d'un tag pour qu'il soit considéré comme "typique"
+    File de rafraîchissement des champs dérivés des actrices, traitée par un thread.
+    Les ids reçus pendant la fenêtre `window` sont regroupés (un id en double n'est
+    traité qu'une fois), puis rafraîchis par lots de `batch_size` avec un commit par lot.
     """
-    try:
-        actrice = db.session.get(Actrice, actrice_id)
-        if not actrice:
-            print(f"❌ Actrice {actrice_id} non trouvée")
-            return
 
-        print(f"🏷️ Calcul tags typiques pour {actrice.nom} (ID: {actrice_id})")
-        print(f"📊 Nombre de scènes: {len(actrice.scenes)}")
+    def __init__(self, flask_app, window=0.5, batch_size=200):
+        self.app = flask_app
+        self.window = window
+        self.batch_size = batch_size
+        self._pending = set()
+        self._busy = False
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def enqueue(self, actrice_ids):
+        with self._condition:
+            self._pending.update(actrice_ids)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='actrice-refresh', daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+
+    def flush(self, timeout=None):
+        """Attend que la file soit vide (scripts, benchmarks, arrêt du serveur)"""
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending)
+
+            # Fenêtre de regroupement : une rafale de modifications donne un seul recalcul
+            time.sleep(self.window)
+
+            with self._condition:
+                actrice_ids = sorted(self._pending)
+                self._pending.clear()
+                self._busy = True
 
-        # Compter les occurrences de chaque tag
-        tag_counts = {}
-        for i, scene in enumerate(actrice.scenes):
-            print(f"  📝 Scène {i + 1}: '{scene.titre}' avec {len(scene.tags)} tags")
-            for tag in scene.tags:
-                tag_name = tag.nom.lower().strip()
-                tag_counts[tag_name] = tag_counts.get(tag_name, 0) + 1
-                print(f"      🏷️ Tag '{tag_name}' (count: {tag_counts[tag_name]})")
+            try:
+                for i in range(0, len(actrice_ids), self.batch_size):
+                    self._refresh_batch(actrice_ids[i:i + self.batch_size])
+            finally:
+                with self._condition:
+                    self._busy = False
+                    self._condition.notify_all()
+
+    def _refresh_batch(self, actrice_ids):
+        with self.app.app_context():
+            try:
+                refresh_actrice_derived(actrice_ids)
+                db.session.commit()
+                print(f"🔄 Agrégats rafraîchis pour {len(actrice_ids)} actrice(s)")
+            except Exception as e:
+                print(f"❌ Erreur rafraîchissement agrégats {actrice_ids}: {e}")
+                db.session.rollback()
+            finally:
+                db.session.remove()
 
-        print(f"📋 Comptage des tags: {tag_counts}")
 
-        # Garder seulement les tags qui apparaissent assez souvent
-        frequent_tags = {
-            tag for tag, count in tag_counts.items()
-            if count >= min_occurrences
-        }
+actrice_refresh_queue = ActriceRefreshQueue(app)
+atexit.register(actrice_refresh_queue.flush, 5)
+
+
+def schedule_actrice_refresh(actrice_ids):
+    """Programme le rafraîchissement des actrices après le commit de la transaction en cours"""
+    db.session.info.setdefault('actrices_to_refresh', set()).update(actrice_ids)
+
+
+@event.listens_for(db.session, 'after_commit')
+def _enqueue_actrice_refresh_after_commit(session):
+    actrice_ids = session.info.pop('actrices_to_refresh', None)
+    if actrice_ids:
+        actrice_refresh_queue.enqueue(actrice_ids)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _drop_actrice_refresh_after_rollback(session):
+    session.info.pop('actrices_to_refresh', None)
+
+
+def rebuild_actrice_aggregates():
+    """
+    Reconstruit en une passe les agrégats de toutes les actrices, sans commit :
+    - sommes de notes : un GROUP BY sur scene_actrice ⨝ scenes
+    - fréquences de tags : un GROUP BY sur scene_actrice ⨝ scene_tag ⨝ tags
+    La règle des tags typiques est appliquée en mémoire et tout est écrit en
+    requêtes groupées. Les actrices sans scène gardent leurs tags_typiques.
+    Retourne les nombres de lignes lues et écrites.
+    """
+    note_rows = db.session.execute(text(
+        "SELECT a.id, coalesce(sum(s.note_value), 0), count(s.note_value), count(sa.scene_id) FROM actrices a "
+        "LEFT JOIN scene_actrice sa ON sa.actrice_id = a.id "
+        "LEFT JOIN scenes s ON s.id = sa.scene_id GROUP BY a.id"
+    )).all()
+
+    # Regroupement par nom exact en SQL, normalisation (minuscules unicode) en Python
+    tag_counts = defaultdict(Counter)
+    tag_group_rows = 0
+    for actrice_id, tag_nom, nb in db.session.execute(text(
+            "SELECT sa.actrice_id, t.nom, count(*) FROM scene_actrice sa "
+            "JOIN scene_tag st ON st.scene_id = sa.scene_id "
+            "JOIN tags t ON t.id = st.tag_id GROUP BY sa.actrice_id, t.nom")):
+        tag_counts[actrice_id][normalize_tag_name(tag_nom)] += nb
+        tag_group_rows += 1
+
+    db.session.execute(text(
+        "UPDATE actrices SET note_somme = :somme, note_count = :count, note_moyenne = :note_moyenne "
+        "WHERE id = :id"
+    ), [{
+        "id": actrice_id,
+        "somme": somme,
+        "count": count,
+        "note_moyenne": round(somme / count, 1) if count else None,
+    } for actrice_id, somme, count, _ in note_rows])
+
+    actrices_avec_scenes = [actrice_id for actrice_id, _, _, nb_scenes in note_rows if nb_scenes]
+    if actrices_avec_scenes:
+        db.session.execute(text("UPDATE actrices SET tags_typiques = :tags_typiques WHERE id = :id"), [
+            {"id": actrice_id, "tags_typiques": select_tags_typiques(tag_counts[actrice_id])}
+            for actrice_id in actrices_avec_scenes
+        ])
+
+    db.session.execute(text("DELETE FROM actrice_tags"))
+    tag_rows = [
+        {"actrice_id": actrice_id, "tag_nom": tag_nom, "nb": nb}
+        for actrice_id, counts in tag_counts.items() for tag_nom, nb in counts.items()
+    ]
+    if tag_rows:
+        db.session.execute(text(
+            "INSERT INTO actrice_tags (actrice_id, tag_nom, nb) VALUES (:actrice_id, :tag_nom, :nb)"
+        ), tag_rows)
+
+    mark_tables_written('actrices', 'actrice_tags')
+    return {
+        "actrices": len(note_rows),
+        "actrices_avec_scenes": len(actrices_avec_scenes),
+        "tag_group_rows": tag_group_rows,
+        "actrice_tags": len(tag_rows),
+    }
+
+
+# ==================== SCORE TENDANCE ====================
+# scenes.trending_score combine note, favori, vues (décroissance exponentielle) et fraîcheur
+# de l'ajout. Il est recalculé au commit pour les scènes touchées par la transaction (scènes,
+# favoris, vues) et pour tout le catalogue une fois par jour, quand la décroissance avance.
+# /api/scenes/trending lit ensuite l'index ix_scenes_trending_score avec un LIMIT.
+
+TRENDING_POIDS_NOTE = 200  # par point de note (sur 5)
+TRENDING_POIDS_FAVORI = 500
+TRENDING_POIDS_VUE = 100  # vue du jour, divisé par 2 tous les TRENDING_DEMI_VIE_VUES jours
+TRENDING_POIDS_AJOUT = 300  # scène ajoutée aujourd'hui, divisé par 2 tous les TRENDING_DEMI_VIE_AJOUT jours
+TRENDING_DEMI_VIE_VUES = 14
+TRENDING_DEMI_VIE_AJOUT = 30
+TRENDING_DEFAUT = 10
+TRENDING_MAX = 100
+
+_trending_state = {"jour": None}  # jour de référence des scores recalculés (ou en cours) par ce processus
+_trending_lock = threading.Lock()
+
+
+def trending_decay(age_jours, demi_vie):
+    """Poids d'un événement vieux de `age_jours` (1 aujourd'hui, 0.5 après une demi-vie)"""
+    return 0.5 ** (max(age_jours, 0) / demi_vie)
+
+
+def compute_trending_scores(scene_ids=None, day=None):
+    """
+    Recalcule trending_score (sans commit) pour les scènes données, ou tout le catalogue si None.
+    Trois requêtes quel que soit le nombre de scènes, puis un UPDATE groupé.
+    Aucune réponse en cache n'expose trending_score : pas d'invalidation du cache.
+    """
+    day = day or date.today()
+    scenes_query = db.session.query(Scene.id, Scene.note_value, Scene.date_ajout)
+    favoris_query = db.session.query(Favorite.scene_id)
+    vues_query = db.session.query(
+        ViewEvent.scene_id, db.func.date(ViewEvent.date_vue), db.func.count()
+    ).group_by(ViewEvent.scene_id, db.func.date(ViewEvent.date_vue))
+    if scene_ids is not None:
+        scene_ids = list(set(scene_ids))
+        if not scene_ids:
+            return 0
+        scenes_query = scenes_query.filter(Scene.id.in_(scene_ids))
+        favoris_query = favoris_query.filter(Favorite.scene_id.in_(scene_ids))
+        vues_query = vues_query.filter(ViewEvent.scene_id.in_(scene_ids))
+
+    favoris = {scene_id for scene_id, in favoris_query}
+    vues = defaultdict(float)
+    for scene_id, jour, nb in vues_query:
+        age = (day - date.fromisoformat(jour)).days
+        vues[scene_id] += nb * trending_decay(age, TRENDING_DEMI_VIE_VUES)
+
+    updates = [{
+        "id": scene_id,
+        "score": round(
+            (note_value or 0) * TRENDING_POIDS_NOTE
+            + (TRENDING_POIDS_FAVORI if scene_id in favoris else 0)
+            + vues[scene_id] * TRENDING_POIDS_VUE
+            + (TRENDING_POIDS_AJOUT * trending_decay((day - date_ajout).days, TRENDING_DEMI_VIE_AJOUT)
+               if date_ajout else 0), 3),
+    } for scene_id, note_value, date_ajout in scenes_query]
+    if updates:
+        db.session.execute(text("UPDATE scenes SET trending_score = :score WHERE id = :id"), updates)
+    return len(updates)
+
+
+TRENDING_MODELES = ('scenes', 'favorites', 'view_events')  # tables dont les lignes changent le score
+TRENDING_LOT = 500  # scènes recalculées par requête au commit (limite des paramètres SQLite)
+
+
+def mark_trending_stale(scene_ids):
+    """Signale des scènes touchées par du SQL brut ou un Query.delete() que le suivi ORM ne voit pas"""
+    db.session.info.setdefault('trending_scene_ids', set()).update(scene_ids)
+
+
+@event.listens_for(db.session, 'after_flush')
+def _track_trending_scenes(session, flush_context):
+    """Mémorise les scènes dont le score tendance doit être recalculé au commit"""
+    stale = session.info.setdefault('trending_scene_ids', set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        table = getattr(obj, '__tablename__', None)
+        if table == 'scenes':
+            stale.add(obj.id)
+        elif table in TRENDING_MODELES:
+            stale.add(obj.scene_id)
+
+
+@event.listens_for(db.session, 'before_commit')
+def _rescore_trending_before_commit(session):
+    """Recalcule les scores des scènes touchées, dans la transaction qui les a modifiées"""
+    session.flush()  # before_commit passe avant le flush final du commit
+    stale = session.info.pop('trending_scene_ids', None)
+    stale = sorted(scene_id for scene_id in stale or () if scene_id is not None)
+    for i in range(0, len(stale), TRENDING_LOT):
+        compute_trending_scores(stale[i:i + TRENDING_LOT])
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _drop_trending_scenes_after_rollback(session):
+    session.info.pop('trending_scene_ids', None)
+
+
+def ensure_trending_scores_current():
+    """
+    Lance en arrière-plan le recalcul de tout le catalogue si les scores n'ont pas encore
+    été vieillis aujourd'hui. Ne bloque pas : l'appelant lit les scores déjà en base.
+    Le verrou garantit un seul recalcul par jour, même pour des requêtes simultanées.
+    """
+    today = date.today()
+    if _trending_state["jour"] == today:
+        return
+    with _trending_lock:
+        if _trending_state["jour"] == today:
+            return
+        _trending_state["jour"] = today
+    threading.Thread(target=_rescore_trending, args=(today,), name='trending-rescore', daemon=True).start()
 
-        # Exclure les tags trop génériques
-        tags_to_exclude = {'hd', '4k', 'new', 'recent', 'premium', 'video', 'hot', 'sexy'}
-        useful_tags = frequent_tags - tags_to_exclude
 
-        # Limiter à 8 tags max et trier alphabétiquement
-        final_tags = sorted(useful_tags)[:8]
+def _rescore_trending(day):
+    """Recalcul complet des scores tendance, dans sa propre session et sa propre transaction"""
+    with app.app_context():
+        try:
+            # Transaction d'écriture ouverte avant les lectures (pysqlite n'émet pas de BEGIN
+            # avant un SELECT) : les écritures concurrentes, qui recalculent leurs scènes à leur
+            # commit, attendent la fin de ce recalcul au lieu d'être écrasées par des valeurs lues avant
+            db.session.connection().exec_driver_sql("BEGIN IMMEDIATE")
+            nb = compute_trending_scores(day=day)
+            db.session.commit()
+            print(f"📈 Scores tendance recalculés pour {nb} scène(s)")
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Erreur recalcul des scores tendance: {e}")
+            with _trending_lock:
+                if _trending_state["jour"] == day:
+                    _trending_state["jour"] = None  # Nouvel essai à la prochaine demande
+        finally:
+            db.session.remove()
 
-        # Mettre à jour les tags typiques
-        if final_tags:
-            actrice.tags_typiques = ','.join(final_tags)
-            print(f"✅ Tags typiques mis à jour: {actrice.tags_typiques}")
-        else:
-            actrice.tags_typiques = None
-            print(f"⚪ Aucun tag typique trouvé")
 
-        db.session.commit()
-        print(f"💾 Sauvegarde terminée pour {actrice.nom}")
+@app.route('/api/scenes/trending')
+def get_trending_scenes():
+    """
+    Scènes tendance : parcours de l'index sur trending_score, limité à ?limit=10 (max 100)
+    Chaque scène porte trending_score, nb_vues et is_favorite.
+    """
+    try:
+        limit = min(max(request.args.get('limit', TRENDING_DEFAUT, type=int), 1), TRENDING_MAX)
+        ensure_trending_scores_current()
+
+        rows = db.session.query(Scene, History.nb_vues, Favorite.id).outerjoin(
+            History, History.scene_id == Scene.id
+        ).outerjoin(Favorite, Favorite.scene_id == Scene.id).filter(
+            Scene.trending_score.isnot(None)
+        ).options(selectinload(Scene.actrices), selectinload(Scene.tags)).order_by(
+            Scene.trending_score.desc(), Scene.id.desc()
+        ).limit(limit).all()
+
+        return jsonify([{
+            **serialize_scene(scene),
+            "trending_score": scene.trending_score,
+            "nb_vues": nb_vues or 0,
+            "is_favorite": favorite_id is not None,
+        } for scene, nb_vues, favorite_id in rows])
 
     except Exception as e:
-        print(f"❌ Erreur update_actrice_tags_typiques: {e}")
+        print(f"❌ Erreur trending: {e}")
         db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
 
 # ==================== ROUTES CRUD POUR SCENES ====================
 
@@ -1053,30 +2196,14 @@ def create_scene():
                     scene.tags.append(tag)
 
         print(f"Avant commit - Nombre d'actrices liées à la scène: {len(scene.actrices)}")
-        db.session.commit()
-        print(f"Après commit - Commit réussi")
-
-        # 🔍 VÉRIFICATION POST-COMMIT
-        scene_fresh = db.session.get(Scene, scene.id)
-        print(f"🔍 Vérification post-commit:")
-        print(f"   Scène ID {scene_fresh.id} a {len(scene_fresh.actrices)} actrices liées")
-        for actrice in scene_fresh.actrices:
-            print(f"   - {actrice.nom} (ID: {actrice.id})")
+        index_scenes_fts([scene.id])
 
-        # ✨ Mettre à jour les notes moyennes ET les tags des actrices
-        print(f"🔄 Début mise à jour notes moyennes et tags pour {len(actrice_ids)} actrices")
-        for actrice_id in actrice_ids:
-            print(f"🔄 Appel update_actrice_note_moyenne({actrice_id})")
-
-            # 🔍 Double vérification avant calcul
-            actrice_check = db.session.get(Actrice, actrice_id)
-            print(f"🔍 Avant calcul: {actrice_check.nom} a {len(actrice_check.scenes)} scènes")
+        # ✨ Notes moyennes et tags typiques des actrices : deltas dans la même transaction
+        print(f"🔄 Mise à jour incrémentale des agrégats pour {len(actrice_ids)} actrices")
+        apply_scene_aggregate_delta(scene_aggregate_state(None), scene_aggregate_state(scene))
 
-            update_actrice_note_moyenne(actrice_id)
-
-            # 🏷️ NOUVEAU : Mettre à jour les tags typiques
-            print(f"🏷️ Appel update_actrice_tags_typiques({actrice_id})")
-            update_actrice_tags_typiques(actrice_id)
+        db.session.commit()
+        print(f"Après commit - Commit réussi")
 
         print(f"=== FIN CREATE SCENE DEBUG ===")
         return jsonify({"message": "Scène créée avec succès", "id": scene.id}), 201
@@ -1171,9 +2298,9 @@ def update_scene(scene_id):
         print(f"Scène ID: {scene_id}")
         print(f"Données reçues: {data}")
 
-        # Garder les anciennes actrices pour mise à jour
-        old_actrice_ids = [a.id for a in scene.actrices]
-        print(f"Anciennes actrices: {old_actrice_ids}")
+        # Garder l'état avant modification pour les deltas d'agrégats des actrices
+        old_state = scene_aggregate_state(scene)
+        print(f"Anciennes actrices: {list(old_state[0])}")
 
         # Mettre à jour les champs simples
         for field in ['titre', 'synopsis', 'duree', 'qualite', 'site', 'studio', 'note_perso', 'image', 'chemin']:
@@ -1182,7 +2309,6 @@ def update_scene(scene_id):
                 setattr(scene, field, data[field])
 
         # Mettre à jour les actrices
-        new_actrice_ids = []
         print(f"Nouvelles actrice_ids: {data.get('actrice_ids')}")
 
         if 'actrice_ids' in data:
@@ -1194,7 +2320,6 @@ def update_scene(scene_id):
                 actrice = db.session.get(Actrice, actrice_id)
                 if actrice:
                     scene.actrices.append(actrice)
-                    new_actrice_ids.append(actrice_id)
                     print(f"✅ Actrice {actrice.nom} ajoutée")
                 else:
                     print(f"❌ Actrice {actrice_id} non trouvée")
@@ -1227,30 +2352,13 @@ def update_scene(scene_id):
                 pass
 
         print(f"Avant commit - Nombre d'actrices liées: {len(scene.actrices)}")
-        db.session.commit()
-        print(f"Après commit - Commit réussi")
-
-        # 🔍 VÉRIFICATION POST-COMMIT
-        scene_fresh = db.session.get(Scene, scene.id)
-        print(f"🔍 Vérification post-commit:")
-        print(f"   Scène ID {scene_fresh.id} a {len(scene_fresh.actrices)} actrices liées")
+        index_scenes_fts([scene.id])
 
-        # ✨ Mettre à jour les notes moyennes ET les tags (anciennes ET nouvelles actrices)
-        all_actrice_ids = set(old_actrice_ids + new_actrice_ids)
-        print(f"🔄 Actrices à mettre à jour: {all_actrice_ids}")
+        # ✨ Deltas sur les agrégats (anciennes ET nouvelles actrices), même transaction
+        apply_scene_aggregate_delta(old_state, scene_aggregate_state(scene))
 
-        for actrice_id in all_actrice_ids:
-            print(f"🔄 Appel update_actrice_note_moyenne({actrice_id})")
-
-            # 🔍 Double vérification avant calcul
-            actrice_check = db.session.get(Actrice, actrice_id)
-            print(f"🔍 Avant calcul: {actrice_check.nom} a {len(actrice_check.scenes)} scènes")
-
-            update_actrice_note_moyenne(actrice_id)
-
-            # 🏷️ NOUVEAU : Mettre à jour les tags typiques
-            print(f"🏷️ Appel update_actrice_tags_typiques({actrice_id})")
-            update_actrice_tags_typiques(actrice_id)
+        db.session.commit()
+        print(f"Après commit - Commit réussi")
 
         print(f"=== FIN UPDATE SCENE DEBUG ===")
         return jsonify({"message": "Scène mise à jour avec succès"})
@@ -1265,18 +2373,24 @@ def update_scene(scene_id):
 def delete_scene(scene_id):
     """Supprimer une scène"""
     try:
+        view_event_buffer.flush(timeout=5)  # Vues en tampon écrites avant toute écriture ici
         scene = db.session.get(Scene, scene_id)
         if not scene:
             return jsonify({"error": "Scène non trouvée"}), 404
 
+        # Retirer la contribution de la scène aux agrégats de ses actrices
+        apply_scene_aggregate_delta(scene_aggregate_state(scene), scene_aggregate_state(None))
+
         # Supprimer d'abord les favoris liés à cette scène
         Favorite.query.filter_by(scene_id=scene_id).delete()
 
-        # Supprimer l'historique lié à cette scène
+        # Supprimer l'historique lié à cette scène (résumé et journal des vues)
         History.query.filter_by(scene_id=scene_id).delete()
+        ViewEvent.query.filter_by(scene_id=scene_id).delete()
 
         # Maintenant supprimer la scène
         db.session.delete(scene)
+        index_scenes_fts([scene_id])
         db.session.commit()
 
         return jsonify({"message": "Scène supprimée avec succès"})
@@ -1350,11 +2464,17 @@ def update_actrice(actrice_id):
 
         data = request.get_json()
 
+        nom_change = 'nom' in data and data['nom'] != actrice.nom
+
         # Mettre à jour les champs simples
         for field in ['nom', 'biographie', 'photo', 'tags_typiques', 'note_moyenne', 'commentaire', 'nationalite']:
             if field in data:
                 setattr(actrice, field, data[field])
 
+        # Le nom est indexé dans la recherche plein texte de ses scènes
+        if nom_change:
+            index_scenes_fts([s.id for s in actrice.scenes])
+
         # Gérer la date de naissance
         if 'date_naissance' in data and data['date_naissance']:
             try:
@@ -1379,11 +2499,16 @@ def delete_actrice(actrice_id):
             return jsonify({"error": "Actrice non trouvée"}), 404
 
         # Dissocier l'actrice de toutes ses scènes (ne pas supprimer les scènes)
-        for scene in actrice.scenes:
+        scene_ids = [scene.id for scene in actrice.scenes]
+        for scene in list(actrice.scenes):
             scene.actrices.remove(actrice)
 
+        # Ses compteurs de tags disparaissent avec elle
+        ActriceTag.query.filter_by(actrice_id=actrice_id).delete()
+
         # Maintenant supprimer l'actrice
         db.session.delete(actrice)
+        index_scenes_fts(scene_ids)
         db.session.commit()
 
         return jsonify({"message": "Actrice supprimée avec succès"})
@@ -1402,25 +2527,25 @@ def add_favorite():
         data = request.get_json()
         scene_id = data['scene_id']
 
-        # Vérifier si la scène existe
-        scene = db.session.get(Scene, scene_id)
-        if not scene:
-            return jsonify({"error": "Scène non trouvée"}), 404
-
-        # Vérifier si déjà en favoris
-        existing = Favorite.query.filter_by(scene_id=scene_id).first()
-        if existing:
-            return jsonify({"error": "Déjà en favoris"}), 400
-
-        favorite = Favorite(
-            scene_id=scene_id,
-            date_ajout=datetime.now().date()
-        )
-
-        db.session.add(favorite)
+        # Une seule requête : insertion si la scène existe et n'est pas déjà en favoris
+        # (index unique sur favorites.scene_id : deux clics simultanés ne créent pas de doublon)
+        inserted = db.session.execute(text(
+            "INSERT INTO favorites (scene_id, date_ajout) "
+            "SELECT :scene_id, :date_ajout WHERE EXISTS (SELECT 1 FROM scenes WHERE id = :scene_id) "
+            "ON CONFLICT (scene_id) DO NOTHING"
+        ), {"scene_id": scene_id, "date_ajout": datetime.now().date().isoformat()}).rowcount
+        mark_tables_written('favorites')
+        if inserted:
+            mark_trending_stale([scene_id])
         db.session.commit()
 
-        return jsonify({"message": "Ajouté aux favoris"}), 201
+        if inserted:
+            return jsonify({"message": "Ajouté aux favoris"}), 201
+
+        # Rien inséré : scène inconnue ou déjà en favoris
+        if not db.session.get(Scene, scene_id):
+            return jsonify({"error": "Scène non trouvée"}), 404
+        return jsonify({"error": "Déjà en favoris"}), 400
 
     except Exception as e:
         db.session.rollback()
@@ -1445,6 +2570,364 @@ def remove_favorite(scene_id):
         return jsonify({"error": str(e)}), 400
 
 
+# ==================== ACTIVITÉ DE VISIONNAGE (ROLLUPS) ====================
+# Vues, minutes, scènes distinctes et tags par jour / semaine / mois, maintenus
+# incrémentalement à chaque vue : les courbes d'activité ne relisent jamais l'historique.
+
+ACTIVITE_GRANULARITES = ('day', 'week', 'month')
+ACTIVITE_TABLES = ('activite_periodes', 'activite_periode_scenes', 'activite_periode_tags')
+# Nombre de périodes affichées par défaut (sans debut/fin)
+ACTIVITE_PERIODES_DEFAUT = {'day': 30, 'week': 12, 'month': 12}
+ACTIVITE_TOP_TAGS_DEFAUT = 3
+
+
+def periode_debut(day, granularite):
+    """Premier jour de la période contenant `day` (lundi pour les semaines)"""
+    if granularite == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularite == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def periode_suivante(debut, granularite):
+    """Premier jour de la période suivante"""
+    if granularite == 'week':
+        return debut + timedelta(days=7)
+    if granularite == 'month':
+        return (debut.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return debut + timedelta(days=1)
+
+
+def record_view_activity(scene_id, duree, tag_noms, day, nb_vues=1):
+    """
+    Ajoute `nb_vues` vue(s) d'une scène le jour `day` aux trois granularités (sans commit).
+    Une scène n'est comptée qu'une fois par période dans nb_scenes.
+    """
+    minutes = (duree or 0) * nb_vues
+    tag_noms = {normalize_tag_name(nom) for nom in tag_noms if nom and nom.strip()}
+
+    for granularite in ACTIVITE_GRANULARITES:
+        params = {"granularite": granularite, "debut": periode_debut(day, granularite).isoformat()}
+
+        # Présence de la scène dans la période : 1 ligne insérée = nouvelle scène distincte
+        nouvelle_scene = db.session.execute(text(
+            "INSERT OR IGNORE INTO activite_periode_scenes (granularite, debut, scene_id) "
+            "VALUES (:granularite, :debut, :scene_id)"
+        ), {**params, "scene_id": scene_id}).rowcount
+
+        db.session.execute(text(
+            "INSERT INTO activite_periodes (granularite, debut, nb_vues, minutes, nb_scenes) "
+            "VALUES (:granularite, :debut, :nb_vues, :minutes, :nb_scenes) "
+            "ON CONFLICT (granularite, debut) DO UPDATE SET nb_vues = nb_vues + excluded.nb_vues, "
+            "minutes = minutes + excluded.minutes, nb_scenes = nb_scenes + excluded.nb_scenes"
+        ), {**params, "nb_vues": nb_vues, "minutes": minutes, "nb_scenes": nouvelle_scene})
+
+        if tag_noms:
+            db.session.execute(text(
+                "INSERT INTO activite_periode_tags (granularite, debut, tag_nom, nb_vues) "
+                "VALUES (:granularite, :debut, :tag_nom, :nb_vues) "
+                "ON CONFLICT (granularite, debut, tag_nom) DO UPDATE SET nb_vues = nb_vues + excluded.nb_vues"
+            ), [{**params, "tag_nom": nom, "nb_vues": nb_vues} for nom in tag_noms])
+
+    mark_tables_written(*ACTIVITE_TABLES)
+
+
+# Début de période d'une vue (view_events e), en SQL : mêmes règles que periode_debut()
+ACTIVITE_PERIODE_SQL = {
+    'day': "date(e.date_vue)",
+    'week': "date(e.date_vue, '-' || ((CAST(strftime('%w', e.date_vue) AS INTEGER) + 6) % 7) || ' days')",
+    'month': "date(e.date_vue, 'start of month')",
+}
+
+
+def rebuild_view_activity():
+    """
+    Reconstruit les rollups en rejouant le journal view_events (sans commit) :
+    trois requêtes ensemblistes par granularité au lieu d'un rejeu vue par vue
+    """
+    for table in ACTIVITE_TABLES:
+        db.session.execute(text(f"DELETE FROM {table}"))
+
+    for granularite, periode_sql in ACTIVITE_PERIODE_SQL.items():
+        params = {"granularite": granularite}
+        db.session.execute(text(
+            "INSERT INTO activite_periode_scenes (granularite, debut, scene_id) "
+            f"SELECT DISTINCT :granularite, {periode_sql}, e.scene_id FROM view_events e "
+            "JOIN scenes s ON s.id = e.scene_id"
+        ), params)
+        db.session.execute(text(
+            "INSERT INTO activite_periodes (granularite, debut, nb_vues, minutes, nb_scenes) "
+            f"SELECT :granularite, {periode_sql} AS debut, count(*), coalesce(sum(s.duree), 0), "
+            "count(DISTINCT e.scene_id) FROM view_events e JOIN scenes s ON s.id = e.scene_id GROUP BY debut"
+        ), params)
+
+        # Regroupement par nom exact en SQL, normalisation (minuscules unicode) en Python
+        tag_vues = Counter()
+        for debut, tag_nom, nb_vues in db.session.execute(text(
+                f"SELECT {periode_sql} AS debut, t.nom, count(*) FROM view_events e "
+                "JOIN scenes s ON s.id = e.scene_id JOIN scene_tag st ON st.scene_id = e.scene_id "
+                "JOIN tags t ON t.id = st.tag_id GROUP BY debut, t.nom")):
+            if tag_nom and tag_nom.strip():
+                tag_vues[(debut, normalize_tag_name(tag_nom))] += nb_vues
+        if tag_vues:
+            db.session.execute(text(
+                "INSERT INTO activite_periode_tags (granularite, debut, tag_nom, nb_vues) "
+                "VALUES (:granularite, :debut, :tag_nom, :nb_vues)"
+            ), [{"granularite": granularite, "debut": debut, "tag_nom": tag_nom, "nb_vues": nb_vues}
+                for (debut, tag_nom), nb_vues in tag_vues.items()])
+
+    mark_tables_written(*ACTIVITE_TABLES)
+    nb_vues_total = db.session.execute(text(
+        "SELECT coalesce(sum(nb_vues), 0) FROM activite_periodes WHERE granularite = 'day'")).scalar()
+    return {"vues": nb_vues_total,
+            "periodes": db.session.query(db.func.count()).select_from(ActivitePeriode).scalar()}
+
+
+@app.route('/api/stats/timeline')
+def get_stats_timeline():
+    """
+    Activité de visionnage par période, lue dans les rollups
+    - granularity : day | week | month (défaut : day)
+    - debut / fin : YYYY-MM-DD (défaut : les 30 derniers jours, 12 dernières semaines ou 12 derniers mois)
+    - top_tags : nombre de tags les plus vus par période (défaut : 3)
+    Les périodes sans activité sont renvoyées à zéro
+    """
+    try:
+        granularite = request.args.get('granularity', 'day')
+        if granularite not in ACTIVITE_GRANULARITES:
+            raise ValueError(f"granularity doit valoir {', '.join(ACTIVITE_GRANULARITES)}")
+        top_tags = max(0, min(int(request.args.get('top_tags', ACTIVITE_TOP_TAGS_DEFAUT)), 20))
+
+        fin = periode_debut(parse_date_arg('fin') or date.today(), granularite)
+        debut = parse_date_arg('debut')
+        if debut:
+            debut = periode_debut(debut, granularite)
+        else:
+            debut = fin
+            for _ in range(ACTIVITE_PERIODES_DEFAUT[granularite] - 1):
+                debut = periode_debut(debut - timedelta(days=1), granularite)
+        if debut > fin:
+            raise ValueError("debut doit précéder fin")
+
+        rows = {row.debut: row for row in ActivitePeriode.query.filter(
+            ActivitePeriode.granularite == granularite,
+            ActivitePeriode.debut >= debut, ActivitePeriode.debut <= fin)}
+
+        tags = defaultdict(list)
+        if top_tags and rows:
+            for debut_periode, tag_nom, nb_vues in db.session.execute(text(
+                    "SELECT debut, tag_nom, nb_vues FROM ("
+                    "  SELECT debut, tag_nom, nb_vues, ROW_NUMBER() OVER ("
+                    "    PARTITION BY debut ORDER BY nb_vues DESC, tag_nom) AS rang"
+                    "  FROM activite_periode_tags"
+                    "  WHERE granularite = :granularite AND debut BETWEEN :debut AND :fin"
+                    ") WHERE rang <= :top ORDER BY debut, rang"
+            ), {"granularite": granularite, "debut": debut.isoformat(), "fin": fin.isoformat(), "top": top_tags}):
+                tags[debut_periode].append({"nom": tag_nom, "nb_vues": nb_vues})
+
+        periodes = []
+        courant = debut
+        while courant <= fin:
+            row = rows.get(courant)
+            periodes.append({
+                "debut": courant.isoformat(),
+                "nb_vues": row.nb_vues if row else 0,
+                "minutes": row.minutes if row else 0,
+                "heures": round(row.minutes / 60, 1) if row else 0,
+                "nb_scenes": row.nb_scenes if row else 0,
+                "top_tags": tags.get(courant.isoformat(), [])
+            })
+            courant = periode_suivante(courant, granularite)
+
+        return jsonify({
+            "granularity": granularite,
+            "debut": debut.isoformat(),
+            "fin": fin.isoformat(),
+            "periodes": periodes,
+            "total": {
+                "nb_vues": sum(p["nb_vues"] for p in periodes),
+                "minutes": sum(p["minutes"] for p in periodes)
+            }
+        })
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print(f"❌ Erreur get_stats_timeline: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
+# ==================== JOURNAL DES VUES ====================
+# Chaque vue est ajoutée au journal view_events (jamais modifié). Les vues sont mises en
+# tampon puis écrites par lots : insertion des événements, mise à jour du résumé History
+# et des rollups d'activité, en une transaction par lot.
+
+def apply_view_events(events):
+    """
+    Écrit un lot de vues (sans commit) : journal, résumé History par scène, rollups, score tendance.
+    Les vues de scènes supprimées entre-temps sont ignorées. Retourne le nombre de vues écrites.
+    """
+    scene_ids = {e['scene_id'] for e in events}
+    durees = dict(db.session.query(Scene.id, Scene.duree).filter(Scene.id.in_(scene_ids)))
+    events = [e for e in events if e['scene_id'] in durees]
+    if not events:
+        return 0
+
+    db.session.execute(ViewEvent.__table__.insert(), [{
+        "scene_id": e['scene_id'],
+        "date_vue": e['date_vue'],
+        "note_session": e.get('note_session'),
+        "commentaire_session": e.get('commentaire_session'),
+    } for e in events])
+
+    # Résumé par scène (une ligne par scène, index unique) : une seule requête d'upsert
+    par_scene = defaultdict(list)
+    for e in events:
+        par_scene[e['scene_id']].append(e)
+
+    summaries = []
+    for scene_id, scene_events in par_scene.items():
+        summary = {
+            "scene_id": scene_id,
+            "nb_vues": len(scene_events),
+            "premiere": min(e['date_vue'] for e in scene_events).date().isoformat(),
+            "derniere": max(e['date_vue'] for e in scene_events).date().isoformat(),
+        }
+        # Comme add_to_history avant le journal : une clé présente dans la requête remplace
+        # la valeur (même par null), une clé absente garde la valeur existante
+        for champ in ('note_session', 'commentaire_session'):
+            fournis = [e.get(champ) for e in scene_events if champ in e.get('champs_session', ())]
+            summary[champ] = fournis[-1] if fournis else None
+            summary[f"{champ}_fourni"] = bool(fournis)
+        summaries.append(summary)
+    db.session.execute(text(
+        "INSERT INTO history (scene_id, date_vue, date_premiere_vue, derniere_vue, nb_vues, note_session, commentaire_session) "
+        "VALUES (:scene_id, :derniere, :premiere, :derniere, :nb_vues, :note_session, :commentaire_session) "
+        "ON CONFLICT (scene_id) DO UPDATE SET "
+        "nb_vues = coalesce(history.nb_vues, 0) + excluded.nb_vues, "
+        "date_premiere_vue = coalesce(history.date_premiere_vue, excluded.date_premiere_vue), "
+        "derniere_vue = max(coalesce(history.derniere_vue, excluded.derniere_vue), excluded.derniere_vue), "
+        "date_vue = max(coalesce(history.derniere_vue, excluded.derniere_vue), excluded.derniere_vue), "
+        "note_session = CASE WHEN :note_session_fourni THEN excluded.note_session ELSE history.note_session END, "
+        "commentaire_session = CASE WHEN :commentaire_session_fourni "
+        "THEN excluded.commentaire_session ELSE history.commentaire_session END"
+    ), summaries)
+    mark_tables_written('history', 'view_events')
+
+    # Rollups d'activité : une mise à jour par (scène, jour)
+    tags_par_scene = defaultdict(list)
+    for scene_id, tag_nom in db.session.query(scene_tag.c.scene_id, Tag.nom).join(
+            Tag, Tag.id == scene_tag.c.tag_id).filter(scene_tag.c.scene_id.in_(par_scene)):
+        tags_par_scene[scene_id].append(tag_nom)
+    for (scene_id, jour), nb_vues in Counter((e['scene_id'], e['date_vue'].date()) for e in events).items():
+        record_view_activity(scene_id, durees[scene_id], tags_par_scene.get(scene_id, ()), jour, nb_vues)
+
+    mark_trending_stale(par_scene)
+    return len(events)
+
+
+class ViewEventBuffer:
+    """
+    Tampon des vues, vidé par un thread : les vues reçues pendant `window` secondes
+    sont écrites ensemble (lots de `batch_size`, un commit par lot).
+    flush() force l'écriture immédiate et attend qu'elle soit terminée.
+    """
+
+    def __init__(self, flask_app, window=0.5, batch_size=500, max_attempts=3):
+        self.app = flask_app
+        self.window = window
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self._pending = []
+        self._writing = []  # lot en cours d'écriture (pas encore validé)
+        self._busy = False
+        self._urgent = False
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def append(self, event):
+        with self._condition:
+            self._pending.append(event)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='view-events', daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+
+    def pending_for(self, scene_id):
+        """Nombre de vues de la scène pas encore écrites en base"""
+        with self._condition:
+            return sum(1 for e in self._writing + self._pending if e['scene_id'] == scene_id)
+
+    def pending_views(self):
+        """
+        Vues pas encore écrites en base, par scène : {scene_id: {nb, premiere, derniere}}
+        Les routes de lecture l'ajoutent à l'état validé au lieu d'attendre un flush().
+        """
+        with self._condition:
+            events = self._writing + self._pending
+        vues = {}
+        for e in events:
+            v = vues.setdefault(e['scene_id'], {"nb": 0, "premiere": e['date_vue'], "derniere": e['date_vue']})
+            v["nb"] += 1
+            v["premiere"] = min(v["premiere"], e['date_vue'])
+            v["derniere"] = max(v["derniere"], e['date_vue'])
+        return vues
+
+    def flush(self, timeout=None):
+        """Écrit tout de suite les vues en attente et attend la fin de l'écriture"""
+        with self._condition:
+            if not self._pending and not self._busy:
+                return True
+            self._urgent = True
+            self._condition.notify_all()
+            return self._condition.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending)
+                # Fenêtre de regroupement, écourtée par flush()
+                self._condition.wait_for(lambda: self._urgent, self.window)
+                self._urgent = False
+                events = self._pending
+                self._pending = []
+                self._writing = events
+                self._busy = True
+
+            try:
+                for i in range(0, len(events), self.batch_size):
+                    batch = events[i:i + self.batch_size]
+                    self._write_batch(batch)
+                    with self._condition:
+                        self._writing = self._writing[len(batch):]
+            finally:
+                with self._condition:
+                    self._writing = []
+                    self._busy = False
+                    self._condition.notify_all()
+
+    def _write_batch(self, events):
+        for attempt in range(1, self.max_attempts + 1):
+            with self.app.app_context():
+                try:
+                    nb = apply_view_events(events)
+                    db.session.commit()
+                    print(f"🎬 {nb} vue(s) enregistrée(s) dans le journal")
+                    return
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"❌ Erreur écriture des vues (tentative {attempt}/{self.max_attempts}): {e}")
+                finally:
+                    db.session.remove()
+            time.sleep(self.window)
+        print(f"❌ {len(events)} vue(s) perdue(s): {events}")
+
+
+view_event_buffer = ViewEventBuffer(app)
+atexit.register(view_event_buffer.flush, 5)
+
+
 # ==================== GESTION DE L'HISTORIQUE ====================
 
 @app.route('/api/history', methods=['POST'])
@@ -1459,45 +2942,28 @@ def add_to_history():
         if not scene:
             return jsonify({"error": "Scène non trouvée"}), 404
 
-        # Vérifier si déjà dans l'historique
-        existing_history = History.query.filter_by(scene_id=scene_id).first()
-        today = datetime.now().date()
-
-        if existing_history:
-            # ✅ NOUVEAU : Incrémenter le compteur
-            existing_history.nb_vues += 1
-            existing_history.derniere_vue = today
-            existing_history.date_vue = today  # Garder pour compatibilité
-
-            if 'note_session' in data:
-                existing_history.note_session = data['note_session']
-            if 'commentaire_session' in data:
-                existing_history.commentaire_session = data['commentaire_session']
-
-            db.session.commit()
-
-            print(f"🎬 Scène '{scene.titre}' vue #{existing_history.nb_vues}")
+        # La vue part dans le journal (écriture groupée en arrière-plan) ;
+        # le compteur renvoyé inclut les vues encore en attente d'écriture
+        existing_history = History.query.with_entities(History.nb_vues).filter_by(scene_id=scene_id).first()
+        en_attente = view_event_buffer.pending_for(scene_id)
+        view_event_buffer.append({
+            "scene_id": scene_id,
+            "date_vue": datetime.now(),
+            "note_session": data.get('note_session'),
+            "commentaire_session": data.get('commentaire_session'),
+            # Clés présentes dans la requête : seules celles-ci remplacent la valeur de History
+            "champs_session": tuple(k for k in ('note_session', 'commentaire_session') if k in data)
+        })
 
+        nb_vues = ((existing_history.nb_vues or 1) if existing_history else 0) + en_attente + 1
+        if nb_vues > 1:
+            print(f"🎬 Scène '{scene.titre}' vue #{nb_vues}")
             return jsonify({
-                "message": f"Vue #{existing_history.nb_vues} enregistrée",
-                "nb_vues": existing_history.nb_vues,
+                "message": f"Vue #{nb_vues} enregistrée",
+                "nb_vues": nb_vues,
                 "is_new": False
             }), 200
 
-        # Créer nouvelle entrée (première vue)
-        history = History(
-            scene_id=scene_id,
-            date_vue=today,
-            date_premiere_vue=today,
-            derniere_vue=today,
-            nb_vues=1,
-            note_session=data.get('note_session'),
-            commentaire_session=data.get('commentaire_session')
-        )
-
-        db.session.add(history)
-        db.session.commit()
-
         print(f"🆕 Première vue de la scène '{scene.titre}'")
 
         return jsonify({
@@ -1536,14 +3002,27 @@ def check_history(scene_id):
     """Vérifier si une scène est dans l'historique"""
     try:
         history_entry = History.query.filter_by(scene_id=scene_id).first()
+        vues = view_event_buffer.pending_views().get(scene_id)  # Vues pas encore écrites
         if history_entry:
+            date_vue = history_entry.date_vue.isoformat() if history_entry.date_vue else None
+            if vues:
+                date_vue = max(date_vue or '', vues["derniere"].date().isoformat())
             return jsonify({
                 "exists": True,
                 "id": history_entry.id,
-                "date_vue": history_entry.date_vue.isoformat() if history_entry.date_vue else None,
+                "date_vue": date_vue,
                 "note_session": history_entry.note_session,
                 "commentaire_session": history_entry.commentaire_session
             })
+        elif vues:
+            # Première vue encore dans le tampon : pas encore de ligne d'historique
+            return jsonify({
+                "exists": True,
+                "id": None,
+                "date_vue": vues["derniere"].date().isoformat(),
+                "note_session": None,
+                "commentaire_session": None
+            })
         else:
             return jsonify({"exists": False}), 404
 
@@ -1554,13 +3033,17 @@ def check_history(scene_id):
 # Route pour supprimer de l'historique par scene_id
 @app.route('/api/history/scene/<int:scene_id>', methods=['DELETE'])
 def remove_from_history_by_scene(scene_id):
-    """Supprimer toutes les entrées d'historique pour une scène"""
+    """Supprimer toutes les entrées d'historique pour une scène (résumé et journal des vues)"""
     try:
+        view_event_buffer.flush(timeout=5)
         deleted_count = History.query.filter_by(scene_id=scene_id).delete()
 
         if deleted_count == 0:
             return jsonify({"error": "Cette scène n'est pas dans l'historique"}), 404
 
+        ViewEvent.query.filter_by(scene_id=scene_id).delete()
+        mark_trending_stale([scene_id])
+
         db.session.commit()
         return jsonify({"message": f"Scène supprimée de l'historique ({deleted_count} entrée(s) supprimée(s))"})
 
@@ -1570,13 +3053,16 @@ def remove_from_history_by_scene(scene_id):
 
 @app.route('/api/history/<int:history_id>', methods=['DELETE'])
 def remove_from_history(history_id):
-    """Supprimer un élément de l'historique"""
+    """Supprimer un élément de l'historique (et les vues de la scène dans le journal)"""
     try:
+        view_event_buffer.flush(timeout=5)
         history = db.session.get(History, history_id)
         if not history:
             return jsonify({"error": "Élément d'historique non trouvé"}), 404
 
+        ViewEvent.query.filter_by(scene_id=history.scene_id).delete()
         db.session.delete(history)
+        mark_trending_stale([history.scene_id])
         db.session.commit()
 
         return jsonify({"message": "Retiré de l'historique"})
@@ -1643,7 +3129,12 @@ def get_actrice_detail(actrice_id):
             "date_naissance": actrice.date_naissance.isoformat() if actrice.date_naissance else None,
             "nationalite": actrice.nationalite,
             "nb_scenes": len(actrice.scenes),
-            "scenes": [{"id": s.id, "titre": s.titre} for s in actrice.scenes]
+            "scenes": [{
+                "id": s.id,
+                "titre": s.titre,
+                "date_ajout": s.date_ajout.isoformat() if s.date_ajout else None,
+                "date_scene": s.date_scene.isoformat() if s.date_scene else None
+            } for s in actrice.scenes]
         })
 
     except Exception as e:
@@ -1652,32 +3143,36 @@ def get_actrice_detail(actrice_id):
 
 @app.route('/api/admin/update_all_tags', methods=['POST'])
 def update_all_actress_tags():
-    """Endpoint pour mettre à jour tous les tags d'actrices (à usage admin)"""
+    """
+    Endpoint pour reconstruire les tags typiques (et notes moyennes) de toutes les actrices
+    (à usage admin) : une passe GROUP BY, un seul commit
+    """
     try:
-        actrices = Actrice.query.all()
-        updated_count = 0
+        start = time.perf_counter()
+        print(f"🔄 Début reconstruction des agrégats actrices")
 
-        print(f"🔄 Début mise à jour des tags pour {len(actrices)} actrices")
-
-        for actrice in actrices:
-            if actrice.scenes:  # Seulement si elle a des scènes
-                print(f"🏷️ Mise à jour tags pour {actrice.nom} ({len(actrice.scenes)} scènes)")
-                update_actrice_tags_typiques(actrice.id)
-                updated_count += 1
-            else:
-                print(f"⚪ {actrice.nom} n'a pas de scènes, ignorée")
+        counts = rebuild_actrice_aggregates()
+        db.session.commit()
 
-        print(f"✅ Mise à jour terminée pour {updated_count} actrices")
+        elapsed_ms = round((time.perf_counter() - start) * 1000, 1)
+        print(f"✅ Reconstruction terminée en {elapsed_ms} ms: {counts}")
 
         return jsonify({
-            "message": f"Tags mis à jour pour {updated_count} actrices sur {len(actrices)}",
+            "message": f"Tags mis à jour pour {counts['actrices_avec_scenes']} actrices sur {counts['actrices']}",
             "success": True,
-            "updated_count": updated_count,
-            "total_count": len(actrices)
+            "updated_count": counts['actrices_avec_scenes'],
+            "total_count": counts['actrices'],
+            "elapsed_ms": elapsed_ms,
+            "rows": {
+                "tag_frequencies_read": counts['tag_group_rows'],
+                "actrice_tags_written": counts['actrice_tags'],
+                "actrices_written": counts['actrices']
+            }
         })
 
     except Exception as e:
         print(f"❌ Erreur update_all_actress_tags: {e}")
+        db.session.rollback()
         return jsonify({"error": str(e), "success": False}), 400
 
 
@@ -1749,160 +3244,769 @@ def open_video():
             "success": False
         }), 400
 
-@app.route('/api/admin/scan-disk', methods=['POST'])
-def scan_disk():
-    """Scanner le disque dur et comparer avec la BDD"""
-    try:
-        base_path = '/Volumes/My Passport for Mac/Privé/M364TR0N/'
+# ==================== INVENTAIRE DU DISQUE ====================
+# disk_files garde la liste des vidéos du disque (chemin relatif NFC, taille, mtime) et
+# disk_directories le mtime de chaque dossier d'actrice. Un rafraîchissement ne relit que
+# les dossiers nouveaux ou dont le mtime a changé (fichier ajouté, supprimé ou renommé) :
+# un disque inchangé coûte une lecture de la racine et un stat par dossier.
+# Les dossiers à relire sont répartis sur un pool de threads borné : sur le disque USB,
+# le temps est surtout de la latence d'E/S, que plusieurs scandir en parallèle recouvrent.
 
-        if not os.path.exists(base_path):
-            return jsonify({"error": "Disque dur non trouvé"}), 404
+# Extensions et nombre de threads configurables (ex : INTYMA_VIDEO_EXTENSIONS=".mp4,.mkv,.webm")
+VIDEOS_EXTENSIONS = tuple(
+    ext.strip().lower() for ext in os.environ.get('INTYMA_VIDEO_EXTENSIONS', '.mp4,.avi,.mkv,.mov,.wmv').split(',')
+    if ext.strip()
+)
+DISK_SCAN_WORKERS = int(os.environ.get('INTYMA_SCAN_WORKERS', 8))
+DISK_INVENTORY_TTL = 60  # secondes pendant lesquelles les routes réutilisent l'inventaire sans relire le disque
 
-        print(f"🔍 Scan du disque: {base_path}")
+_disk_inventory_state = {"rafraichi": None}  # time.monotonic() du dernier rafraîchissement
+_disk_inventory_lock = threading.Lock()
 
-        # Scanner les dossiers (actrices)
-        disk_actresses = []
-        disk_videos = []
 
-        for actress_folder in os.listdir(base_path):
-            actress_path = os.path.join(base_path, actress_folder)
-            if os.path.isdir(actress_path) and not actress_folder.startswith('.'):
-                try:
-                    # Lister les vidéos de cette actrice
-                    videos = []
-                    for file in os.listdir(actress_path):
-                        if file.lower().endswith(('.mp4', '.avi', '.mkv', '.mov', '.wmv')):
-                            videos.append(file)
-
-                    if videos:  # Seulement si elle a des vidéos
-                        disk_actresses.append({
-                            'name': actress_folder,
-                            'video_count': len(videos),
-                            'videos': videos
-                        })
-
-                        for video in videos:
-                            full_path = os.path.join(actress_path, video)
-                            relative_path = f"{actress_folder}/{video}"
-
-                            disk_videos.append({
-                                'actress': actress_folder,
-                                'filename': video,
-                                'relative_path': relative_path,
-                                'full_path': full_path,
-                                'size_mb': round(os.path.getsize(full_path) / (1024 * 1024), 1) if os.path.exists(
-                                    full_path) else 0
-                            })
+def normalize_relative_path(path):
+    """Forme comparable d'un chemin : NFC (macOS renvoie des noms décomposés), séparateurs '/'"""
+    return unicodedata.normalize('NFC', path.replace(os.sep, '/')).strip('/')
 
-                except Exception as e:
-                    print(f"❌ Erreur lecture dossier {actress_folder}: {e}")
-                    continue
-
-        # Récupérer les données de la BDD
-        db_scenes = Scene.query.all()
-        db_actresses = Actrice.query.all()
-
-        # Créer des sets pour comparaison rapide
-        db_scene_paths = set()
-        for scene in db_scenes:
-            if scene.chemin:
-                # Extraire le chemin relatif depuis le chemin complet
-                if scene.chemin.startswith('/Volumes/My Passport for Mac/Privé/M364TR0N/'):
-                    relative = scene.chemin.replace('/Volumes/My Passport for Mac/Privé/M364TR0N/', '')
-                    db_scene_paths.add(relative)
-
-        db_actress_names = {actress.nom.lower() for actress in db_actresses}
-
-        # Identifier les éléments manquants
-        missing_videos = []
-        missing_actresses = []
-        orphan_scenes = []
-
-        # Vidéos manquantes (sur disque mais pas en BDD)
-        for video in disk_videos:
-            if video['relative_path'] not in db_scene_paths:
-                missing_videos.append(video)
-
-        # Actrices manquantes (sur disque mais pas en BDD)
-        for actress in disk_actresses:
-            if actress['name'].lower() not in db_actress_names:
-                missing_actresses.append(actress)
-
-        # Scènes orphelines (en BDD mais plus sur disque)
-        for scene in db_scenes:
-            if scene.chemin and not os.path.exists(scene.chemin):
-                orphan_scenes.append({
-                    'id': scene.id,
-                    'titre': scene.titre,
-                    'chemin': scene.chemin
-                })
 
-        print(f"✅ Scan terminé: {len(disk_videos)} vidéos trouvées, {len(missing_videos)} manquantes")
+def scan_video_directory(path, extensions=None):
+    """
+    Vidéos d'un dossier : liste de (nom, taille, mtime)
+    Un seul scandir ; le type vient de l'entrée (pas de stat) et stat() n'est appelé
+    que pour les vidéos retenues.
+    """
+    extensions = tuple(extensions or VIDEOS_EXTENSIONS)
+    videos = []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.name.startswith('.') or not entry.name.lower().endswith(extensions):
+                continue
+            if entry.is_file():
+                stat = entry.stat()
+                videos.append((entry.name, stat.st_size, stat.st_mtime))
+    return videos
+
+
+def scan_video_directories(paths, extensions=None, workers=None, progress=None):
+    """
+    Relit plusieurs dossiers en parallèle (au plus `workers` threads, DISK_SCAN_WORKERS par défaut)
+    - paths : {clé: chemin du dossier}
+    - progress(dossiers_faits, dossiers_total, videos_trouvees) : appelé après chaque dossier
+    Retourne ({clé: liste de vidéos ou OSError}, statistiques dont fichiers_par_seconde)
+    """
+    if not paths:
+        return {}, {"workers": 0, "scan_ms": 0.0, "fichiers_par_seconde": None}
+
+    workers = max(1, min(workers or DISK_SCAN_WORKERS, len(paths)))
+    debut = time.perf_counter()
+    resultats = {}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='disk-scan') as pool:
+        futures = {pool.submit(scan_video_directory, path, extensions): key for key, path in paths.items()}
+        videos_trouvees = 0
+        for future in as_completed(futures):
+            try:
+                resultats[futures[future]] = future.result()
+                videos_trouvees += len(resultats[futures[future]])
+            except OSError as e:
+                resultats[futures[future]] = e
+            if progress:
+                progress(len(resultats), len(paths), videos_trouvees)
+
+    duree = time.perf_counter() - debut
+    nb_fichiers = sum(len(r) for r in resultats.values() if not isinstance(r, OSError))
+    return resultats, {
+        "workers": workers,
+        "scan_ms": round(duree * 1000, 1),
+        "fichiers_par_seconde": round(nb_fichiers / duree) if duree > 0 else None,
+    }
+
+
+def refresh_disk_inventory(base_path=None, force=False, workers=None, progress=None):
+    """
+    Met à jour disk_files et disk_directories depuis le disque, avec commit.
+    Seuls les dossiers nouveaux ou modifiés sont relus (tous avec force=True), en parallèle ;
+    un dossier illisible garde ses lignes et sera relu au prochain passage.
+    progress : voir scan_video_directories.
+    Lève FileNotFoundError si le disque n'est pas monté. Retourne les compteurs.
+    """
+    base_path = base_path or VIDEOS_PREFIX
+    if not os.path.isdir(base_path):
+        raise FileNotFoundError(f"Disque dur non trouvé: {base_path}")
+
+    with _disk_inventory_lock:
+        debut = time.perf_counter()
+        vu_le = datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')  # format DateTime de SQLAlchemy
+
+        dossiers = {}
+        with os.scandir(base_path) as entries:
+            for entry in entries:
+                if not entry.name.startswith('.') and entry.is_dir():
+                    dossiers[normalize_relative_path(entry.name)] = (entry.path, entry.stat().st_mtime)
+
+        connus = dict(db.session.query(DiskDirectory.chemin_relatif, DiskDirectory.mtime))
+        a_relire = [nom for nom, (_, mtime) in dossiers.items() if force or connus.get(nom) != mtime]
+        disparus = [nom for nom in connus if nom not in dossiers]
+
+        scans, scan_stats = scan_video_directories({nom: dossiers[nom][0] for nom in a_relire}, workers=workers,
+                                                   progress=progress)
+
+        fichiers, relus = [], []
+        for nom in a_relire:
+            videos = scans[nom]
+            if isinstance(videos, OSError):
+                print(f"❌ Erreur lecture dossier {nom}: {videos}")
+                continue
+            mtime = dossiers[nom][1]
+            fichiers.extend({
+                "chemin_relatif": f"{nom}/{normalize_relative_path(fichier)}",
+                "dossier_actrice": nom,
+                "taille": taille,
+                "mtime": fichier_mtime,
+                "vu_le": vu_le,
+            } for fichier, taille, fichier_mtime in videos)
+            relus.append({"chemin_relatif": nom, "mtime": mtime, "nb_fichiers": len(videos)})
+
+        if fichiers:
+            db.session.execute(text(
+                "INSERT INTO disk_files (chemin_relatif, dossier_actrice, taille, mtime, vu_le) "
+                "VALUES (:chemin_relatif, :dossier_actrice, :taille, :mtime, :vu_le) "
+                "ON CONFLICT (chemin_relatif) DO UPDATE SET dossier_actrice = excluded.dossier_actrice, "
+                "taille = excluded.taille, mtime = excluded.mtime, vu_le = excluded.vu_le, "
+                # L'empreinte n'est gardée que si le fichier n'a pas changé (cache par chemin, taille, mtime)
+                "empreinte = CASE WHEN disk_files.taille IS excluded.taille AND disk_files.mtime IS excluded.mtime "
+                "THEN disk_files.empreinte END"
+            ), fichiers)
+
+        supprimes = 0
+        if relus:
+            # Fichiers des dossiers relus qui n'y sont plus
+            supprimes += db.session.execute(text(
+                "DELETE FROM disk_files WHERE dossier_actrice IN :dossiers AND vu_le < :vu_le"
+            ).bindparams(bindparam('dossiers', expanding=True)), {
+                "dossiers": [d["chemin_relatif"] for d in relus], "vu_le": vu_le
+            }).rowcount
+            db.session.execute(text(
+                "INSERT INTO disk_directories (chemin_relatif, mtime, nb_fichiers) "
+                "VALUES (:chemin_relatif, :mtime, :nb_fichiers) "
+                "ON CONFLICT (chemin_relatif) DO UPDATE SET mtime = excluded.mtime, nb_fichiers = excluded.nb_fichiers"
+            ), relus)
+
+        if disparus:
+            supprimes += db.session.execute(text(
+                "DELETE FROM disk_files WHERE dossier_actrice IN :dossiers"
+            ).bindparams(bindparam('dossiers', expanding=True)), {"dossiers": disparus}).rowcount
+            db.session.execute(text(
+                "DELETE FROM disk_directories WHERE chemin_relatif IN :dossiers"
+            ).bindparams(bindparam('dossiers', expanding=True)), {"dossiers": disparus})
+
+        # Tous les dossiers restants viennent d'être vus sur le disque
+        db.session.execute(text("UPDATE disk_directories SET vu_le = :vu_le"), {"vu_le": vu_le})
+        mark_tables_written('disk_files', 'disk_directories')
+        db.session.commit()
+        _disk_inventory_state["rafraichi"] = time.monotonic()
+
+        stats = {
+            "dossiers": len(dossiers),
+            "dossiers_relus": len(relus),
+            "dossiers_disparus": len(disparus),
+            "fichiers_lus": len(fichiers),
+            "fichiers_supprimes": supprimes,
+            "dossiers_en_erreur": len(a_relire) - len(relus),
+            **scan_stats,
+            "elapsed_ms": round((time.perf_counter() - debut) * 1000, 1),
+        }
+        print(f"💽 Inventaire du disque: {stats}")
+        return stats
+
 
-        return jsonify({
+def ensure_disk_inventory(refresh=False):
+    """Rafraîchit l'inventaire s'il a plus de DISK_INVENTORY_TTL secondes (ou si refresh)"""
+    rafraichi = _disk_inventory_state["rafraichi"]
+    if refresh or rafraichi is None or time.monotonic() - rafraichi > DISK_INVENTORY_TTL:
+        return refresh_disk_inventory()
+    return None
+
+
+def path_key(relative_path):
+    """
+    Clé de comparaison d'un chemin relatif : NFC + casefold, comme le disque macOS
+    (insensible à la casse et à la normalisation Unicode, là où os.path.exists réussissait)
+    """
+    return unicodedata.normalize('NFC', relative_path).casefold()
+
+
+COMPARE_PROGRESS_EVERY = 200  # scènes vérifiées entre deux publications des orphelines
+COMPARE_PROGRESS_ORPHELINES = 100  # orphelines publiées au plus par étape (la liste complète à la fin)
+
+
+def compare_disk_and_db(progress=None):
+    """
+    Compare en une passe l'inventaire du disque et les chemins des scènes, par ensembles de
+    clés normalisées (recherches O(1), aucun accès disque pour les scènes sous VIDEOS_PREFIX).
+    Seules les scènes que l'inventaire ne peut pas contenir (hors de VIDEOS_PREFIX, pas directement
+    dans un dossier d'actrice, extension non vidéo) sont vérifiées sur le disque.
+    progress(scenes_verifiees, scenes_total, nb_orphelines, premieres_orphelines) : appelé toutes
+    les COMPARE_PROGRESS_EVERY scènes et à la fin, avec au plus COMPARE_PROGRESS_ORPHELINES orphelines.
+    Retourne les scènes orphelines, les vidéos non importées (triées) et les compteurs.
+    """
+    disk = {path_key(chemin_relatif): (chemin_relatif, taille)
+            for chemin_relatif, taille in db.session.query(DiskFile.chemin_relatif, DiskFile.taille)}
+    prefix = unicodedata.normalize('NFC', VIDEOS_PREFIX)
+    scenes_total = db.session.query(db.func.count(Scene.id)).scalar() if progress else None
+
+    matched = set()
+    orphan_scenes = []
+    hors_inventaire = 0
+    for verifiees, (scene_id, titre, chemin) in enumerate(db.session.query(Scene.id, Scene.titre, Scene.chemin)):
+        if progress and verifiees and verifiees % COMPARE_PROGRESS_EVERY == 0:
+            progress(verifiees, scenes_total, len(orphan_scenes), orphan_scenes[:COMPARE_PROGRESS_ORPHELINES])
+        if not chemin:
+            continue
+        normalized = unicodedata.normalize('NFC', chemin)
+        relative = normalized[len(prefix):]
+        if (normalized.startswith(prefix) and relative.count('/') == 1
+                and relative.lower().endswith(VIDEOS_EXTENSIONS)):
+            key = path_key(relative)
+            present = key in disk
+            if present:
+                matched.add(key)
+        else:
+            hors_inventaire += 1
+            present = os.path.exists(chemin)
+        if not present:
+            orphan_scenes.append({'id': scene_id, 'titre': titre, 'chemin': chemin})
+    if progress:
+        progress(scenes_total, scenes_total, len(orphan_scenes), orphan_scenes[:COMPARE_PROGRESS_ORPHELINES])
+
+    missing_videos = [disk_video_entry(chemin_relatif, taille)
+                      for key, (chemin_relatif, taille) in disk.items() if key not in matched]
+    missing_videos.sort(key=lambda v: v['relative_path'])
+
+    return {
+        'orphan_scenes': orphan_scenes,
+        'missing_videos': missing_videos,
+        'counts': {
+            'disk_videos': len(disk),
+            'matched': len(matched),
+            'missing_videos': len(missing_videos),
+            'orphan_scenes': len(orphan_scenes),
+            'outside_inventory': hors_inventaire
+        }
+    }
+
+
+def disk_video_entry(chemin_relatif, taille):
+    """Description d'une vidéo de l'inventaire au format des routes admin"""
+    actress, _, filename = chemin_relatif.partition('/')
+    return {
+        'actress': actress,
+        'filename': filename,
+        'relative_path': chemin_relatif,
+        'full_path': VIDEOS_PREFIX + chemin_relatif,
+        'size_mb': round((taille or 0) / (1024 * 1024), 1)
+    }
+
+
+@app.route('/api/admin/disk-inventory/refresh', methods=['POST'])
+def refresh_disk_inventory_route():
+    """Rafraîchit l'inventaire du disque (?force=1 : relit tous les dossiers)"""
+    try:
+        stats = refresh_disk_inventory(force=request.args.get('force') in ('1', 'true'))
+        return jsonify({"success": True, **stats})
+
+    except FileNotFoundError:
+        return jsonify({"error": "Disque dur non trouvé"}), 404
+    except Exception as e:
+        db.session.rollback()
+        print(f"❌ Erreur inventaire disque: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
+def disk_comparison_report(progress=None):
+    """
+    Comparaison complète inventaire du disque / BDD, au format de scan-disk
+    progress(rapport_partiel, scenes_verifiees, scenes_total) : rapport complet dans sa forme, avec
+    le nombre d'orphelines trouvées jusque-là (counts) et les premières d'entre elles ; la liste
+    complète des orphelines et missing_videos ne sont remplis que dans le rapport final
+    """
+    # Vidéos du disque par dossier d'actrice (noms de fichiers)
+    videos_by_actress = defaultdict(list)
+    for chemin_relatif, in db.session.query(DiskFile.chemin_relatif).order_by(DiskFile.chemin_relatif):
+        actress, _, filename = chemin_relatif.partition('/')
+        videos_by_actress[actress].append(filename)
+
+    disk_actresses = [
+        {'name': name, 'video_count': len(videos), 'videos': videos}
+        for name, videos in videos_by_actress.items()
+    ]
+    nb_disk_videos = sum(actress['video_count'] for actress in disk_actresses)
+
+    nb_scenes = db.session.query(db.func.count(Scene.id)).scalar()
+    db_actress_names = {unicodedata.normalize('NFC', nom).lower() for nom, in db.session.query(Actrice.nom)}
+
+    # Actrices manquantes (sur disque mais pas en BDD)
+    missing_actresses = [actress for actress in disk_actresses if actress['name'].lower() not in db_actress_names]
+
+    def build_report(orphan_scenes, missing_videos, counts):
+        return {
             'disk_stats': {
                 'total_actresses': len(disk_actresses),
-                'total_videos': len(disk_videos)
+                'total_videos': nb_disk_videos
             },
             'db_stats': {
-                'imported_actresses': len(db_actresses),
-                'imported_scenes': len(db_scenes)
+                'imported_actresses': len(db_actress_names),
+                'imported_scenes': nb_scenes
             },
             'comparison': {
                 'missing_actresses': missing_actresses,
                 'missing_videos': missing_videos[:100],  # Limiter pour l'affichage
-                'orphan_scenes': orphan_scenes
+                'orphan_scenes': orphan_scenes,
+                'counts': counts
             },
             'progress': {
-                'actresses_percent': round((len(db_actresses) / max(len(disk_actresses), 1)) * 100, 1),
-                'videos_percent': round((len(db_scenes) / max(len(disk_videos), 1)) * 100, 1)
+                'actresses_percent': round((len(db_actress_names) / max(len(disk_actresses), 1)) * 100, 1),
+                'videos_percent': round((nb_scenes / max(nb_disk_videos, 1)) * 100, 1)
             }
-        })
+        }
+
+    compare_progress = None
+    if progress:
+        def compare_progress(verifiees, total, nb_orphelines, premieres_orphelines):
+            progress(build_report(premieres_orphelines, [], {
+                'disk_videos': nb_disk_videos,
+                'orphan_scenes': nb_orphelines
+            }), verifiees, total)
+
+    matching = compare_disk_and_db(progress=compare_progress)
+
+    counts = matching['counts']
+    print(f"✅ Scan terminé: {counts['disk_videos']} vidéos trouvées, {counts['missing_videos']} manquantes, "
+          f"{counts['orphan_scenes']} scène(s) orpheline(s)")
+
+    return build_report(matching['orphan_scenes'], matching['missing_videos'], counts)
+
+
+@app.route('/api/admin/scan-disk', methods=['POST'])
+def scan_disk():
+    """
+    Scanner le disque dur et comparer avec la BDD (inventaire incrémental, ?force=1 : tout relire)
+    Synchrone : pour suivre la progression, lancer plutôt POST /api/admin/jobs/scan-disk
+    """
+    try:
+        try:
+            inventory = refresh_disk_inventory(force=request.args.get('force') in ('1', 'true'))
+        except FileNotFoundError:
+            return jsonify({"error": "Disque dur non trouvé"}), 404
+
+        report = disk_comparison_report()
+        report['inventory'] = inventory
+        return jsonify(report)
 
     except Exception as e:
         print(f"❌ Erreur scan disque: {e}")
         return jsonify({"error": str(e)}), 500
 
 
+# ==================== EMPREINTES ET DOUBLONS ====================
+# disk_files.empreinte : empreinte échantillonnée du contenu (taille + début, milieu et fin,
+# voir fingerprint.py), calculée dans un pool de processus. Elle reste valable tant que la
+# taille et le mtime du fichier ne changent pas (refresh_disk_inventory l'efface sinon) :
+# seuls les fichiers nouveaux ou modifiés sont relus.
+
+FINGERPRINT_WORKERS = int(os.environ.get('INTYMA_FINGERPRINT_WORKERS', min(4, os.cpu_count() or 1)))
+FINGERPRINT_BATCH = 200  # empreintes écrites par commit
+FINGERPRINT_SCRIPT = os.path.join(basedir, 'fingerprint.py')
+
+
+def write_fingerprints(rows):
+    """Enregistre un lot d'empreintes, sauf pour les fichiers modifiés depuis la lecture (avec commit)"""
+    if rows:
+        db.session.execute(text(
+            "UPDATE disk_files SET empreinte = :empreinte WHERE id = :id AND taille IS :taille AND mtime IS :mtime"
+        ), rows)
+        mark_tables_written('disk_files')
+        db.session.commit()
+
+
+def compute_missing_fingerprints(workers=None, progress=None):
+    """
+    Calcule les empreintes manquantes de l'inventaire dans un pool de processus,
+    avec un commit tous les FINGERPRINT_BATCH fichiers (les doublons déjà trouvés restent lisibles).
+    progress(fichiers_faits, fichiers_total, octets_lus, erreurs) est appelé après chaque fichier.
+    """
+    fichiers = {file_id: (chemin_relatif, taille, mtime) for file_id, chemin_relatif, taille, mtime in
+                db.session.query(DiskFile.id, DiskFile.chemin_relatif, DiskFile.taille, DiskFile.mtime).filter(
+                    DiskFile.empreinte.is_(None)).order_by(DiskFile.chemin_relatif)}
+    debut = time.perf_counter()
+    faits = erreurs = octets_lus = 0
+
+    if fichiers:
+        workers = max(1, min(workers or FINGERPRINT_WORKERS, len(fichiers)))
+        tasks = [(file_id, VIDEOS_PREFIX + chemin_relatif, taille)
+                 for file_id, (chemin_relatif, taille, _) in fichiers.items()]
+        lot = []
+        # Pool lancé par fingerprint.py dans un processus à part : en spawn (le serveur a des threads,
+        # pas de fork), les processus du pool réimportent le module principal, ici fingerprint.py
+        # au lieu d'app.py (Flask, SQLAlchemy, configuration de l'app)
+        calcul = subprocess.Popen([sys.executable, FINGERPRINT_SCRIPT, str(workers)], cwd=basedir,
+                                  stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        try:
+            calcul.stdin.write(json.dumps(tasks))
+            calcul.stdin.close()
+            for ligne in calcul.stdout:
+                file_id, empreinte, erreur = json.loads(ligne)
+                faits += 1
+                chemin_relatif, taille, mtime = fichiers[file_id]
+                if erreur:
+                    erreurs += 1
+                    print(f"❌ Empreinte impossible pour {chemin_relatif}: {erreur}")
+                else:
+                    octets_lus += min(taille or 0, 3 * EMPREINTE_BLOC)
+                    lot.append({"id": file_id, "empreinte": empreinte, "taille": taille, "mtime": mtime})
+                if len(lot) >= FINGERPRINT_BATCH:
+                    write_fingerprints(lot)
+                    lot = []
+                if progress:
+                    progress(faits, len(fichiers), octets_lus, erreurs)
+            if calcul.wait() != 0:
+                raise RuntimeError(f"Calcul des empreintes interrompu (code {calcul.returncode})")
+        finally:
+            if calcul.poll() is None:
+                calcul.kill()
+                calcul.wait()
+        write_fingerprints(lot)
+
+    duree = time.perf_counter() - debut
+    stats = {
+        "fichiers": len(fichiers),
+        "erreurs": erreurs,
+        "octets_lus": octets_lus,
+        "fichiers_par_seconde": round(faits / duree, 1) if faits and duree > 0 else None,
+        "elapsed_ms": round(duree * 1000, 1),
+    }
+    print(f"🧬 Empreintes: {stats}")
+    return stats
+
+
+def find_duplicate_groups():
+    """
+    Groupes de fichiers de même empreinte (index sur disk_files.empreinte), triés par
+    espace récupérable décroissant, avec la scène correspondant à chaque fichier
+    """
+    prefix = unicodedata.normalize('NFC', VIDEOS_PREFIX)
+    scenes_by_key = {}
+    for scene_id, chemin in db.session.query(Scene.id, Scene.chemin):
+        normalized = unicodedata.normalize('NFC', chemin or '')
+        if normalized.startswith(prefix):
+            scenes_by_key[path_key(normalized[len(prefix):])] = scene_id
+
+    groups = defaultdict(list)
+    for empreinte, chemin_relatif, taille in db.session.execute(text(
+            "SELECT empreinte, chemin_relatif, taille FROM disk_files WHERE empreinte IN ("
+            "  SELECT empreinte FROM disk_files WHERE empreinte IS NOT NULL GROUP BY empreinte HAVING count(*) > 1"
+            ") ORDER BY empreinte, chemin_relatif")):
+        groups[empreinte].append({
+            **disk_video_entry(chemin_relatif, taille),
+            'scene_id': scenes_by_key.get(path_key(chemin_relatif))
+        })
+
+    result = []
+    for empreinte, files in groups.items():
+        size_mb = files[0]['size_mb']
+        result.append({
+            'fingerprint': empreinte,
+            'size_mb': size_mb,
+            'copies': len(files),
+            'reclaimable_mb': round(size_mb * (len(files) - 1), 1),
+            'actresses': sorted({f['actress'] for f in files}),
+            'files': files
+        })
+    result.sort(key=lambda group: group['reclaimable_mb'], reverse=True)
+    return result
+
+
+@app.route('/api/admin/duplicates', methods=['GET'])
+def get_duplicates():
+    """
+    Vidéos en double sur le disque (même empreinte de contenu), par espace récupérable
+    - ?inter_dossiers=1 : seulement les groupes répartis sur plusieurs dossiers d'actrices
+    - les empreintes se calculent avec POST /api/admin/jobs/fingerprints ;
+      fingerprints.pending compte les fichiers pas encore traités
+    """
+    try:
+        groups = find_duplicate_groups()
+        if request.args.get('inter_dossiers') in ('1', 'true'):
+            groups = [group for group in groups if len(group['actresses']) > 1]
+
+        total, pending = db.session.query(
+            db.func.count(DiskFile.id), db.func.count(DiskFile.id).filter(DiskFile.empreinte.is_(None))
+        ).one()
+
+        return jsonify({
+            'groups': groups,
+            'group_count': len(groups),
+            'duplicate_files': sum(group['copies'] - 1 for group in groups),
+            'reclaimable_mb': round(sum(group['reclaimable_mb'] for group in groups), 1),
+            'fingerprints': {'total': total, 'pending': pending}
+        })
+
+    except Exception as e:
+        print(f"❌ Erreur doublons: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
+# ==================== TÂCHES DE FOND ====================
+
+# Les scans longs tournent dans un thread. Leur état (progression, résultats partiels)
+# se lit par GET /api/admin/jobs/<id> ou se suit en direct en Server-Sent Events
+# sur /api/admin/jobs/<id>/events. Les tâches vivent en mémoire du processus.
+
+JOBS_MAX_TERMINES = 20  # tâches terminées conservées
+JOBS_SSE_HEARTBEAT = 15  # secondes entre deux commentaires SSE quand rien ne change
+JOBS_STATUTS_FINAUX = ('termine', 'erreur')
+
+
+class BackgroundJob:
+    """
+    Une tâche de fond : statut, progression et résultat (partiel tant qu'elle tourne).
+    Chaque mise à jour incrémente `version` et réveille les flux SSE en attente.
+    """
+
+    def __init__(self, kind, params=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.params = params or {}
+        self.status = 'en_attente'
+        self.progress = {}
+        self.result = {}
+        self.error = None
+        self.created = datetime.now()
+        self.finished = None
+        self.version = 0
+        self.result_version = 0
+        self._condition = threading.Condition()
+
+    def update(self, status=None, progress=None, result=None, error=None):
+        """Fusionne progress et result (clés de premier niveau) ; ne pas modifier ensuite les objets passés"""
+        with self._condition:
+            if status:
+                self.status = status
+                if status in JOBS_STATUTS_FINAUX:
+                    self.finished = datetime.now()
+            if progress:
+                self.progress = {**self.progress, **progress}
+            if result:
+                self.result = {**self.result, **result}
+                self.result_version += 1
+            if error:
+                self.error = error
+            self.version += 1
+            self._condition.notify_all()
+
+    def wait_for_change(self, version, timeout):
+        """Attend une mise à jour postérieure à `version` ; retourne la version courante"""
+        with self._condition:
+            self._condition.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+    @property
+    def done(self):
+        return self.status in JOBS_STATUTS_FINAUX
+
+    def snapshot(self, with_result=True):
+        with self._condition:
+            data = {
+                "id": self.id,
+                "type": self.kind,
+                "params": self.params,
+                "status": self.status,
+                "progress": dict(self.progress),
+                "error": self.error,
+                "created": self.created.isoformat(),
+                "finished": self.finished.isoformat() if self.finished else None,
+                "version": self.version,
+                "result_version": self.result_version,
+            }
+            if with_result:
+                data["result"] = dict(self.result)
+            return data
+
+
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+
+def start_job(kind, target, params=None):
+    """Lance target(job) dans un thread avec son propre contexte d'application"""
+    job = BackgroundJob(kind, params)
+    with _jobs_lock:
+        _jobs[job.id] = job
+        termines = [j for j in _jobs.values() if j.done]
+        for ancien in termines[:-JOBS_MAX_TERMINES]:
+            del _jobs[ancien.id]
+
+    threading.Thread(target=_run_job, args=(job, target), name=f'job-{job.id}', daemon=True).start()
+    return job
+
+
+def _run_job(job, target):
+    with app.app_context():
+        try:
+            job.update(status='en_cours')
+            target(job)
+            job.update(status='termine')
+        except FileNotFoundError:
+            job.update(status='erreur', error="Disque dur non trouvé")
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Erreur tâche {job.kind} {job.id}: {e}")
+            job.update(status='erreur', error=str(e))
+        finally:
+            db.session.remove()
+
+
+def run_scan_disk_job(job):
+    """
+    scan-disk par étapes : inventaire (progression par dossier), puis comparaison avec la BDD
+    (résultat partiel publié au fil de la vérification des scènes orphelines)
+    """
+    job.update(progress={"phase": "inventaire", "dossiers_faits": 0, "dossiers_a_relire": None, "videos_trouvees": 0})
+    inventory = refresh_disk_inventory(
+        force=job.params.get('force', False),
+        progress=lambda faits, total, videos: job.update(progress={
+            "dossiers_faits": faits, "dossiers_a_relire": total, "videos_trouvees": videos
+        }))
+
+    # Résultats partiels : le rapport est publié à chaque étape avec le nombre d'orphelines
+    # et les premières d'entre elles, la liste complète une seule fois à la fin
+    job.update(progress={"phase": "comparaison", "scenes_verifiees": 0, "scenes_total": None, "orphelines": 0})
+
+    def publish_partial(report, verifiees, total):
+        report['inventory'] = inventory
+        job.update(progress={
+            "scenes_verifiees": verifiees, "scenes_total": total,
+            "orphelines": report['comparison']['counts']['orphan_scenes']
+        }, result=report)
+
+    report = disk_comparison_report(progress=publish_partial)
+    report['inventory'] = inventory
+    job.update(progress={"phase": "termine", **report['comparison']['counts']}, result=report)
+
+
+def run_fingerprint_job(job):
+    """Inventaire complet, puis empreintes des fichiers nouveaux ou modifiés, puis résumé des doublons"""
+    # Relecture de tous les dossiers : un fichier réécrit sur place ne change pas le mtime de son
+    # dossier, mais sa taille ou son mtime changent et son empreinte est alors effacée.
+    # Un stat par fichier reste négligeable devant les 3 Mo lus par empreinte.
+    job.update(progress={"phase": "inventaire"})
+    inventory = refresh_disk_inventory(force=True)
+
+    job.update(progress={"phase": "empreintes", "fichiers_faits": 0, "fichiers_total": None, "erreurs": 0})
+    stats = compute_missing_fingerprints(progress=lambda faits, total, octets, erreurs: job.update(progress={
+        "fichiers_faits": faits, "fichiers_total": total, "octets_lus": octets, "erreurs": erreurs
+    }))
+
+    groups = find_duplicate_groups()
+    job.update(progress={"phase": "termine"}, result={
+        "inventory": inventory,
+        "fingerprints": stats,
+        "group_count": len(groups),
+        "reclaimable_mb": round(sum(group['reclaimable_mb'] for group in groups), 1),
+    })
+
+
+JOB_TYPES = {
+    'scan-disk': run_scan_disk_job,
+    'fingerprints': run_fingerprint_job,
+}
+
+
+@app.route('/api/admin/jobs/<kind>', methods=['POST'])
+def create_job(kind):
+    """
+    Lance une tâche de fond (scan-disk ?force=1 : relire tous les dossiers ; fingerprints)
+    et répond 202 avec son id
+    Si une tâche du même type tourne déjà, elle est renvoyée (200) au lieu d'en lancer une autre.
+    """
+    if kind not in JOB_TYPES:
+        return jsonify({"error": f"Type de tâche inconnu: {kind} ({', '.join(JOB_TYPES)})"}), 400
+
+    with _jobs_lock:
+        en_cours = next((j for j in _jobs.values() if j.kind == kind and not j.done), None)
+    if en_cours:
+        job, status_code = en_cours, 200
+    else:
+        job = start_job(kind, JOB_TYPES[kind], {"force": request.args.get('force') in ('1', 'true')})
+        status_code = 202
+
+    return jsonify({
+        "job": job.snapshot(with_result=False),
+        "status_url": f"/api/admin/jobs/{job.id}",
+        "events_url": f"/api/admin/jobs/{job.id}/events"
+    }), status_code
+
+
+@app.route('/api/admin/jobs', methods=['GET'])
+def list_jobs():
+    """Tâches connues, sans leurs résultats"""
+    with _jobs_lock:
+        jobs = list(_jobs.values())
+    return jsonify([job.snapshot(with_result=False) for job in reversed(jobs)])
+
+
+@app.route('/api/admin/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Statut, progression et résultat (partiel tant que la tâche tourne)"""
+    job = _jobs.get(job_id)
+    if not job:
+        return jsonify({"error": "Tâche inconnue"}), 404
+    return jsonify(job.snapshot())
+
+
+@app.route('/api/admin/jobs/<job_id>/events', methods=['GET'])
+def stream_job_events(job_id):
+    """
+    Suivi en Server-Sent Events : un événement `progress` à chaque changement
+    (avec `result` seulement s'il a changé), puis un événement `end` avec l'état final.
+    """
+    job = _jobs.get(job_id)
+    if not job:
+        return jsonify({"error": "Tâche inconnue"}), 404
+
+    def events():
+        version, result_version = None, None
+        while True:
+            if version is not None and job.wait_for_change(version, JOBS_SSE_HEARTBEAT) == version:
+                yield ": ping\n\n"
+                continue
+            snapshot = job.snapshot()
+            if snapshot["status"] in JOBS_STATUTS_FINAUX:
+                yield f"event: end\ndata: {json.dumps(snapshot)}\n\n"
+                return
+            if snapshot["result_version"] == result_version:
+                del snapshot["result"]
+            version, result_version = snapshot["version"], snapshot["result_version"]
+            yield f"event: progress\ndata: {json.dumps(snapshot)}\n\n"
+
+    return Response(events(), mimetype='text/event-stream',
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
 @app.route('/api/admin/random-video', methods=['POST'])
 def get_random_unimported_video():
-    """Récupérer une vidéo aléatoire non importée et l'ouvrir"""
+    """Récupérer une vidéo aléatoire non importée et l'ouvrir (depuis l'inventaire du disque)"""
     try:
-        base_path = '/Volumes/My Passport for Mac/Privé/M364TR0N/'
+        try:
+            ensure_disk_inventory(refresh=request.args.get('refresh') in ('1', 'true'))
+        except FileNotFoundError:
+            return jsonify({"error": "Disque dur non trouvé"}), 404
 
-        # Scanner toutes les vidéos
-        all_videos = []
-        for actress_folder in os.listdir(base_path):
-            actress_path = os.path.join(base_path, actress_folder)
-            if os.path.isdir(actress_path) and not actress_folder.startswith('.'):
-                try:
-                    for file in os.listdir(actress_path):
-                        if file.lower().endswith(('.mp4', '.avi', '.mkv', '.mov', '.wmv')):
-                            full_path = os.path.join(actress_path, file)
-                            relative_path = f"{actress_folder}/{file}"
-                            all_videos.append({
-                                'actress': actress_folder,
-                                'filename': file,
-                                'relative_path': relative_path,
-                                'full_path': full_path
-                            })
-                except:
-                    continue
-
-        if not all_videos:
+        matching = compare_disk_and_db()
+        if not matching['counts']['disk_videos']:
             return jsonify({"error": "Aucune vidéo trouvée sur le disque"}), 404
 
-        # Filtrer les vidéos déjà importées
-        db_scene_paths = set()
-        db_scenes = Scene.query.all()
-        for scene in db_scenes:
-            if scene.chemin:
-                if scene.chemin.startswith('/Volumes/My Passport for Mac/Privé/M364TR0N/'):
-                    relative = scene.chemin.replace('/Volumes/My Passport for Mac/Privé/M364TR0N/', '')
-                    db_scene_paths.add(relative)
-
         # Vidéos non importées
-        unimported_videos = [v for v in all_videos if v['relative_path'] not in db_scene_paths]
+        unimported_videos = matching['missing_videos']
 
         if not unimported_videos:
             return jsonify({"error": "Toutes les vidéos sont déjà importées ! 🎉"}), 404
@@ -1944,8 +4048,7 @@ def get_random_unimported_video():
                 "full_path": random_video['full_path'],
                 "relative_path": random_video['relative_path'],
                 "suggested_title": clean_title,
-                "size_mb": round(os.path.getsize(random_video['full_path']) / (1024 * 1024), 1) if os.path.exists(
-                    random_video['full_path']) else 0
+                "size_mb": random_video['size_mb']
             },
             "actress_info": {
                 "exists_in_db": actrice_existante is not None,
@@ -1954,7 +4057,7 @@ def get_random_unimported_video():
             },
             "stats": {
                 "total_unimported": len(unimported_videos),
-                "total_videos_on_disk": len(all_videos)
+                "total_videos_on_disk": matching['counts']['disk_videos']
             },
             "open_result": {
                 "opened": video_opened,
@@ -2021,12 +4124,12 @@ def quick_add_scene_from_video():
                         db.session.flush()
                     scene.tags.append(tag)
 
-        db.session.commit()
+        index_scenes_fts([scene.id])
 
-        # Mettre à jour les stats actrice si applicable
-        if data.get('actress_id'):
-            update_actrice_note_moyenne(data['actress_id'])
-            update_actrice_tags_typiques(data['actress_id'])
+        # Mettre à jour les stats actrice si applicable (deltas, même transaction)
+        apply_scene_aggregate_delta(scene_aggregate_state(None), scene_aggregate_state(scene))
+
+        db.session.commit()
 
         print(f"✅ Scène ajoutée rapidement: {scene.titre}")
 
@@ -2046,24 +4149,30 @@ def quick_add_scene_from_video():
 
 @app.route('/api/admin/debug/orphan-scenes', methods=['GET'])
 def get_orphan_scenes():
-    """Récupérer les détails des scènes orphelines"""
+    """Récupérer les détails des scènes orphelines (comparaison avec l'inventaire du disque)"""
     try:
-        orphan_scenes = []
-        scenes = Scene.query.all()
+        try:
+            ensure_disk_inventory(refresh=request.args.get('refresh') in ('1', 'true'))
+        except FileNotFoundError:
+            return jsonify({"error": "Disque dur non trouvé"}), 404
 
-        for scene in scenes:
-            if scene.chemin and not os.path.exists(scene.chemin):
-                orphan_scenes.append({
-                    'id': scene.id,
-                    'titre': scene.titre,
-                    'chemin': scene.chemin,
-                    'date_ajout': scene.date_ajout.isoformat() if scene.date_ajout else None,
-                    'actrices': [a.nom for a in scene.actrices] if scene.actrices else []
-                })
+        matching = compare_disk_and_db()
+        orphan_ids = [orphan['id'] for orphan in matching['orphan_scenes']]
+        scenes = Scene.query.options(selectinload(Scene.actrices)).filter(
+            Scene.id.in_(orphan_ids)).order_by(Scene.id).all() if orphan_ids else []
+
+        orphan_scenes = [{
+            'id': scene.id,
+            'titre': scene.titre,
+            'chemin': scene.chemin,
+            'date_ajout': scene.date_ajout.isoformat() if scene.date_ajout else None,
+            'actrices': [a.nom for a in scene.actrices]
+        } for scene in scenes]
 
         return jsonify({
             'orphan_scenes': orphan_scenes,
-            'count': len(orphan_scenes)
+            'count': len(orphan_scenes),
+            'counts': matching['counts']
         })
 
     except Exception as e:
@@ -2072,32 +4181,28 @@ def get_orphan_scenes():
 
 @app.route('/api/admin/debug/disk-actresses', methods=['GET'])
 def get_disk_actresses():
-    """Analyser les dossiers d'actrices sur le disque"""
+    """Analyser les dossiers d'actrices sur le disque (depuis l'inventaire, ?refresh=1 : relire le disque)"""
     try:
-        base_path = '/Volumes/My Passport for Mac/Privé/M364TR0N/'
-
-        if not os.path.exists(base_path):
+        try:
+            ensure_disk_inventory(refresh=request.args.get('refresh') in ('1', 'true'))
+        except FileNotFoundError:
             return jsonify({"error": "Disque dur non trouvé"}), 404
 
-        disk_folders = []
-        for item in os.listdir(base_path):
-            item_path = os.path.join(base_path, item)
-            if os.path.isdir(item_path) and not item.startswith('.'):
-                # Compter les fichiers vidéos
-                video_files = []
-                try:
-                    for file in os.listdir(item_path):
-                        if file.lower().endswith(('.mp4', '.avi', '.mkv', '.mov', '.wmv')):
-                            video_files.append(file)
-                except:
-                    video_files = []
-
-                disk_folders.append({
-                    'name': item,
-                    'video_count': len(video_files),
-                    'has_videos': len(video_files) > 0,
-                    'sample_videos': video_files[:3] if video_files else []
-                })
+        # 3 vidéos d'exemple par dossier, en une requête
+        samples = defaultdict(list)
+        for dossier, chemin_relatif in db.session.execute(text(
+                "SELECT dossier_actrice, chemin_relatif FROM ("
+                "  SELECT dossier_actrice, chemin_relatif, ROW_NUMBER() OVER ("
+                "    PARTITION BY dossier_actrice ORDER BY chemin_relatif) AS rang FROM disk_files"
+                ") WHERE rang <= 3 ORDER BY dossier_actrice, rang")):
+            samples[dossier].append(chemin_relatif.partition('/')[2])
+
+        disk_folders = [{
+            'name': name,
+            'video_count': video_count or 0,
+            'has_videos': bool(video_count),
+            'sample_videos': samples.get(name, [])
+        } for name, video_count in db.session.query(DiskDirectory.chemin_relatif, DiskDirectory.nb_fichiers)]
 
         # Trier par nombre de vidéos décroissant
         disk_folders.sort(key=lambda x: x['video_count'], reverse=True)
@@ -2122,53 +4227,21 @@ def get_disk_actresses():
 
 @app.route('/api/admin/debug/missing-videos', methods=['GET'])
 def get_missing_videos_sample():
-    """Récupérer un échantillon des vidéos manquantes"""
+    """Récupérer un échantillon des vidéos manquantes (depuis l'inventaire du disque)"""
     try:
-        base_path = '/Volumes/My Passport for Mac/Privé/M364TR0N/'
-
-        # Scanner quelques vidéos du disque
-        sample_missing = []
-        db_scene_paths = set()
-
-        # Récupérer les chemins déjà en BDD
-        db_scenes = Scene.query.all()
-        for scene in db_scenes:
-            if scene.chemin:
-                if scene.chemin.startswith('/Volumes/My Passport for Mac/Privé/M364TR0N/'):
-                    relative = scene.chemin.replace('/Volumes/My Passport for Mac/Privé/M364TR0N/', '')
-                    db_scene_paths.add(relative)
-
-        # Scanner un échantillon du disque
-        count = 0
-        for actress_folder in os.listdir(base_path):
-            if count >= 20:  # Limite pour ne pas surcharger
-                break
-
-            actress_path = os.path.join(base_path, actress_folder)
-            if os.path.isdir(actress_path) and not actress_folder.startswith('.'):
-                try:
-                    for file in os.listdir(actress_path):
-                        if file.lower().endswith(('.mp4', '.avi', '.mkv', '.mov', '.wmv')):
-                            relative_path = f"{actress_folder}/{file}"
-
-                            if relative_path not in db_scene_paths:
-                                sample_missing.append({
-                                    'actress': actress_folder,
-                                    'filename': file,
-                                    'relative_path': relative_path,
-                                    'size_mb': round(os.path.getsize(os.path.join(actress_path, file)) / (1024 * 1024),
-                                                     1)
-                                })
-                                count += 1
-
-                                if count >= 20:  # Max 20 exemples
-                                    break
-                except:
-                    continue
+        try:
+            ensure_disk_inventory(refresh=request.args.get('refresh') in ('1', 'true'))
+        except FileNotFoundError:
+            return jsonify({"error": "Disque dur non trouvé"}), 404
+
+        matching = compare_disk_and_db()
+        sample_missing = [{k: v for k, v in video.items() if k != 'full_path'}
+                          for video in matching['missing_videos'][:20]]  # Max 20 exemples
 
         return jsonify({
             'sample_missing_videos': sample_missing,
             'sample_count': len(sample_missing),
+            'total_missing': matching['counts']['missing_videos'],
             'note': 'Échantillon de 20 vidéos manquantes maximum'
         })
 
@@ -2317,4 +4390,6 @@ def delete_video():
 if __name__ == '__main__':
     with app.app_context():
         db.create_all()  # Crée toutes les tables si elles n'existent pas
+        ensure_scenes_fts()  # Table virtuelle FTS5 (hors modèles SQLAlchemy)
+    ensure_trending_scores_current()  # Vieillissement quotidien des scores, en arrière-plan
     app.run(debug=True)
\ No newline at end of file
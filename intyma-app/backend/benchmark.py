@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Benchmark des routes GET sur une bibliothèque synthétique
+- Génère une base SQLite déterministe (graine fixe) dans un fichier temporaire
+- Appelle chaque route GET via le client de test Flask (aucun serveur, aucun réseau)
+- Mesure p50/p95 et le nombre de requêtes SQL par route
+
+Exécuter avec: python benchmark.py --scenes 10000
+Comparer à une mesure précédente: python benchmark.py --json base.json, puis --baseline base.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from urllib.parse import quote
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+QUALITES = ["4K", "1080p", "720p", "SD"]
+SITES = ["Brazzers", "Blacked", "Tushy", "Vixen", "RealityKings", "Bangbros", "Nubiles", "DigitalPlayground"]
+STUDIOS = ["Studio A", "Studio B", "Studio C", "Studio D", "Studio E", "Studio F"]
+NATIONALITES = ["Américaine", "Française", "Tchèque", "Russe", "Hongroise", "Brésilienne", "Canadienne"]
+NOTES = ["⭐", "⭐⭐", "⭐⭐⭐", "⭐⭐⭐⭐", "⭐⭐⭐⭐⭐", "4/5", "8/10", "3.5", "excellent", "bien", None]
+MOTS = ("scène soirée hôtel plage bureau cuisine salon piscine voyage rencontre surprise "
+        "amie voisine étudiante massage séance week-end vacances nuit matin").split()
+
+# Routes servant des fichiers depuis le disque : hors du périmètre de la base
+ROUTES_IGNOREES = {"static", "serve_miniature", "serve_photo", "serve_collection_image"}
+
+# Variantes avec paramètres, en plus de l'appel sans paramètre de chaque route
+VARIANTES = [
+    "/api/scenes?all=1",
+    "/api/scenes?order=date_ajout&limit=100",
+    "/api/search?q={mot}",
+    "/api/scenes/search?q={mot}&sort=note&order=desc",
+    "/api/scenes/search?tags={tag}&note_min=3&sort=date_ajout",
+    "/api/scenes/search?qualite=4K&duree_min=20&duree_max=60",
+    "/api/facets?top=20",
+    "/api/stats/timeline?granularity=week",
+    "/api/stats/timeline?granularity=month&debut=2020-01-01",
+]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark des routes GET d'Intyma sur une base synthétique")
+    parser.add_argument("--scenes", type=int, default=1000, help="nombre de scènes (ex: 1000, 10000, 100000)")
+    parser.add_argument("--actrices", type=int, default=None, help="nombre d'actrices (défaut: scènes / 20)")
+    parser.add_argument("--tags", type=int, default=150, help="nombre de tags")
+    parser.add_argument("--favoris", type=float, default=0.05, help="proportion de scènes en favoris")
+    parser.add_argument("--historique", type=float, default=0.3, help="proportion de scènes déjà vues")
+    parser.add_argument("--seed", type=int, default=42, help="graine du générateur")
+    parser.add_argument("--repetitions", type=int, default=20, help="appels mesurés par route")
+    parser.add_argument("--sans-cache", action="store_true", help="vide le cache des réponses avant chaque appel")
+    parser.add_argument("--routes", default=None, help="ne mesure que les URLs contenant ce texte")
+    parser.add_argument("--db", default=None, help="fichier SQLite à utiliser (réutilisé s'il existe)")
+    parser.add_argument("--json", default=None, help="écrit les résultats dans ce fichier")
+    parser.add_argument("--verbose", action="store_true", help="affiche les logs de l'application pendant les mesures")
+    parser.add_argument("--baseline", default=None, help="résultats précédents (--json) à comparer")
+    parser.add_argument("--seuil", type=float, default=1.25, help="ratio p50 au-delà duquel une route régresse")
+    return parser
+
+
+def generate_library(args):
+    """Remplit une base vide avec une bibliothèque déterministe (insertions groupées)"""
+    from app import db, rebuild_scenes_fts, rebuild_actrice_aggregates, rebuild_view_activity, VIDEOS_PREFIX
+    from models import Scene, Actrice, Tag, Favorite, History, ViewEvent, scene_actrice, scene_tag, parse_note
+
+    rng = random.Random(args.seed)
+    nb_actrices = args.actrices or max(20, args.scenes // 20)
+    today = date.today()
+
+    actrices = [{
+        "id": i,
+        "nom": f"Actrice {i:06d}",
+        "photo": f"Actrice {i:06d}.jpg",
+        "nationalite": rng.choice(NATIONALITES),
+        "date_naissance": date(1980, 1, 1) + timedelta(days=rng.randrange(8000)),
+    } for i in range(1, nb_actrices + 1)]
+    tags = [{"id": i, "nom": f"tag {i:04d}"} for i in range(1, args.tags + 1)]
+
+    # Popularité inégale : quelques actrices et tags reviennent beaucoup plus souvent
+    poids_actrices = [1 / i for i in range(1, nb_actrices + 1)]
+    poids_tags = [1 / i for i in range(1, args.tags + 1)]
+
+    scenes, liens_actrices, liens_tags = [], [], []
+    for i in range(1, args.scenes + 1):
+        casting = set(rng.choices(range(1, nb_actrices + 1), weights=poids_actrices, k=rng.choice((1, 1, 1, 2, 3))))
+        principale = f"Actrice {min(casting):06d}"
+        note = rng.choice(NOTES)
+        scenes.append({
+            "id": i,
+            "chemin": f"{VIDEOS_PREFIX}{principale}/scene_{i:06d}.mp4",
+            "titre": " ".join(rng.choices(MOTS, k=rng.randint(2, 5))).capitalize() + f" {i}",
+            "synopsis": " ".join(rng.choices(MOTS, k=rng.randint(10, 30))),
+            "duree": rng.randint(8, 90),
+            "qualite": rng.choice(QUALITES),
+            "site": rng.choice(SITES),
+            "studio": rng.choice(STUDIOS),
+            "date_ajout": today - timedelta(days=rng.randrange(1500)),
+            "date_scene": today - timedelta(days=rng.randrange(4000)),
+            "note_perso": note,
+            "note_value": parse_note(note),
+            "image": f"{principale}/scene_{i:06d}.jpg",
+        })
+        liens_actrices.extend({"scene_id": i, "actrice_id": a} for a in casting)
+        liens_tags.extend({"scene_id": i, "tag_id": t}
+                          for t in set(rng.choices(range(1, args.tags + 1), weights=poids_tags, k=rng.randint(3, 8))))
+
+    scene_ids = list(range(1, args.scenes + 1))
+    favoris = [{"scene_id": sid, "date_ajout": today - timedelta(days=rng.randrange(700))}
+               for sid in rng.sample(scene_ids, int(args.scenes * args.favoris))]
+    # Journal des vues, et History comme résumé par scène
+    historique, vues = [], []
+    for sid in rng.sample(scene_ids, int(args.scenes * args.historique)):
+        premiere = datetime.combine(today - timedelta(days=rng.randrange(900)), datetime.min.time())
+        etendue = (datetime.combine(today, datetime.min.time()) - premiere).total_seconds()
+        dates = sorted([premiere] + [premiere + timedelta(seconds=rng.uniform(0, etendue))
+                                     for _ in range(rng.randint(0, 24))])
+        vues.extend({"scene_id": sid, "date_vue": d} for d in dates)
+        historique.append({
+            "scene_id": sid,
+            "date_vue": dates[-1].date(),
+            "date_premiere_vue": premiere.date(),
+            "derniere_vue": dates[-1].date(),
+            "nb_vues": len(dates),
+        })
+
+    db.session.execute(Actrice.__table__.insert(), actrices)
+    db.session.execute(Tag.__table__.insert(), tags)
+    db.session.execute(Scene.__table__.insert(), scenes)
+    db.session.execute(scene_actrice.insert(), liens_actrices)
+    db.session.execute(scene_tag.insert(), liens_tags)
+    if favoris:
+        db.session.execute(Favorite.__table__.insert(), favoris)
+    if historique:
+        db.session.execute(History.__table__.insert(), historique)
+        db.session.execute(ViewEvent.__table__.insert(), vues)
+
+    # Index dérivés, comme après les migrations sur une vraie base
+    rebuild_scenes_fts()
+    rebuild_actrice_aggregates()
+    rebuild_view_activity()
+    db.session.commit()
+
+    return {"scenes": len(scenes), "actrices": len(actrices), "tags": len(tags),
+            "favoris": len(favoris), "historique": len(historique), "vues": len(vues)}
+
+
+def list_get_urls(app, scene_id, actrice_id, mot, tag):
+    """Toutes les routes GET de l'application, paramètres remplacés par des ids existants"""
+    valeurs = {"scene_id": scene_id, "actrice_id": actrice_id}
+    urls = []
+    for rule in sorted(app.url_map.iter_rules(), key=lambda r: r.rule):
+        if "GET" not in rule.methods or rule.endpoint in ROUTES_IGNOREES:
+            continue
+        if any(arg not in valeurs for arg in rule.arguments):
+            print(f"   ⚠️ Route ignorée (paramètre inconnu): {rule.rule}")
+            continue
+        url = rule.rule
+        for arg in rule.arguments:
+            url = url.replace(f"<int:{arg}>", str(valeurs[arg])).replace(f"<{arg}>", str(valeurs[arg]))
+        urls.append(url)
+    urls.extend(v.format(mot=quote(mot), tag=quote(tag)) for v in VARIANTES)
+    return urls
+
+
+def percentile(values, p):
+    """Percentile par rang le plus proche sur une liste triée"""
+    rank = max(0, min(len(values) - 1, int(round(p / 100 * len(values) + 0.5)) - 1))
+    return values[rank]
+
+
+def run_benchmark(app, urls, args):
+    """Appelle chaque URL (1 appel à froid puis N mesurés) et retourne les statistiques"""
+    from app import db, invalidate_cache
+    from sqlalchemy import event
+
+    compteur = {"queries": 0}
+
+    def _count_query(*_):
+        compteur["queries"] += 1
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", _count_query)
+    client = app.test_client()
+    resultats = {}
+    # Les routes impriment beaucoup de logs : on les masque pour ne garder que les mesures
+    silence = contextlib.nullcontext if args.verbose else (lambda: contextlib.redirect_stdout(io.StringIO()))
+
+    try:
+        for url in urls:
+            if args.routes and args.routes not in url:
+                continue
+
+            with silence():
+                invalidate_cache()
+                compteur["queries"] = 0
+                start = time.perf_counter()
+                response = client.get(url)
+                froid_ms = (time.perf_counter() - start) * 1000
+                froid_queries = compteur["queries"]
+
+                durees, requetes = [], []
+                for _ in range(args.repetitions):
+                    if args.sans_cache:
+                        invalidate_cache()
+                    compteur["queries"] = 0
+                    start = time.perf_counter()
+                    client.get(url)
+                    durees.append((time.perf_counter() - start) * 1000)
+                    requetes.append(compteur["queries"])
+
+            durees.sort()
+            resultats[url] = {
+                "status": response.status_code,
+                "froid_ms": round(froid_ms, 2),
+                "froid_queries": froid_queries,
+                "p50_ms": round(percentile(durees, 50), 2),
+                "p95_ms": round(percentile(durees, 95), 2),
+                "queries": max(requetes) if requetes else froid_queries,
+            }
+            r = resultats[url]
+            print(f"   {url:<62} {r['status']:>3}  froid {r['froid_ms']:>9.1f} ms ({r['froid_queries']:>5} req)"
+                  f"  p50 {r['p50_ms']:>9.1f}  p95 {r['p95_ms']:>9.1f} ms  ({r['queries']:>5} req)")
+    finally:
+        event.remove(engine, "before_cursor_execute", _count_query)
+
+    return resultats
+
+
+def compare_baseline(resultats, baseline, seuil):
+    """Liste les routes dont le p50 ou le nombre de requêtes dépasse la référence"""
+    regressions = []
+    for url, r in resultats.items():
+        ref = baseline.get(url)
+        if not ref:
+            continue
+        if ref["p50_ms"] > 0 and r["p50_ms"] / ref["p50_ms"] > seuil:
+            regressions.append(f"{url}: p50 {ref['p50_ms']} -> {r['p50_ms']} ms")
+        if r["queries"] > ref["queries"]:
+            regressions.append(f"{url}: {ref['queries']} -> {r['queries']} requêtes SQL")
+    return regressions
+
+
+def main():
+    args = build_parser().parse_args()
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix="intyma_bench_"), "bench.db")
+    nouvelle_base = not os.path.exists(db_path)
+    # Doit être défini avant l'import de app (la configuration est lue à l'import)
+    os.environ["INTYMA_DB_URI"] = "sqlite:///" + os.path.abspath(db_path)
+
+    from app import app, db, ensure_scenes_fts
+    from models import Scene, Actrice, Tag, History
+
+    with app.app_context():
+        if nouvelle_base:
+            print(f"🔄 Génération de la bibliothèque ({args.scenes} scènes, graine {args.seed})...")
+            start = time.perf_counter()
+            db.create_all()
+            ensure_scenes_fts()
+            counts = generate_library(args)
+            print(f"   ✅ {counts} en {time.perf_counter() - start:.1f} s")
+        else:
+            print(f"⚪ Base existante réutilisée: {db_path}")
+
+        rng = random.Random(args.seed)
+        # Une scène présente dans l'historique, pour que /api/history/<id> ne réponde pas 404
+        scene_id = (db.session.query(db.func.min(History.scene_id)).scalar()
+                    or db.session.query(db.func.max(Scene.id)).scalar() or 1)
+        actrice_id = db.session.query(db.func.min(Actrice.id)).scalar() or 1
+        tag = db.session.query(Tag.nom).order_by(Tag.id).limit(1).scalar() or "tag"
+        mot = rng.choice(MOTS)
+        db.session.remove()
+
+    urls = list_get_urls(app, scene_id, actrice_id, mot, tag)
+    print(f"\n⏱️ Mesure de {len(urls)} URL(s), {args.repetitions} appel(s) chacune")
+    resultats = run_benchmark(app, urls, args)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"parametres": vars(args), "resultats": resultats}, f, indent=2, ensure_ascii=False, default=str)
+        print(f"\n💾 Résultats écrits dans {args.json}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["resultats"]
+        regressions = compare_baseline(resultats, baseline, args.seuil)
+        if regressions:
+            print(f"\n❌ {len(regressions)} régression(s) par rapport à {args.baseline}:")
+            for regression in regressions:
+                print(f"   - {regression}")
+            return 1
+        print(f"\n✅ Aucune régression par rapport à {args.baseline}")
+
+    if not args.db:
+        print(f"\n🗑️ Base temporaire: {db_path} (--db pour la conserver et la réutiliser)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
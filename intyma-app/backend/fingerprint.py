@@ -0,0 +1,67 @@
+"""
+Empreintes de contenu des vidéos, pour repérer les doublons sans lire les fichiers en entier
+Module sans dépendance à Flask. Le serveur le lance comme un programme à part
+(python fingerprint.py <workers>) : le pool de processus est créé ici, et ses processus
+(spawn) n'importent que ce module, jamais app.py.
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+EMPREINTE_BLOC = 1024 * 1024  # octets lus au début, au milieu et à la fin du fichier
+
+
+def sampled_fingerprint(path, size=None, bloc=EMPREINTE_BLOC):
+    """
+    Empreinte échantillonnée : taille + blake2b de trois blocs (début, milieu, fin).
+    Les fichiers de moins de trois blocs sont hachés en entier.
+    Deux fichiers de même empreinte sont des doublons quasi certains ; l'empreinte
+    coûte au plus 3 Mo de lecture quelle que soit la taille de la vidéo.
+    """
+    size = os.path.getsize(path) if size is None else size
+    digest = hashlib.blake2b(str(size).encode(), digest_size=16)
+    with open(path, 'rb') as f:
+        if size <= 3 * bloc:
+            digest.update(f.read())
+        else:
+            for offset in (0, (size - bloc) // 2, size - bloc):
+                f.seek(offset)
+                digest.update(f.read(bloc))
+    return f"{size:x}-{digest.hexdigest()}"
+
+
+def fingerprint_task(task):
+    """
+    Point d'entrée du pool de processus : (id, chemin, taille) -> (id, empreinte, erreur)
+    Les erreurs de lecture sont renvoyées (le fichier garde une empreinte vide).
+    """
+    file_id, path, size = task
+    try:
+        return file_id, sampled_fingerprint(path, size), None
+    except OSError as e:
+        return file_id, None, str(e)
+
+
+def fingerprint_files(tasks, workers):
+    """Génère (id, empreinte, erreur) pour chaque tâche, dans l'ordre, avec un pool de `workers` processus"""
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        yield from pool.map(fingerprint_task, tasks, chunksize=4)
+
+
+def main():
+    """
+    Tâches [(id, chemin, taille), ...] en JSON sur stdin,
+    une ligne JSON [id, empreinte, erreur] par fichier sur stdout, au fil du calcul
+    """
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    tasks = json.load(sys.stdin)
+    for result in fingerprint_files(tasks, workers):
+        print(json.dumps(result), flush=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Script de migration pour les rollups d'activité de visionnage
+(tables activite_periodes, activite_periode_scenes, activite_periode_tags)
+Les rollups sont rejoués depuis view_events : sur une base existante,
+migration_view_events.py crée et remplit le journal puis reconstruit les rollups
+Exécuter avec: python migration_activite.py
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import app, db, rebuild_view_activity
+from models import ActivitePeriode, ActivitePeriodeScene, ActivitePeriodeTag, ViewEvent
+
+
+def migrate_activite():
+    """Crée les tables de rollups et les remplit depuis l'historique existant"""
+
+    with app.app_context():
+        try:
+            print("🔄 Début de la migration de l'activité de visionnage...")
+
+            for model in (ViewEvent, ActivitePeriode, ActivitePeriodeScene, ActivitePeriodeTag):
+                model.__table__.create(db.engine, checkfirst=True)
+                print(f"   ✅ Table '{model.__tablename__}' prête")
+
+            counts = rebuild_view_activity()
+            db.session.commit()
+            print(f"   📈 {counts['vues']} vue(s) réparties sur {counts['periodes']} période(s)")
+
+            print("🎉 Migration terminée avec succès!")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Erreur lors de la migration: {e}")
+            print("💡 Conseil: Vérifiez que l'application Flask n'est pas en cours d'exécution")
+            return False
+
+    return True
+
+
+if __name__ == "__main__":
+    print("🚀 Migration des rollups d'activité de visionnage")
+    print("=" * 50)
+
+    success = migrate_activite()
+
+    if success:
+        print("\n✅ Migration réussie!")
+        print("🔥 Vous pouvez maintenant redémarrer votre application Flask")
+    else:
+        print("\n❌ Migration échouée")
+        print("🔧 Vérifiez les erreurs ci-dessus et réessayez")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Script de migration pour les agrégats incrémentaux des actrices
+(actrices.note_somme / note_count et table actrice_tags)
+À exécuter après migration_note_value.py
+Exécuter avec: python migration_actrice_aggregats.py
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import app, db, rebuild_actrice_aggregates
+from models import ActriceTag
+from sqlalchemy import text
+
+
+def migrate_actrice_aggregats():
+    """Ajoute les colonnes et la table de compteurs, puis les remplit depuis les scènes"""
+
+    with app.app_context():
+        try:
+            print("🔄 Début de la migration des agrégats actrices...")
+
+            inspector = db.inspect(db.engine)
+            columns = [col['name'] for col in inspector.get_columns('actrices')]
+
+            with db.engine.connect() as connection:
+                for column, ddl in (('note_somme', 'FLOAT DEFAULT 0'), ('note_count', 'INTEGER DEFAULT 0')):
+                    if column not in columns:
+                        connection.execute(text(f"ALTER TABLE actrices ADD COLUMN {column} {ddl}"))
+                        connection.commit()
+                        print(f"   ✅ Colonne '{column}' ajoutée")
+
+            ActriceTag.__table__.create(db.engine, checkfirst=True)
+            print("   ✅ Table 'actrice_tags' prête")
+
+            # Remplissage complet des compteurs (deux GROUP BY)
+            counts = rebuild_actrice_aggregates()
+            db.session.commit()
+            print(f"   📈 {counts['actrices']} actrice(s), {counts['actrice_tags']} compteur(s) de tags")
+
+            print("🎉 Migration terminée avec succès!")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Erreur lors de la migration: {e}")
+            print("💡 Conseil: Vérifiez que l'application Flask n'est pas en cours d'exécution")
+            return False
+
+    return True
+
+
+if __name__ == "__main__":
+    print("🚀 Migration des agrégats incrémentaux des actrices")
+    print("=" * 50)
+
+    success = migrate_actrice_aggregats()
+
+    if success:
+        print("\n✅ Migration réussie!")
+        print("🔥 Vous pouvez maintenant redémarrer votre application Flask")
+    else:
+        print("\n❌ Migration échouée")
+        print("🔧 Vérifiez les erreurs ci-dessus et réessayez")
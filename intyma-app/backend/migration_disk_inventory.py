@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Script de migration pour l'inventaire persistant du disque (tables disk_files et disk_directories)
+Exécuter avec: python migration_disk_inventory.py
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import app, db, refresh_disk_inventory
+from models import DiskFile, DiskDirectory
+
+
+def migrate_disk_inventory():
+    """Crée les tables de l'inventaire puis le remplit si le disque est monté"""
+
+    with app.app_context():
+        try:
+            print("🔄 Début de la migration de l'inventaire du disque...")
+
+            DiskFile.__table__.create(db.engine, checkfirst=True)
+            DiskDirectory.__table__.create(db.engine, checkfirst=True)
+            print("   ✅ Tables 'disk_files' et 'disk_directories' prêtes")
+
+            try:
+                stats = refresh_disk_inventory(force=True)
+                print(f"   📈 {stats['fichiers_lus']} vidéo(s) dans {stats['dossiers']} dossier(s)")
+            except FileNotFoundError:
+                print("   ⚪ Disque non monté : l'inventaire sera rempli au premier scan")
+
+            print("🎉 Migration terminée avec succès!")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Erreur lors de la migration: {e}")
+            print("💡 Conseil: Vérifiez que l'application Flask n'est pas en cours d'exécution")
+            return False
+
+    return True
+
+
+if __name__ == "__main__":
+    print("🚀 Migration de l'inventaire du disque")
+    print("=" * 50)
+
+    success = migrate_disk_inventory()
+
+    if success:
+        print("\n✅ Migration réussie!")
+        print("🔥 Vous pouvez maintenant redémarrer votre application Flask")
+    else:
+        print("\n❌ Migration échouée")
+        print("🔧 Vérifiez les erreurs ci-dessus et réessayez")
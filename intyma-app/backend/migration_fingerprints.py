@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Script de migration pour les empreintes de contenu des vidéos (disk_files.empreinte)
+À exécuter après migration_disk_inventory.py
+Exécuter avec: python migration_fingerprints.py
+(les empreintes se calculent ensuite avec POST /api/admin/jobs/fingerprints)
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import app, db
+from sqlalchemy import text
+
+
+def migrate_fingerprints():
+    """Ajoute la colonne empreinte et son index à l'inventaire du disque"""
+
+    with app.app_context():
+        try:
+            print("🔄 Début de la migration des empreintes...")
+
+            inspector = db.inspect(db.engine)
+            columns = [col['name'] for col in inspector.get_columns('disk_files')]
+
+            with db.engine.connect() as connection:
+                if 'empreinte' not in columns:
+                    connection.execute(text("ALTER TABLE disk_files ADD COLUMN empreinte VARCHAR"))
+                    connection.commit()
+                    print("   ✅ Colonne 'empreinte' ajoutée")
+                else:
+                    print("   ⚪ Colonne 'empreinte' déjà présente")
+
+                connection.execute(text("CREATE INDEX IF NOT EXISTS ix_disk_files_empreinte ON disk_files (empreinte)"))
+                connection.commit()
+                print("   ✅ Index 'ix_disk_files_empreinte' créé")
+
+            print("🎉 Migration terminée avec succès!")
+
+        except Exception as e:
+            print(f"❌ Erreur lors de la migration: {e}")
+            print("💡 Conseil: Vérifiez que l'application Flask n'est pas en cours d'exécution")
+            return False
+
+    return True
+
+
+if __name__ == "__main__":
+    print("🚀 Migration des empreintes de contenu (doublons)")
+    print("=" * 50)
+
+    success = migrate_fingerprints()
+
+    if success:
+        print("\n✅ Migration réussie!")
+        print("🔥 Vous pouvez maintenant redémarrer votre application Flask")
+    else:
+        print("\n❌ Migration échouée")
+        print("🔧 Vérifiez les erreurs ci-dessus et réessayez")
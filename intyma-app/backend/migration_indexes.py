@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Script de migration pour créer les index de performance sur une base existante
+(db.create_all() ne crée pas les index des tables déjà présentes)
+Exécuter avec: python migration_indexes.py
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import app, db
+from sqlalchemy import text
+
+# (nom de l'index, table, colonnes) — mêmes noms que ceux générés par index=True dans models.py
+INDEXES = [
+    ("ix_scenes_date_ajout", "scenes", "date_ajout"),
+    ("ix_scenes_date_scene", "scenes", "date_scene"),
+    ("ix_scenes_qualite", "scenes", "qualite"),
+    ("ix_scenes_studio", "scenes", "studio"),
+    ("ix_scenes_site", "scenes", "site"),
+    ("ix_scenes_duree", "scenes", "duree"),
+    ("ix_scene_actrice_actrice_id", "scene_actrice", "actrice_id"),
+    ("ix_scene_tag_tag_id", "scene_tag", "tag_id"),
+    ("ix_history_derniere_vue", "history", "derniere_vue"),
+]
+
+
+def migrate_indexes():
+    """Crée les index manquants (idempotent)"""
+
+    with app.app_context():
+        try:
+            print("🔄 Début de la création des index...")
+
+            with db.engine.connect() as connection:
+                for name, table, columns in INDEXES:
+                    try:
+                        connection.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})"))
+                        connection.commit()
+                        print(f"   ✅ Index '{name}' sur {table}({columns})")
+                    except Exception as e:
+                        print(f"   ⚠️ {name}: {e}")
+
+                # Mettre à jour les statistiques du planificateur
+                connection.execute(text("ANALYZE"))
+                connection.commit()
+
+            print("🎉 Index créés avec succès!")
+
+        except Exception as e:
+            print(f"❌ Erreur lors de la migration: {e}")
+            print("💡 Conseil: Vérifiez que l'application Flask n'est pas en cours d'exécution")
+            return False
+
+    return True
+
+
+if __name__ == "__main__":
+    print("🚀 Migration des index de performance")
+    print("=" * 50)
+
+    success = migrate_indexes()
+
+    if success:
+        print("\n✅ Migration réussie!")
+    else:
+        print("\n❌ Migration échouée")
+        print("🔧 Vérifiez les erreurs ci-dessus et réessayez")
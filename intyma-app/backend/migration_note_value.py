@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Script de migration pour ajouter la note numérique normalisée des scènes (scenes.note_value)
+Exécuter avec: python migration_note_value.py
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import app, db
+from models import parse_note
+from sqlalchemy import text
+
+
+def migrate_note_value():
+    """Ajoute la colonne note_value et la calcule depuis note_perso pour les scènes existantes"""
+
+    with app.app_context():
+        try:
+            print("🔄 Début de la migration des notes...")
+
+            inspector = db.inspect(db.engine)
+            columns = [col['name'] for col in inspector.get_columns('scenes')]
+
+            with db.engine.connect() as connection:
+                if 'note_value' not in columns:
+                    connection.execute(text("ALTER TABLE scenes ADD COLUMN note_value FLOAT"))
+                    connection.commit()
+                    print("   ✅ Colonne 'note_value' ajoutée")
+                else:
+                    print("   ⚪ Colonne 'note_value' déjà présente, recalcul des valeurs")
+
+                connection.execute(text("CREATE INDEX IF NOT EXISTS ix_scenes_note_value ON scenes (note_value)"))
+                connection.commit()
+                print("   ✅ Index 'ix_scenes_note_value' créé")
+
+                # Backfill : un seul parseur (parse_note), le même que celui utilisé à l'écriture
+                rows = connection.execute(text("SELECT id, note_perso FROM scenes")).fetchall()
+                updates = [{"id": row[0], "note_value": parse_note(row[1])} for row in rows]
+                if updates:
+                    connection.execute(text("UPDATE scenes SET note_value = :note_value WHERE id = :id"), updates)
+                    connection.commit()
+
+                nb_notees = sum(1 for u in updates if u["note_value"] is not None)
+                print(f"   📈 {len(updates)} scène(s) traitée(s), {nb_notees} avec une note reconnue")
+
+            print("🎉 Migration terminée avec succès!")
+
+        except Exception as e:
+            print(f"❌ Erreur lors de la migration: {e}")
+            print("💡 Conseil: Vérifiez que l'application Flask n'est pas en cours d'exécution")
+            return False
+
+    return True
+
+
+if __name__ == "__main__":
+    print("🚀 Migration des notes numériques (note_value)")
+    print("=" * 50)
+
+    success = migrate_note_value()
+
+    if success:
+        print("\n✅ Migration réussie!")
+        print("🔥 Vous pouvez maintenant redémarrer votre application Flask")
+    else:
+        print("\n❌ Migration échouée")
+        print("🔧 Vérifiez les erreurs ci-dessus et réessayez")
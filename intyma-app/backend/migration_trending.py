@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Script de migration pour le score tendance des scènes (scenes.trending_score)
+À exécuter après migration_view_events.py (les vues sont lues dans le journal view_events)
+Exécuter avec: python migration_trending.py
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import app, db, compute_trending_scores
+from sqlalchemy import text
+
+
+def migrate_trending():
+    """Ajoute la colonne trending_score et son index, puis calcule les scores"""
+
+    with app.app_context():
+        try:
+            print("🔄 Début de la migration du score tendance...")
+
+            inspector = db.inspect(db.engine)
+            columns = [col['name'] for col in inspector.get_columns('scenes')]
+
+            with db.engine.connect() as connection:
+                if 'trending_score' not in columns:
+                    connection.execute(text("ALTER TABLE scenes ADD COLUMN trending_score FLOAT"))
+                    connection.commit()
+                    print("   ✅ Colonne 'trending_score' ajoutée")
+                else:
+                    print("   ⚪ Colonne 'trending_score' déjà présente, recalcul des scores")
+
+                connection.execute(text("CREATE INDEX IF NOT EXISTS ix_scenes_trending_score ON scenes (trending_score)"))
+                connection.commit()
+                print("   ✅ Index 'ix_scenes_trending_score' créé")
+
+            nb = compute_trending_scores()
+            db.session.commit()
+            print(f"   📈 Score tendance calculé pour {nb} scène(s)")
+
+            print("🎉 Migration terminée avec succès!")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Erreur lors de la migration: {e}")
+            print("💡 Conseil: Vérifiez que l'application Flask n'est pas en cours d'exécution")
+            return False
+
+    return True
+
+
+if __name__ == "__main__":
+    print("🚀 Migration du score tendance des scènes")
+    print("=" * 50)
+
+    success = migrate_trending()
+
+    if success:
+        print("\n✅ Migration réussie!")
+        print("🔥 Vous pouvez maintenant redémarrer votre application Flask")
+    else:
+        print("\n❌ Migration échouée")
+        print("🔧 Vérifiez les erreurs ci-dessus et réessayez")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Script de migration : une seule ligne d'historique et de favori par scène
+Fusionne les doublons existants puis crée les index uniques sur history.scene_id et favorites.scene_id
+Exécuter avec: python migration_unique_scene_id.py
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import app, db
+from sqlalchemy import text
+
+# Fusion des doublons d'historique dans la ligne la plus ancienne (plus petit id) :
+# vues additionnées, première/dernière date élargies, dernière note de session non vide
+HISTORY_MERGE_SQL = """
+UPDATE history SET
+    nb_vues = (SELECT sum(coalesce(h.nb_vues, 1)) FROM history h WHERE h.scene_id = history.scene_id),
+    date_premiere_vue = (SELECT min(coalesce(h.date_premiere_vue, h.derniere_vue, h.date_vue))
+                         FROM history h WHERE h.scene_id = history.scene_id),
+    derniere_vue = (SELECT max(coalesce(h.derniere_vue, h.date_vue)) FROM history h WHERE h.scene_id = history.scene_id),
+    date_vue = (SELECT max(coalesce(h.derniere_vue, h.date_vue)) FROM history h WHERE h.scene_id = history.scene_id),
+    note_session = (SELECT h.note_session FROM history h WHERE h.scene_id = history.scene_id
+                    AND h.note_session IS NOT NULL ORDER BY h.id DESC LIMIT 1),
+    commentaire_session = (SELECT h.commentaire_session FROM history h WHERE h.scene_id = history.scene_id
+                           AND h.commentaire_session IS NOT NULL ORDER BY h.id DESC LIMIT 1)
+WHERE id IN (SELECT min(id) FROM history GROUP BY scene_id HAVING count(*) > 1)
+"""
+
+FAVORITES_MERGE_SQL = """
+UPDATE favorites SET
+    date_ajout = (SELECT min(f.date_ajout) FROM favorites f WHERE f.scene_id = favorites.scene_id)
+WHERE id IN (SELECT min(id) FROM favorites GROUP BY scene_id HAVING count(*) > 1)
+"""
+
+# (table, requête de fusion, nom de l'index) — mêmes noms que ceux générés par unique/index dans models.py
+TABLES = [
+    ("history", HISTORY_MERGE_SQL, "ix_history_scene_id"),
+    ("favorites", FAVORITES_MERGE_SQL, "ix_favorites_scene_id"),
+]
+
+
+def migrate_unique_scene_id():
+    """Dédoublonne history et favorites puis ajoute les index uniques (idempotent)"""
+
+    with app.app_context():
+        try:
+            print("🔄 Début du dédoublonnage de l'historique et des favoris...")
+
+            with db.engine.connect() as connection:
+                for table, merge_sql, index_name in TABLES:
+                    connection.execute(text(merge_sql))
+                    deleted = connection.execute(text(
+                        f"DELETE FROM {table} WHERE id NOT IN (SELECT min(id) FROM {table} GROUP BY scene_id)"
+                    )).rowcount
+                    connection.execute(text(
+                        f"CREATE UNIQUE INDEX IF NOT EXISTS {index_name} ON {table} (scene_id)"
+                    ))
+                    connection.commit()
+                    print(f"   ✅ {table}: {deleted} doublon(s) fusionné(s), index unique '{index_name}' créé")
+
+            print("🎉 Migration terminée avec succès!")
+
+        except Exception as e:
+            print(f"❌ Erreur lors de la migration: {e}")
+            print("💡 Conseil: Vérifiez que l'application Flask n'est pas en cours d'exécution")
+            return False
+
+    return True
+
+
+if __name__ == "__main__":
+    print("🚀 Migration des index uniques sur scene_id (historique et favoris)")
+    print("=" * 50)
+
+    success = migrate_unique_scene_id()
+
+    if success:
+        print("\n✅ Migration réussie!")
+        print("🔥 Vous pouvez maintenant redémarrer votre application Flask")
+    else:
+        print("\n❌ Migration échouée")
+        print("🔧 Vérifiez les erreurs ci-dessus et réessayez")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Script de migration pour le journal des vues (table view_events)
+Recrée les vues depuis l'historique existant puis reconstruit les rollups d'activité
+Exécuter avec: python migration_view_events.py
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import app, db, rebuild_view_activity
+from models import History, ViewEvent, ActivitePeriode, ActivitePeriodeScene, ActivitePeriodeTag
+from datetime import datetime, time
+
+
+def migrate_view_events():
+    """Crée view_events et le remplit depuis History si le journal est vide"""
+
+    with app.app_context():
+        try:
+            print("🔄 Début de la migration du journal des vues...")
+
+            for model in (ViewEvent, ActivitePeriode, ActivitePeriodeScene, ActivitePeriodeTag):
+                model.__table__.create(db.engine, checkfirst=True)
+                print(f"   ✅ Table '{model.__tablename__}' prête")
+
+            if ViewEvent.query.first():
+                print("   ⚪ Journal déjà rempli, pas de reprise de l'historique")
+            else:
+                # History ne garde que la première et la dernière vue : la première vue est datée
+                # de date_premiere_vue, les suivantes de derniere_vue (avec la note de session)
+                events = []
+                for history in History.query.order_by(History.id):
+                    derniere = history.derniere_vue or history.date_vue or history.date_premiere_vue
+                    premiere = history.date_premiere_vue or derniere
+                    if not premiere:
+                        continue
+                    nb_vues = max(history.nb_vues or 1, 1)
+                    dates = [premiere] + [derniere] * (nb_vues - 1)
+                    for i, jour in enumerate(dates):
+                        derniere_vue = i == len(dates) - 1
+                        events.append({
+                            "scene_id": history.scene_id,
+                            "date_vue": datetime.combine(jour, time()),
+                            "note_session": history.note_session if derniere_vue else None,
+                            "commentaire_session": history.commentaire_session if derniere_vue else None
+                        })
+                if events:
+                    db.session.execute(ViewEvent.__table__.insert(), events)
+                print(f"   📈 {len(events)} vue(s) reprise(s) depuis l'historique")
+
+            # Rollups d'activité rejoués depuis le journal
+            counts = rebuild_view_activity()
+            db.session.commit()
+            print(f"   📈 Rollups: {counts['vues']} vue(s) sur {counts['periodes']} période(s)")
+
+            print("🎉 Migration terminée avec succès!")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Erreur lors de la migration: {e}")
+            print("💡 Conseil: Vérifiez que l'application Flask n'est pas en cours d'exécution")
+            return False
+
+    return True
+
+
+if __name__ == "__main__":
+    print("🚀 Migration du journal des vues")
+    print("=" * 50)
+
+    success = migrate_view_events()
+
+    if success:
+        print("\n✅ Migration réussie!")
+        print("🔥 Vous pouvez maintenant redémarrer votre application Flask")
+    else:
+        print("\n❌ Migration échouée")
+        print("🔧 Vérifiez les erreurs ci-dessus et réessayez")
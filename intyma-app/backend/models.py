@@ -1,7 +1,65 @@
+import re
+
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.orm import validates
 
 db = SQLAlchemy()
 
+
+# Mots-clés reconnus dans une note libre, du plus fort au plus faible
+NOTE_KEYWORDS = [
+    (('excellent', 'parfait', 'incroyable', 'ouf'), 5.0),
+    (('très bon', 'super', 'top', 'génial'), 4.5),
+    (('bon', 'bien', 'cool', 'sympa'), 4.0),
+    (('moyen', 'correct', 'ok'), 3.0),
+]
+
+
+def parse_note(note_perso):
+    """
+    Convertit une note libre (note_perso) en note numérique sur 5, ou None
+    - étoiles : "⭐⭐⭐⭐" -> 4.0
+    - fraction : "8/10" -> 4.0
+    - nombre : "4.5" -> 4.5 ("8" -> 4.0, les notes > 5 sont considérées sur 10)
+    - mots-clés : "excellent" -> 5.0, "bon" -> 4.0 ...
+    """
+    if note_perso is None:
+        return None
+
+    if isinstance(note_perso, (int, float)):
+        note_value = float(note_perso)
+    else:
+        note_str = str(note_perso).strip()
+        if not note_str:
+            return None
+
+        note_value = None
+        star_count = note_str.count('⭐')
+        if star_count > 0:
+            note_value = float(star_count)
+        elif '/' in note_str:
+            match = re.search(r'(\d+(?:\.\d+)?)/(\d+(?:\.\d+)?)', note_str)
+            if match and float(match.group(2)) > 0:
+                note_value = float(match.group(1)) / float(match.group(2)) * 5  # Normaliser sur 5
+        else:
+            match = re.search(r'(\d+(?:\.\d+)?)', note_str)
+            if match:
+                note_value = float(match.group(1))
+
+        if note_value is None:
+            note_str_lower = note_str.lower()
+            for words, value in NOTE_KEYWORDS:
+                if any(word in note_str_lower for word in words):
+                    note_value = value
+                    break
+
+    if note_value is None:
+        return None
+    # Normaliser si note > 5 (note sur 10)
+    if note_value > 5:
+        note_value = note_value * 5 / 10
+    return round(note_value, 2)
+
 # Table de jointure scène <-> actrice
 scene_actrice = db.Table(
     'scene_actrice',
@@ -23,6 +81,10 @@ scene_tag = db.Table(
     db.Column('tag_id', db.Integer, db.ForeignKey('tags.id'), primary_key=True)
 )
 
+# Index inverses : la clé primaire couvre scene_id -> x, pas x -> scene_id (filtres par tag / actrice)
+db.Index('ix_scene_actrice_actrice_id', scene_actrice.c.actrice_id)
+db.Index('ix_scene_tag_tag_id', scene_tag.c.tag_id)
+
 
 class Scene(db.Model):
     __tablename__ = 'scenes'
@@ -30,16 +92,18 @@ class Scene(db.Model):
     chemin = db.Column(db.String, unique=True, nullable=False)
     titre = db.Column(db.String)
     synopsis = db.Column(db.Text)
-    duree = db.Column(db.Integer)  # en minutes ou secondes selon ton choix
-    qualite = db.Column(db.String)
-    site = db.Column(db.String)
-    studio = db.Column(db.String)
-    date_ajout = db.Column(db.Date)
-    date_scene = db.Column(db.Date)
+    duree = db.Column(db.Integer, index=True)  # en minutes ou secondes selon ton choix
+    qualite = db.Column(db.String, index=True)
+    site = db.Column(db.String, index=True)
+    studio = db.Column(db.String, index=True)
+    date_ajout = db.Column(db.Date, index=True)
+    date_scene = db.Column(db.Date, index=True)
     note_perso = db.Column(db.String)
+    note_value = db.Column(db.Float, index=True)  # note_perso normalisée sur 5 (voir parse_note)
     image = db.Column(db.String)  # chemin miniature/cover
     niveau_plaisir = db.Column(db.Integer)  # Pour de l’IA/reco plus tard
     statut = db.Column(db.String)  # ex : "à trier", "gardé", "supprimé"
+    trending_score = db.Column(db.Float, index=True)  # score tendance (voir compute_trending_scores)
 
     actrices = db.relationship('Actrice', secondary=scene_actrice, backref='scenes')
     acteurs = db.relationship('Acteur', secondary=scene_acteur, backref='scenes')
@@ -47,6 +111,12 @@ class Scene(db.Model):
     histories = db.relationship('History', backref='scene', lazy=True)
     favorites = db.relationship('Favorite', backref='scene', lazy=True)
 
+    @validates('note_perso')
+    def _sync_note_value(self, key, note_perso):
+        """Calcule note_value une seule fois, à l'écriture de note_perso"""
+        self.note_value = parse_note(note_perso)
+        return note_perso
+
 
 class Actrice(db.Model):
     __tablename__ = 'actrices'
@@ -60,6 +130,46 @@ class Actrice(db.Model):
     commentaire = db.Column(db.Text)
     date_naissance = db.Column(db.Date)  # optionnel
     nationalite = db.Column(db.String)  # optionnel
+    # Sommes courantes des notes de ses scènes (maintenues par deltas, note_moyenne = somme / count)
+    note_somme = db.Column(db.Float, default=0)
+    note_count = db.Column(db.Integer, default=0)
+
+
+class ActriceTag(db.Model):
+    """Nombre de scènes d'une actrice portant un tag (maintenu par deltas, source de tags_typiques)"""
+    __tablename__ = 'actrice_tags'
+    actrice_id = db.Column(db.Integer, db.ForeignKey('actrices.id'), primary_key=True)
+    tag_nom = db.Column(db.String, primary_key=True)  # nom normalisé : minuscules, sans espaces autour
+    nb = db.Column(db.Integer, nullable=False, default=0)
+
+
+# Agrégats d'activité de visionnage par période (granularite : 'day', 'week' ou 'month',
+# debut : premier jour de la période, lundi pour les semaines). Maintenus à chaque vue.
+class ActivitePeriode(db.Model):
+    """Vues, minutes regardées et scènes distinctes d'une période"""
+    __tablename__ = 'activite_periodes'
+    granularite = db.Column(db.String, primary_key=True)
+    debut = db.Column(db.Date, primary_key=True)
+    nb_vues = db.Column(db.Integer, nullable=False, default=0)
+    minutes = db.Column(db.Integer, nullable=False, default=0)
+    nb_scenes = db.Column(db.Integer, nullable=False, default=0)
+
+
+class ActivitePeriodeScene(db.Model):
+    """Scènes vues dans une période (sert à compter les scènes distinctes)"""
+    __tablename__ = 'activite_periode_scenes'
+    granularite = db.Column(db.String, primary_key=True)
+    debut = db.Column(db.Date, primary_key=True)
+    scene_id = db.Column(db.Integer, primary_key=True)
+
+
+class ActivitePeriodeTag(db.Model):
+    """Vues par tag (nom normalisé) dans une période"""
+    __tablename__ = 'activite_periode_tags'
+    granularite = db.Column(db.String, primary_key=True)
+    debut = db.Column(db.Date, primary_key=True)
+    tag_nom = db.Column(db.String, primary_key=True)
+    nb_vues = db.Column(db.Integer, nullable=False, default=0)
 
 
 class Acteur(db.Model):
@@ -81,22 +191,62 @@ class Tag(db.Model):
 class Favorite(db.Model):
     __tablename__ = 'favorites'
     id = db.Column(db.Integer, primary_key=True)
-    scene_id = db.Column(db.Integer, db.ForeignKey('scenes.id'), nullable=False)
+    scene_id = db.Column(db.Integer, db.ForeignKey('scenes.id'), nullable=False, unique=True, index=True)
     date_ajout = db.Column(db.Date)
 
 
 class History(db.Model):
     __tablename__ = 'history'
     id = db.Column(db.Integer, primary_key=True)
-    scene_id = db.Column(db.Integer, db.ForeignKey('scenes.id'), nullable=False)
+    scene_id = db.Column(db.Integer, db.ForeignKey('scenes.id'), nullable=False, unique=True, index=True)  # une ligne par scène
     date_vue = db.Column(db.Date)  # Garder pour compatibilité (= dernière vue)
     date_premiere_vue = db.Column(db.Date)  # ✅ NOUVEAU : Première fois vue
     nb_vues = db.Column(db.Integer, default=1)  # ✅ NOUVEAU : Compteur de vues
-    derniere_vue = db.Column(db.Date)  # ✅ NOUVEAU : Dernière fois vue
+    derniere_vue = db.Column(db.Date, index=True)  # ✅ NOUVEAU : Dernière fois vue
+    note_session = db.Column(db.Float)
+    commentaire_session = db.Column(db.Text)
+
+
+class SelectionDuJour(db.Model):
+    """Sélection du jour (actrice mise en avant + scènes), calculée une fois par date"""
+    __tablename__ = 'selections_du_jour'
+    date = db.Column(db.Date, primary_key=True)
+    actrice_id = db.Column(db.Integer, db.ForeignKey('actrices.id'))
+    scenes = db.Column(db.Text)  # JSON : [[scene_id, type], ...] dans l'ordre d'affichage
+    date_calcul = db.Column(db.DateTime)
+
+
+class ViewEvent(db.Model):
+    """Une vue d'une scène : journal en ajout seul, dont History est le résumé par scène"""
+    __tablename__ = 'view_events'
+    id = db.Column(db.Integer, primary_key=True)
+    scene_id = db.Column(db.Integer, db.ForeignKey('scenes.id'), nullable=False, index=True)
+    date_vue = db.Column(db.DateTime, nullable=False, index=True)
     note_session = db.Column(db.Float)
     commentaire_session = db.Column(db.Text)
 
 
+class DiskFile(db.Model):
+    """Une vidéo présente sur le disque (inventaire persistant, voir refresh_disk_inventory)"""
+    __tablename__ = 'disk_files'
+    id = db.Column(db.Integer, primary_key=True)
+    chemin_relatif = db.Column(db.String, unique=True, nullable=False)  # "<dossier actrice>/<fichier>", NFC
+    dossier_actrice = db.Column(db.String, nullable=False, index=True)
+    taille = db.Column(db.Integer)  # octets
+    mtime = db.Column(db.Float)
+    vu_le = db.Column(db.DateTime)  # dernier scan où le fichier était présent
+    empreinte = db.Column(db.String, index=True)  # voir fingerprint.py ; effacée si taille ou mtime changent
+
+
+class DiskDirectory(db.Model):
+    """Un dossier d'actrice du disque et son mtime au dernier scan (rescanné seulement s'il change)"""
+    __tablename__ = 'disk_directories'
+    chemin_relatif = db.Column(db.String, primary_key=True)  # nom du dossier, NFC
+    mtime = db.Column(db.Float)
+    nb_fichiers = db.Column(db.Integer, default=0)  # vidéos du dossier
+    vu_le = db.Column(db.DateTime)
+
+
 # (Optionnel) Table Users si besoin multi-profils plus tard
 class User(db.Model):
     __tablename__ = 'users'
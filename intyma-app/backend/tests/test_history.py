@@ -0,0 +1,71 @@
+"""
+Tests de non-régression de l'historique (vues mises en tampon par ViewEventBuffer)
+Exécuter avec: python -m pytest tests  (ou python -m unittest discover tests)
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+# Base temporaire : INTYMA_DB_URI doit être défini avant l'import de app
+_db_dir = tempfile.mkdtemp(prefix="intyma_tests_")
+os.environ["INTYMA_DB_URI"] = "sqlite:///" + os.path.join(_db_dir, "test.db")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, db, view_event_buffer  # noqa: E402
+from models import Scene, History  # noqa: E402
+
+
+class HistoryTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # Fenêtre longue : les vues restent dans le tampon pendant le test
+        view_event_buffer.window = 30
+        with app.app_context():
+            db.create_all()
+            scene = Scene(chemin="/tmp/intyma_tests/scene.mp4", titre="Scène de test")
+            db.session.add(scene)
+            db.session.commit()
+            self.scene_id = scene.id
+        self.client = app.test_client()
+
+    def tearDown(self):
+        view_event_buffer.flush(timeout=5)
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def session_fields(self):
+        view_event_buffer.flush(timeout=5)
+        with app.app_context():
+            history = History.query.filter_by(scene_id=self.scene_id).one()
+            return history.note_session, history.commentaire_session
+
+    def test_first_view_listed_before_flush(self):
+        """POST d'une première vue puis GET /api/history : la scène est listée"""
+        for _ in range(2):
+            response = self.client.post("/api/history", json={"scene_id": self.scene_id})
+            self.assertIn(response.status_code, (200, 201))
+
+        entries = self.client.get("/api/history").get_json()
+        self.assertEqual([(e["scene_id"], e["nb_vues"]) for e in entries], [(self.scene_id, 2)])
+
+        recent = self.client.get("/api/history/recent").get_json()
+        self.assertEqual([s["scene_id"] for s in recent["scenes"]], [self.scene_id])
+
+    def test_session_note_can_be_cleared(self):
+        """Une clé envoyée à null efface la valeur, une clé absente la garde"""
+        self.client.post("/api/history", json={
+            "scene_id": self.scene_id, "note_session": 4, "commentaire_session": "bien"})
+        self.assertEqual(self.session_fields(), (4.0, "bien"))
+
+        self.client.post("/api/history", json={"scene_id": self.scene_id})
+        self.assertEqual(self.session_fields(), (4.0, "bien"))
+
+        self.client.post("/api/history", json={"scene_id": self.scene_id, "note_session": None})
+        self.assertEqual(self.session_fields(), (None, "bien"))
+
+
+if __name__ == "__main__":
+    unittest.main()
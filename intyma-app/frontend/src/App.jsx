@@ -25,7 +25,7 @@ function App() {
 
     useEffect(() => {
         if (!showAdmin) {
-            axios.get("http://127.0.0.1:5000/api/scenes")
+            axios.get("http://127.0.0.1:5000/api/scenes?all=1")
                 .then((res) => setScenes(res.data))
                 .catch((err) => console.error("Erreur API :", err));
         }
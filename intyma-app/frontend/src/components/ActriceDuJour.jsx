@@ -407,14 +407,13 @@ const ActriceDuJour = ({
                 setLoading(true);
                 setError(null);
 
-                // Appels API parallèles
-                const [actriceResponse, scenesResponse] = await Promise.all([
-                    axios.get(`${apiBaseUrl}/api/actrice_du_jour`),
-                    axios.get(`${apiBaseUrl}/api/scenes_du_jour`)
-                ]);
-
-                setActrice(actriceResponse.data);
-                setScenes(scenesResponse.data);
+                // Un seul appel pour les deux sections (actrice sélectionnée une seule fois)
+                const response = await axios.get(`${apiBaseUrl}/api/home`, {
+                    params: { sections: 'actrice_du_jour,scenes_du_jour' }
+                });
+
+                setActrice(response.data.actrice_du_jour);
+                setScenes(response.data.scenes_du_jour);
             } catch (err) {
                 console.error('Erreur chargement données:', err);
                 setError('Impossible de charger les données du jour');
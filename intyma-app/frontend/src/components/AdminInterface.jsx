@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useMemo } from 'react';
+import React, { useState, useEffect, useMemo, useCallback } from 'react';
 import {
     Container,
     Typography,
@@ -31,6 +31,7 @@ import {
     Backdrop,
     Rating,
     CircularProgress,
+    Pagination,
 } from '@mui/material';
 import {
     Add,
@@ -1244,6 +1245,8 @@ export default function AdminInterface({ onBack }) {
     const [favorites, setFavorites] = useState([]);
     const [history, setHistory] = useState([]);
     const [filteredScenes, setFilteredScenes] = useState([]);
+    const [scenesPage, setScenesPage] = useState(1);
+    const [scenesPages, setScenesPages] = useState(1);
     const [filteredActrices, setFilteredActrices] = useState([]);
 
     // État pour gérer la vérification de l'unicité
@@ -1272,10 +1275,17 @@ export default function AdminInterface({ onBack }) {
         loadData();
     }, []);
 
+    // Résultats filtrés et paginés par /api/scenes/search (voir SceneSearchAndFilters)
+    const handleFilteredScenes = useCallback((results, { page, pages }) => {
+        setFilteredScenes(results);
+        setScenesPage(page);
+        setScenesPages(pages || 1);
+    }, []);
+
     const loadData = async () => {
         try {
             const [scenesRes, actricesRes, favoritesRes, historyRes] = await Promise.all([
-                axios.get('http://127.0.0.1:5000/api/scenes'),
+                axios.get('http://127.0.0.1:5000/api/scenes?all=1'),
                 axios.get('http://127.0.0.1:5000/api/actrices'),
                 axios.get('http://127.0.0.1:5000/api/favorites'),
                 axios.get('http://127.0.0.1:5000/api/history')
@@ -1283,7 +1293,6 @@ export default function AdminInterface({ onBack }) {
 
             const scenesData = scenesRes.data.reverse();
             setScenes(scenesData);
-            setFilteredScenes(scenesData);
 
             // ✅ CORRECTION : Initialiser aussi filteredActrices
             const actricesData = actricesRes.data.reverse();
@@ -2083,11 +2092,11 @@ export default function AdminInterface({ onBack }) {
 
                 {/* ✅ AJOUTER ce bloc */}
                 <SceneSearchAndFilters
-                    scenes={scenes}
                     actrices={actrices}
-                    favorites={favorites}
-                    history={history}
-                    onFilteredResults={setFilteredScenes}
+                    page={scenesPage}
+                    limit={100}
+                    refreshKey={scenes}
+                    onFilteredResults={handleFilteredScenes}
                 />
 
                 <Box sx={{
@@ -2221,6 +2230,17 @@ export default function AdminInterface({ onBack }) {
                         );
                     })}
                 </Box>
+
+                {scenesPages > 1 && (
+                    <Box sx={{ display: 'flex', justifyContent: 'center', mt: 4 }}>
+                        <Pagination
+                            count={scenesPages}
+                            page={scenesPage}
+                            onChange={(event, page) => setScenesPage(page)}
+                            sx={{ '& .MuiPaginationItem-root': { color: '#DAA520' } }}
+                        />
+                    </Box>
+                )}
             </TabPanelContent>
 
             {/* ONGLET ACTRICES */}
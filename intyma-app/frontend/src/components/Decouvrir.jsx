@@ -459,12 +459,21 @@ const usePaginationState = (initialPage = 1) => {
     return [state.page, setPage, resetPage];
 };
 
+// Tris proposés -> paramètres sort/order de /api/scenes/search
+const SORT_OPTIONS = {
+    date_ajout_desc: { sort: 'date_ajout', order: 'desc' },
+    date_ajout_asc: { sort: 'date_ajout', order: 'asc' },
+    note_desc: { sort: 'note', order: 'desc' },
+    titre_asc: { sort: 'titre', order: 'asc' },
+    duree_desc: { sort: 'duree', order: 'desc' },
+};
+
 // =================== MAIN COMPONENT ===================
 
 const Decouvrir = ({ apiBaseUrl = "http://127.0.0.1:5000" }) => {
     // États principaux
-    const [scenes, setScenes] = useState([]);
     const [filteredScenes, setFilteredScenes] = useState([]);
+    const [totalScenes, setTotalScenes] = useState(0);
     const [favorites, setFavorites] = useState([]);
     const [history, setHistory] = useState([]);
     const [actresses, setActresses] = useState([]);
@@ -485,7 +494,6 @@ const Decouvrir = ({ apiBaseUrl = "http://127.0.0.1:5000" }) => {
 
     // Refs pour éviter les effets de bord
     const hasMounted = useRef(false);
-    const isFilterChange = useRef(false);
 
     // 🔑 SOLUTION: Chargement initial une seule fois avec useLayoutEffect
     React.useLayoutEffect(() => {
@@ -496,15 +504,13 @@ const Decouvrir = ({ apiBaseUrl = "http://127.0.0.1:5000" }) => {
                 setLoading(true);
                 setError(null);
 
-                const [scenesRes, favoritesRes, historyRes, actressesRes] = await Promise.all([
-                    axios.get(`${apiBaseUrl}/api/scenes`),
+                // Les scènes sont chargées page par page par SceneSearchAndFilters (/api/scenes/search)
+                const [favoritesRes, historyRes, actressesRes] = await Promise.all([
                     axios.get(`${apiBaseUrl}/api/favorites`).catch(() => ({ data: [] })),
                     axios.get(`${apiBaseUrl}/api/history`).catch(() => ({ data: [] })),
                     axios.get(`${apiBaseUrl}/api/actrices`).catch(() => ({ data: [] }))
                 ]);
 
-                setScenes(scenesRes.data);
-                setFilteredScenes(scenesRes.data);
                 setFavorites(favoritesRes.data);
                 setHistory(historyRes.data);
                 setActresses(actressesRes.data);
@@ -522,35 +528,12 @@ const Decouvrir = ({ apiBaseUrl = "http://127.0.0.1:5000" }) => {
         loadData();
     }, []); // Dépendances vides + useLayoutEffect
 
-    // Tri des scènes avec mémoisation stable
-    const sortedScenes = useMemo(() => {
-        if (!filteredScenes.length) return [];
-
-        const scenesToSort = [...filteredScenes];
-
-        switch (sortBy) {
-            case 'date_ajout_desc':
-                return scenesToSort.sort((a, b) => new Date(b.date_ajout || 0) - new Date(a.date_ajout || 0));
-            case 'date_ajout_asc':
-                return scenesToSort.sort((a, b) => new Date(a.date_ajout || 0) - new Date(b.date_ajout || 0));
-            case 'note_desc':
-                return scenesToSort.sort((a, b) => {
-                    const noteA = parseFloat(a.note_perso) || 0;
-                    const noteB = parseFloat(b.note_perso) || 0;
-                    return noteB - noteA;
-                });
-            case 'titre_asc':
-                return scenesToSort.sort((a, b) => (a.titre || '').localeCompare(b.titre || ''));
-            case 'duree_desc':
-                return scenesToSort.sort((a, b) => (b.duree || 0) - (a.duree || 0));
-            default:
-                return scenesToSort;
-        }
-    }, [filteredScenes, sortBy]);
+    // Tri appliqué côté serveur (paramètres sort/order de /api/scenes/search)
+    const sortParams = SORT_OPTIONS[sortBy] || SORT_OPTIONS.date_ajout_desc;
 
-    // 🔑 SOLUTION: Pagination calculée de manière ultra-stable
+    // 🔑 SOLUTION: Pagination calculée de manière ultra-stable (page courante fournie par le serveur)
     const paginationInfo = useMemo(() => {
-        const totalItems = sortedScenes.length;
+        const totalItems = totalScenes;
         const totalPages = Math.ceil(totalItems / scenesPerPage) || 1;
 
         // 🔑 Garantir que currentPage est valide
@@ -558,17 +541,16 @@ const Decouvrir = ({ apiBaseUrl = "http://127.0.0.1:5000" }) => {
 
         const startIndex = (safePage - 1) * scenesPerPage;
         const endIndex = Math.min(startIndex + scenesPerPage, totalItems);
-        const currentScenes = sortedScenes.slice(startIndex, endIndex);
 
         return {
             totalPages,
             safePage,
             startIndex,
             endIndex,
-            currentScenes,
+            currentScenes: filteredScenes,
             totalItems
         };
-    }, [sortedScenes, currentPage, scenesPerPage]);
+    }, [filteredScenes, totalScenes, currentPage, scenesPerPage]);
 
     // Fonctions utilitaires
     const buildImageUrl = (imagePath) => {
@@ -600,7 +582,7 @@ const Decouvrir = ({ apiBaseUrl = "http://127.0.0.1:5000" }) => {
 
     const getViewCount = (sceneId) => {
         const historyEntry = history.find(hist => hist.scene_id === sceneId);
-        return historyEntry?.nb_vues || (history.filter(hist => hist.scene_id === sceneId).length) || 0;
+        return historyEntry ? historyEntry.nb_vues : 0;
     };
 
     const isFavorite = (sceneId) => favorites.some(fav => fav.scene_id === sceneId);
@@ -734,18 +716,16 @@ const Decouvrir = ({ apiBaseUrl = "http://127.0.0.1:5000" }) => {
     }, []);
 
     // 🔑 SOLUTION: Gestionnaire de filtres qui ne reset que lors de vrais changements
-    const handleFilteredResults = useCallback((results) => {
-        console.log('🔍 handleFilteredResults called with', results.length, 'scenes');
+    const handleFilteredResults = useCallback((results, { total, page }) => {
+        console.log('🔍 handleFilteredResults called with', results.length, 'scenes on page', page);
 
         setFilteredScenes(results);
+        setTotalScenes(total);
 
-        // Reset page seulement si c'est un vrai changement de filtre
-        if (hasMounted.current && !isFilterChange.current) {
-            console.log('🔄 Filter change detected, resetting to page 1');
+        // Un changement de filtre renvoie la page 1 : recaler la pagination
+        if (page === 1) {
             resetCurrentPage();
         }
-
-        isFilterChange.current = false;
     }, [resetCurrentPage]);
 
     // 🔑 SOLUTION: Gestionnaire de tri stable
@@ -882,10 +862,12 @@ const Decouvrir = ({ apiBaseUrl = "http://127.0.0.1:5000" }) => {
                     {/* Système de recherche et filtres */}
                     <Box sx={{ mb: 4 }}>
                         <SceneSearchAndFilters
-                            scenes={scenes}
                             actrices={actresses}       // ✅ AJOUTÉ
-                            favorites={favorites}      // ✅ AJOUTÉ
-                            history={history}          // ✅ AJOUTÉ
+                            apiBaseUrl={apiBaseUrl}
+                            sort={sortParams.sort}
+                            order={sortParams.order}
+                            page={paginationInfo.safePage}
+                            limit={scenesPerPage}
                             onFilteredResults={handleFilteredResults}
                         />
                     </Box>
@@ -902,7 +884,6 @@ const Decouvrir = ({ apiBaseUrl = "http://127.0.0.1:5000" }) => {
                             favorites={favorites}
                             history={history}
                             actrices={actresses}
-                            scenes={scenes}
                             onToggleFavorite={handleSuggestionToggleFavorite}
                             onAddToHistory={handleSuggestionAddToHistory}
                             onRemoveFromHistory={handleSuggestionRemoveFromHistory}
@@ -914,7 +895,7 @@ const Decouvrir = ({ apiBaseUrl = "http://127.0.0.1:5000" }) => {
                     <ControlsBar>
                         <Box sx={{ display: 'flex', alignItems: 'center', gap: 2 }}>
                             <ResultsInfo>
-                                📊 {filteredScenes.length} scène{filteredScenes.length !== 1 ? 's' : ''} trouvée{filteredScenes.length !== 1 ? 's' : ''}
+                                📊 {totalScenes} scène{totalScenes !== 1 ? 's' : ''} trouvée{totalScenes !== 1 ? 's' : ''}
                             </ResultsInfo>
                             {paginationInfo.totalPages > 1 && (
                                 <Chip
@@ -1168,7 +1149,7 @@ const Decouvrir = ({ apiBaseUrl = "http://127.0.0.1:5000" }) => {
                                         textAlign: 'center',
                                         display: 'block'
                                     }}>
-                                        Page {paginationInfo.safePage} sur {paginationInfo.totalPages} • {sortedScenes.length} scènes au total
+                                        Page {paginationInfo.safePage} sur {paginationInfo.totalPages} • {totalScenes} scènes au total
                                     </Typography>
                                 </PaginationContainer>
                             )}
@@ -1637,11 +1618,8 @@ const Decouvrir = ({ apiBaseUrl = "http://127.0.0.1:5000" }) => {
                                                                     return <span style={{ color: '#888', fontStyle: 'italic' }}>Non renseignée</span>;
                                                                 }
 
-                                                                // ✅ CORRECTION : Chercher les dates dans la liste complète des scènes
-                                                                const sceneIds = selectedActrice.scenes.map(scene => scene.id);
-                                                                const scenesWithDates = scenes.filter(scene => sceneIds.includes(scene.id));
-
-                                                                const dates = scenesWithDates
+                                                                // Dates fournies par /api/actrices/<id> avec chaque scène
+                                                                const dates = selectedActrice.scenes
                                                                     .map(scene => scene.date_ajout || scene.date_scene)
                                                                     .filter(date => date)
                                                                     .map(date => new Date(date));
@@ -521,18 +521,11 @@ const NewReleasesGrid = ({
                 setLoading(true);
                 setError(null);
 
-                const response = await axios.get(`${apiBaseUrl}/api/scenes`);
-                let scenesData = response.data;
-
-                // Trier par date d'ajout (plus récent en premier)
-                scenesData.sort((a, b) => {
-                    const dateA = new Date(a.date_ajout || 0);
-                    const dateB = new Date(b.date_ajout || 0);
-                    return dateB - dateA;
+                // ✅ Dernières scènes ajoutées, triées et limitées côté serveur
+                const response = await axios.get(`${apiBaseUrl}/api/scenes/recent`, {
+                    params: { limit: maxItems }
                 });
-
-                // Limiter le nombre d'éléments
-                scenesData = scenesData.slice(0, maxItems);
+                const scenesData = response.data;
 
                 setScenes(scenesData);
             } catch (err) {
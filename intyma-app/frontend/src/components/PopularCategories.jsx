@@ -363,73 +363,26 @@ const PopularCategories = ({
             setLoading(true);
             setError(null);
 
-            //console.log('🔍 Fetching tags from:', `${apiBaseUrl}/api/tags`);
+            // Compteurs d'utilisation des tags calculés côté serveur (GROUP BY, mis en cache)
+            const facetsResponse = await fetch(`${apiBaseUrl}/api/facets?top=${maxItems}`);
 
-            // Récupérer les tags ET les scènes en parallèle
-            const [tagsResponse, scenesResponse] = await Promise.all([
-                fetch(`${apiBaseUrl}/api/tags`),
-                fetch(`${apiBaseUrl}/api/scenes`)
-            ]);
-
-            if (!tagsResponse.ok) {
-                throw new Error(`Erreur tags: ${tagsResponse.status}`);
-            }
-            if (!scenesResponse.ok) {
-                throw new Error(`Erreur scènes: ${scenesResponse.status}`);
+            if (!facetsResponse.ok) {
+                throw new Error(`Erreur facettes: ${facetsResponse.status}`);
             }
 
-            const tagsData = await tagsResponse.json();
-            const scenesData = await scenesResponse.json();
-
-            //console.log('📊 Tags récupérés:', tagsData.length);
-            //console.log('🎬 Scènes récupérées:', scenesData.length);
-
-            // Compter les vraies occurrences de chaque tag dans les scènes
-            const tagCounts = {};
+            const facetsData = await facetsResponse.json();
 
-            scenesData.forEach(scene => {
-                if (scene.tags && Array.isArray(scene.tags)) {
-                    scene.tags.forEach(sceneTag => {
-                        const tagName = sceneTag.nom || sceneTag.name || sceneTag;
-                        if (tagName) {
-                            tagCounts[tagName] = (tagCounts[tagName] || 0) + 1;
-                        }
-                    });
-                }
-            });
-
-            //console.log('📈 Compteurs de tags:', tagCounts);
-
-            // Créer les catégories avec les vrais compteurs
-            let processedCategories = [];
-
-            if (Array.isArray(tagsData)) {
-                processedCategories = tagsData
-                    .map((tag, index) => {
-                        const tagName = tag.nom || tag.name || tag;
-                        const count = tagCounts[tagName] || 0;
-
-                        return {
-                            id: `category-${tag.id || index}-${tagName.replace(/[^a-zA-Z0-9]/g, '')}`, // ID vraiment unique
-                            name: tagName,
-                            count: count,
-                            isPopular: false, // Sera défini après le tri
-                            hasSparkle: false // Sera défini après le tri
-                        };
-                    })
-                    .filter(cat => cat.count > 0) // Garder seulement les tags utilisés
-                    .sort((a, b) => b.count - a.count); // Trier par popularité
-
-                // Assigner les statuts après le tri
-                processedCategories = processedCategories.map((cat, index) => ({
-                    ...cat,
+            // Créer les catégories avec les vrais compteurs (déjà triés par popularité)
+            let processedCategories = (facetsData.tags || [])
+                .filter(tag => tag.count > 0)
+                .map((tag, index) => ({
+                    id: `category-${tag.id}-${tag.nom.replace(/[^a-zA-Z0-9]/g, '')}`, // ID vraiment unique
+                    name: tag.nom,
+                    count: tag.count,
                     isPopular: index < 3,
                     hasSparkle: index === 0
                 }));
 
-                //console.log('✅ Catégories traitées:', processedCategories.slice(0, 8).map(c => `${c.name} (${c.count})`));
-            }
-
             // Limiter le nombre d'items
             processedCategories = processedCategories.slice(0, maxItems);
 
@@ -610,8 +610,6 @@ const RecentlyViewedSection = ({
                                    maxItems = 12
                                }) => {
     const [historyData, setHistoryData] = useState([]);
-    const [scenes, setScenes] = useState([]);
-    const [actresses, setActresses] = useState([]);
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState(null);
     const [currentIndex, setCurrentIndex] = useState(0);
@@ -652,69 +650,37 @@ const RecentlyViewedSection = ({
                 setLoading(true);
                 setError(null);
 
-                const [historyRes, scenesRes, actressesRes] = await Promise.all([
-                    axios.get(`${apiBaseUrl}/api/history`).catch(() => ({ data: [] })),
-                    axios.get(`${apiBaseUrl}/api/scenes`).catch(() => ({ data: [] })),
-                    axios.get(`${apiBaseUrl}/api/actrices`).catch(() => ({ data: [] }))
-
-                ]);
-
-                const history = historyRes.data;
-                const scenesData = scenesRes.data;
-                const actressesData = actressesRes.data;
-
-                setScenes(scenesData);
-                setActresses(actressesData);
-
-                // Enrichir l'historique avec les détails des scènes/actrices/collections
-                const enrichedHistory = [];
-
-                // Traiter les scènes de l'historique
-                history.forEach(historyItem => {
-                    const scene = scenesData.find(s => s.id === historyItem.scene_id);
-                    if (scene) {
-                        enrichedHistory.push({
-                            ...historyItem,
-                            contentType: 'scene',
-                            title: scene.titre || 'Sans titre',
-                            image: scene.image,
-                            details: {
-                                duration: scene.duree,
-                                note: scene.note_perso,
-                                actress: scene.actrices?.[0]?.nom
-                            }
-                        });
-                    }
-                });
-
-                // Ajouter des actrices récemment vues (basé sur l'historique des scènes)
-                const recentActresses = new Map();
-                history.forEach(historyItem => {
-                    const scene = scenesData.find(s => s.id === historyItem.scene_id);
-                    if (scene && scene.actrices) {
-                        scene.actrices.forEach(actress => {
-                            const fullActress = actressesData.find(a => a.id === actress.id);
-                            if (!recentActresses.has(actress.id) ||
-                                new Date(historyItem.date_vue) > new Date(recentActresses.get(actress.id).date_vue)) {
-                                recentActresses.set(actress.id, {
-                                    id: `actress-${actress.id}`,
-                                    contentType: 'actress',
-                                    title: actress.nom,
-                                    image: fullActress.photo, // ✅ CORRECTION: Utiliser actress.photo
-                                    actressName: actress.nom, // ✅ AJOUT: Pour construction URL
-                                    date_vue: historyItem.date_vue,
-                                    details: {
-                                        scenes: scenesData.filter(s => s.actrices?.some(a => a.id === actress.id)).length
-                                    }
-                                });
-                            }
-                        });
+                // ✅ Cartes prêtes à afficher, triées et limitées côté serveur
+                const recentRes = await axios.get(`${apiBaseUrl}/api/history/recent`, {
+                    params: { limit: maxItems }
+                }).catch(() => ({ data: { scenes: [], actrices: [] } }));
+
+                const { scenes: recentScenes, actrices: recentActresses } = recentRes.data;
+
+                const enrichedHistory = recentScenes.map(item => ({
+                    ...item,
+                    contentType: 'scene',
+                    title: item.titre,
+                    details: {
+                        duration: item.duree,
+                        note: item.note_perso,
+                        actress: item.actrice
                     }
-                });
+                }));
 
-                // Ajouter les actrices à l'historique enrichi
+                // Actrices des scènes vues récemment
                 recentActresses.forEach(actress => {
-                    enrichedHistory.push(actress);
+                    enrichedHistory.push({
+                        id: `actress-${actress.id}`,
+                        contentType: 'actress',
+                        title: actress.nom,
+                        image: actress.photo,
+                        actressName: actress.nom,
+                        date_vue: actress.date_vue,
+                        details: {
+                            scenes: actress.nb_scenes
+                        }
+                    });
                 });
 
                 // Récupérer les vraies collections depuis l'API
@@ -24,12 +24,8 @@ export const calculateSceneStats = (scene, favorites, history) => {
     const historyEntry = history.find(hist => hist.scene_id === scene.id);
     const isInHistory = !!historyEntry;
 
-    // ✅ NOUVEAU : Utiliser nb_vues de l'historique ou compter les occurrences
-    let viewCount = 0;
-    if (historyEntry) {
-        // Si nb_vues existe, l'utiliser, sinon compter les occurrences (fallback)
-        viewCount = historyEntry.nb_vues || history.filter(hist => hist.scene_id === scene.id).length;
-    }
+    // ✅ nb_vues est fourni par /api/history (une entrée par scène)
+    const viewCount = historyEntry ? historyEntry.nb_vues : 0;
 
     return {
         isFavorite,
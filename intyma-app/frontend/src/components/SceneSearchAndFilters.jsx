@@ -1,4 +1,5 @@
-import React, { useState, useEffect, useMemo } from 'react';
+import React, { useState, useEffect, useMemo, useRef } from 'react';
+import axios from 'axios';
 import {
     Box,
     TextField,
@@ -162,15 +163,57 @@ const FilterChip = styled(Chip)({
     }
 });
 
+// =================== PARAMÈTRES DE RECHERCHE ===================
+
+// Le filtrage, le tri et la pagination sont faits par /api/scenes/search
+const ORDRES = { 'Plus récent': 'desc', 'Plus ancien': 'asc' };
+
+const DUREES = {
+    '< 10 min': { duree_max: 9 },
+    '10-20 min': { duree_min: 10, duree_max: 20 },
+    '20-30 min': { duree_min: 20, duree_max: 30 },
+    '> 30 min': { duree_min: 31 },
+};
+
+// Traduit les filtres du composant en paramètres de /api/scenes/search
+const buildSearchParams = (filters) => {
+    const params = new URLSearchParams();
+    if (filters.query.trim()) params.set('q', filters.query.trim());
+    if (filters.actrices.length > 0) params.set('actrice_ids', filters.actrices.map(a => a.id).join(','));
+    filters.tags.forEach(tag => params.append('tags', tag));
+    if (filters.qualite !== 'Toutes') params.set('qualite', filters.qualite);
+    if (filters.studio !== 'Toutes') params.set('studio', filters.studio);
+    if (filters.nbActrices !== 'Toutes') params.set('nb_actrices', filters.nbActrices);
+    Object.entries(DUREES[filters.duree] || {}).forEach(([key, value]) => params.set(key, value));
+    if (filters.note !== 'Toutes') params.set('note_min', parseInt(filters.note, 10));
+    if (filters.dateAjoutFrom) params.set('date_ajout_from', filters.dateAjoutFrom);
+    if (filters.dateAjoutTo) params.set('date_ajout_to', filters.dateAjoutTo);
+    if (filters.dateSceneFrom) params.set('date_scene_from', filters.dateSceneFrom);
+    if (filters.dateSceneTo) params.set('date_scene_to', filters.dateSceneTo);
+    if (filters.favorisOnly) params.set('favoris', '1');
+    if (filters.historyOnly) params.set('historique', '1');
+    return params;
+};
+
+// Les sélecteurs de date du composant priment sur le tri demandé par le parent
+const resolveSort = (filters, sort, order) => {
+    if (filters.dateAjoutOrder !== 'Toutes') return { sort: 'date_ajout', order: ORDRES[filters.dateAjoutOrder] };
+    if (filters.dateSceneOrder !== 'Toutes') return { sort: 'date_scene', order: ORDRES[filters.dateSceneOrder] };
+    return { sort, order };
+};
+
 // =================== COMPOSANT PRINCIPAL ===================
 
 const SceneSearchAndFilters = ({
-                              scenes,
                               actrices,
-                              favorites = [],
-                              history = [],
                               onFilteredResults,
-                              initialFilters = {}
+                              initialFilters = {},
+                              apiBaseUrl = 'http://127.0.0.1:5000',
+                              sort = 'date_ajout',
+                              order = 'desc',
+                              page = 1,
+                              limit = 500,
+                              refreshKey
                           }) => {
     // État des filtres
     const [filters, setFilters] = useState({
@@ -204,204 +247,51 @@ const SceneSearchAndFilters = ({
         return () => clearTimeout(timer);
     }, [searchQuery]);
 
-    // Extraction des options uniques depuis les données
-    const filterOptions = useMemo(() => {
-        //console.log('🔍 Extraction des tags depuis les scènes:', scenes.length, 'scènes');
-
-        const qualites = [...new Set(scenes.map(s => s.qualite).filter(Boolean))];
-        const studios = [...new Set(scenes.map(s => s.studio).filter(Boolean))];
-
-        const allTags = [];
-        scenes.forEach((scene, index) => {
-            //console.log(`📝 Scène ${index + 1}: "${scene.titre}"`, scene.tags);
+    // Options des filtres : valeurs distinctes comptées côté serveur (/api/facets)
+    const [filterOptions, setFilterOptions] = useState({ qualites: ['Toutes'], studios: ['Toutes'], tags: [] });
 
-            if (scene.tags && Array.isArray(scene.tags)) {
-                scene.tags.forEach(tag => {
-                    let tagName = null;
-
-                    // Cas 1: tag est un objet avec propriété 'nom'
-                    if (tag && typeof tag === 'object' && tag.nom) {
-                        tagName = tag.nom;
-                    }
-                    // Cas 2: tag est directement une string
-                    else if (typeof tag === 'string') {
-                        tagName = tag;
-                    }
-                    // Cas 3: autre format, forcer en string
-                    else if (tag) {
-                        tagName = String(tag);
-                    }
-
-                    if (tagName && tagName.trim()) {
-                        allTags.push(tagName.trim());
-                    }
-                });
-            }
-        });
-
-        const uniqueTags = [...new Set(allTags)].filter(Boolean);
-        //console.log('✅ Tags uniques extraits:', uniqueTags);
-
-        return {
-            qualites: ['Toutes', ...qualites.sort()],
-            studios: ['Toutes', ...studios.sort()],
-            tags: uniqueTags.sort()
-        };
-    }, [scenes]);
-
-    // Logique de filtrage
-    const filteredScenes = useMemo(() => {
-        return scenes.filter(scene => {
-            // Recherche textuelle
-            if (filters.query) {
-                const query = filters.query.toLowerCase();
-                const matchesTitle = scene.titre?.toLowerCase().includes(query);
-                const matchesTags = scene.tags?.some(tag => tag.nom?.toLowerCase().includes(query));
-                const matchesActrices = scene.actrices?.some(actrice => actrice.nom?.toLowerCase().includes(query));
-                const matchesPath = scene.chemin?.toLowerCase().includes(query);
-
-                if (!matchesTitle && !matchesTags && !matchesActrices && !matchesPath) {
-                    return false;
-                }
-            }
-
-            // Filtre actrice
-            if (filters.actrices.length > 0) {
-                const sceneActriceIds = scene.actrices?.map(a => a.id) || [];
-                if (!filters.actrices.some(filterActrice => sceneActriceIds.includes(filterActrice.id))) {
-                    return false;
-                }
-            }
-
-            // Filtre tags
-            if (filters.tags.length > 0) {
-                const sceneTags = scene.tags?.map(t => t.nom) || [];
-                if (!filters.tags.every(tag => sceneTags.includes(tag))) {
-                    return false;
-                }
-            }
-
-            // Filtre nombre d'actrices
-            if (filters.nbActrices !== 'Toutes') {
-                const count = scene.actrices?.length || 0;
-                if (filters.nbActrices === '4+') {
-                    if (count < 4) return false;
-                } else {
-                    if (count !== parseInt(filters.nbActrices, 10)) return false;
-                }
-            }
-
-
-            // Filtre qualité
-            if (filters.qualite !== 'Toutes' && scene.qualite !== filters.qualite) {
-                return false;
-            }
-
-            // Filtre durée
-            if (filters.duree !== 'Toutes') {
-                const duree = scene.duree || 0;
-                switch (filters.duree) {
-                    case '< 10 min':
-                        if (duree >= 10) return false;
-                        break;
-                    case '10-20 min':
-                        if (duree < 10 || duree > 20) return false;
-                        break;
-                    case '20-30 min':
-                        if (duree < 20 || duree > 30) return false;
-                        break;
-                    case '> 30 min':
-                        if (duree <= 30) return false;
-                        break;
-                }
-            }
-
-            // Filtre note
-            if (filters.note !== 'Toutes') {
-                const noteMin = parseInt(filters.note.replace(' ⭐', ''));
-                const sceneNote = parseFloat(scene.note_perso) || 0;
-                if (sceneNote < noteMin) return false;
-            }
-
-            // Filtre studio
-            if (filters.studio !== 'Toutes' && scene.studio !== filters.studio) {
-                return false;
-            }
-
-            // Filtre par date d'ajout
-            if (filters.dateAjoutFrom || filters.dateAjoutTo) {
-                const dateAjout = scene.date_ajout;
-                if (dateAjout) {
-                    const dateAjoutObj = new Date(dateAjout);
-                    if (filters.dateAjoutFrom && dateAjoutObj < new Date(filters.dateAjoutFrom)) return false;
-                    if (filters.dateAjoutTo && dateAjoutObj > new Date(filters.dateAjoutTo)) return false;
-                } else if (filters.dateAjoutFrom || filters.dateAjoutTo) {
-                    return false; // Exclure les scènes sans date d'ajout si on filtre par date d'ajout
-                }
-            }
-
-            // Filtre par date de scène
-            if (filters.dateSceneFrom || filters.dateSceneTo) {
-                const dateScene = scene.date_scene;
-                if (dateScene) {
-                    const dateSceneObj = new Date(dateScene);
-                    if (filters.dateSceneFrom && dateSceneObj < new Date(filters.dateSceneFrom)) return false;
-                    if (filters.dateSceneTo && dateSceneObj > new Date(filters.dateSceneTo)) return false;
-                } else if (filters.dateSceneFrom || filters.dateSceneTo) {
-                    return false; // Exclure les scènes sans date de scène si on filtre par date de scène
-                }
-            }
-
-            // Filtre favoris (tu devras passer favorites en props)
-            if (filters.favorisOnly) {
-                // Supposer que tu passes favorites comme prop
-                const isFavorite = favorites.some(fav => fav.scene_id === scene.id);
-                if (!isFavorite) return false;
-            }
-
-            // Filtre historique (tu devras passer history en props)
-            if (filters.historyOnly) {
-                // Supposer que tu passes history comme prop
-                const isInHistory = history.some(hist => hist.scene_id === scene.id);
-                if (!isInHistory) return false;
-            }
-
-            return true;
-        }).sort((a, b) => {
-            // Tri par date d'ajout en priorité
-            if (filters.dateAjoutOrder !== 'Toutes') {
-                const dateAjoutA = new Date(a.date_ajout || 0);
-                const dateAjoutB = new Date(b.date_ajout || 0);
-
-                if (filters.dateAjoutOrder === 'Plus récent') {
-                    const ajoutSort = dateAjoutB - dateAjoutA;
-                    if (ajoutSort !== 0) return ajoutSort;
-                } else if (filters.dateAjoutOrder === 'Plus ancien') {
-                    const ajoutSort = dateAjoutA - dateAjoutB;
-                    if (ajoutSort !== 0) return ajoutSort;
-                }
-            }
-
-            // Tri par date de scène en second
-            if (filters.dateSceneOrder !== 'Toutes') {
-                const dateSceneA = new Date(a.date_scene || 0);
-                const dateSceneB = new Date(b.date_scene || 0);
-
-                if (filters.dateSceneOrder === 'Plus récent') {
-                    return dateSceneB - dateSceneA;
-                } else if (filters.dateSceneOrder === 'Plus ancien') {
-                    return dateSceneA - dateSceneB;
-                }
-            }
-
-            return 0;
-        });
-    }, [scenes, filters]);
+    useEffect(() => {
+        axios.get(`${apiBaseUrl}/api/facets`)
+            .then(({ data }) => setFilterOptions({
+                qualites: ['Toutes', ...data.qualite.map(f => f.valeur).sort()],
+                studios: ['Toutes', ...data.studio.map(f => f.valeur).sort()],
+                tags: data.tags.map(t => t.nom).sort()
+            }))
+            .catch(error => console.error('Erreur chargement des facettes:', error));
+    }, [apiBaseUrl, refreshKey]);
+
+    // Résultats : une page de /api/scenes/search
+    const [total, setTotal] = useState(0);
+    const searchParams = useMemo(() => buildSearchParams(filters).toString(), [filters]);
+    const sortParams = resolveSort(filters, sort, order);
+    const lastSearch = useRef(null);
+    const requestId = useRef(0);
 
-    // Notifier le parent des résultats filtrés
     useEffect(() => {
-        onFilteredResults(filteredScenes);
-    }, [filteredScenes, onFilteredResults]);
+        // Un changement de filtre ou de tri repart de la première page
+        const queryKey = `${searchParams}&sort=${sortParams.sort}&order=${sortParams.order}&limit=${limit}`;
+        const queryChanged = lastSearch.current !== null && lastSearch.current.queryKey !== queryKey;
+        const targetPage = queryChanged ? 1 : page;
+        // Le parent recale sa page sur celle renvoyée : inutile de refaire la même recherche
+        if (lastSearch.current?.queryKey === queryKey && lastSearch.current.page === targetPage
+            && lastSearch.current.refreshKey === refreshKey) return;
+        lastSearch.current = { queryKey, page: targetPage, refreshKey };
+
+        const currentRequest = ++requestId.current;
+        const params = new URLSearchParams(searchParams);
+        params.set('sort', sortParams.sort);
+        params.set('order', sortParams.order);
+        params.set('page', targetPage);
+        params.set('limit', limit);
+
+        axios.get(`${apiBaseUrl}/api/scenes/search?${params}`)
+            .then(({ data }) => {
+                if (currentRequest !== requestId.current) return; // Réponse d'une recherche dépassée
+                setTotal(data.total);
+                onFilteredResults(data.scenes, { total: data.total, page: data.page, pages: data.pages });
+            })
+            .catch(error => console.error('Erreur recherche des scènes:', error));
+    }, [apiBaseUrl, searchParams, sortParams.sort, sortParams.order, page, limit, refreshKey, onFilteredResults]);
 
     // Réinitialiser les filtres
     const handleReset = () => {
@@ -780,7 +670,7 @@ const SceneSearchAndFilters = ({
                 <Box sx={{ display: 'flex', alignItems: 'center', gap: 1 }}>
                     <FilterList sx={{ fontSize: '1rem', color: '#DAA520' }} />
                     <Typography variant="body1" sx={{ color: '#DAA520', fontWeight: 600, fontSize: '0.9rem' }}>
-                        {filteredScenes.length} scène{filteredScenes.length !== 1 ? 's' : ''} trouvée{filteredScenes.length !== 1 ? 's' : ''}
+                        {total} scène{total !== 1 ? 's' : ''} trouvée{total !== 1 ? 's' : ''}
                     </Typography>
                     {activeFiltersCount > 0 && (
                         <Chip
@@ -378,7 +378,6 @@ const SuggestionsExploration = ({
                                     favorites = [],
                                     history = [],
                                     actrices = [],
-                                    scenes = [],
                                     onToggleFavorite,
                                     onAddToHistory,
                                     onRemoveFromHistory,
@@ -1337,11 +1336,8 @@ const SuggestionsExploration = ({
                                                             return <span style={{ color: '#888', fontStyle: 'italic' }}>Non renseignée</span>;
                                                         }
 
-                                                        // ✅ CORRECTION : Utiliser la liste complète des scènes
-                                                        const sceneIds = selectedActrice.scenes.map(scene => scene.id);
-                                                        const scenesWithDates = scenes.filter(scene => sceneIds.includes(scene.id));
-
-                                                        const dates = scenesWithDates
+                                                        // Dates fournies par /api/actrices/<id> avec chaque scène
+                                                        const dates = selectedActrice.scenes
                                                             .map(scene => scene.date_ajout || scene.date_scene)
                                                             .filter(date => date)
                                                             .map(date => new Date(date));
@@ -226,6 +226,7 @@ const SyncDashboard = () => {
     const [randomVideo, setRandomVideo] = useState(null);
     const [loading, setLoading] = useState(false);
     const [scanning, setScanning] = useState(false);
+    const [scanProgress, setScanProgress] = useState(null);
     const [quickAddDialog, setQuickAddDialog] = useState(false);
     const [actrices, setActrices] = useState([]);
     const [actressAnalysis, setActressAnalysis] = useState(null);
@@ -255,16 +256,39 @@ const SyncDashboard = () => {
         loadActrices();
     }, []);
 
-    // Scanner le disque
+    // Scanner le disque : tâche de fond suivie en Server-Sent Events
+    // (les résultats partiels s'affichent avant la fin du scan)
     const handleScan = async () => {
         setScanning(true);
+        setScanProgress(null);
         try {
-            const response = await axios.post('http://127.0.0.1:5000/api/admin/scan-disk');
-            setScanData(response.data);
+            const response = await axios.post('http://127.0.0.1:5000/api/admin/jobs/scan-disk');
+            const events = new EventSource(`http://127.0.0.1:5000${response.data.events_url}`);
+
+            const applyJob = (job) => {
+                setScanProgress(job.progress);
+                if (job.result?.disk_stats) {
+                    setScanData(job.result);
+                }
+            };
+
+            events.addEventListener('progress', (event) => applyJob(JSON.parse(event.data)));
+            events.addEventListener('end', (event) => {
+                const job = JSON.parse(event.data);
+                applyJob(job);
+                events.close();
+                setScanning(false);
+                if (job.status === 'erreur') {
+                    alert('Erreur lors du scan: ' + job.error);
+                }
+            });
+            events.onerror = () => {
+                events.close();
+                setScanning(false);
+            };
         } catch (error) {
             console.error('Erreur scan:', error);
             alert('Erreur lors du scan: ' + (error.response?.data?.error || error.message));
-        } finally {
             setScanning(false);
         }
     };
@@ -375,7 +399,9 @@ const SyncDashboard = () => {
                         {scanning ? (
                             <>
                                 <CircularProgress size={20} sx={{ mr: 1, color: '#DAA520' }} />
-                                Scan en cours...
+                                {scanProgress?.phase === 'comparaison'
+                                    ? `Comparaison avec la base ${scanProgress?.scenes_verifiees || 0}/${scanProgress?.scenes_total ?? '?'} scènes (${scanProgress?.orphelines || 0} orphelines)...`
+                                    : `Scan ${scanProgress?.dossiers_faits || 0}/${scanProgress?.dossiers_a_relire ?? '?'} dossiers (${scanProgress?.videos_trouvees || 0} vidéos)...`}
                             </>
                         ) : (
                             'Scanner le Disque'
@@ -844,7 +870,7 @@ const SyncDashboard = () => {
                         </Grid>
                     )}
 
-                    {scanData.comparison.orphan_scenes.length > 0 && (
+                    {scanData.comparison.counts.orphan_scenes > 0 && (
                         <Grid size={{ xs: 12, md: 6 }}>
                             <Alert
                                 severity="error"
@@ -855,7 +881,7 @@ const SyncDashboard = () => {
                                 }}
                             >
                                 <Typography variant="subtitle2" sx={{ fontWeight: 600, mb: 1 }}>
-                                    🗂️ {scanData.comparison.orphan_scenes.length} Scènes orphelines
+                                    🗂️ {scanData.comparison.counts.orphan_scenes} Scènes orphelines
                                 </Typography>
                                 <Typography variant="caption" sx={{ color: '#F44336' }}>
                                     Fichiers en BDD mais introuvables sur disque
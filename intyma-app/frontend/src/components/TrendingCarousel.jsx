@@ -661,8 +661,6 @@ const TrendingCarousel = ({
     const [error, setError] = useState(null);
     const [currentIndex, setCurrentIndex] = useState(0);
     const [autoplay, setAutoplay] = useState(true);
-    const [favorites, setFavorites] = useState([]);
-    const [history, setHistory] = useState([]);
 
     const containerRef = useRef(null);
     const autoplayRef = useRef(null);
@@ -710,49 +708,19 @@ const TrendingCarousel = ({
                 setLoading(true);
                 setError(null);
 
-                // ✅ CORRECTION : Utiliser vos vraies APIs
-                const [scenesRes, favoritesRes, historyRes] = await Promise.all([
-                    axios.get(`${apiBaseUrl}/api/scenes`),
-                    axios.get(`${apiBaseUrl}/api/favorites`).catch(() => ({ data: [] })),
-                    axios.get(`${apiBaseUrl}/api/history`).catch(() => ({ data: [] }))
-                ]);
-
-                const scenesData = scenesRes.data;
-                const favoritesData = favoritesRes.data;
-                const historyData = historyRes.data;
-
-                setFavorites(favoritesData);
-                setHistory(historyData);
-
-                // ✅ CORRECTION : Calcul des vraies stats trending
-                let trendingScenes = scenesData.map(scene => {
-                    // Calculer les vraies stats
-                    const isFavorite = favoritesData.some(fav => fav.scene_id === scene.id);
-                    const historyEntry = historyData.find(hist => hist.scene_id === scene.id);
-                    const viewCount = historyEntry ? (historyEntry.nb_vues || 1) : 0;
-
-                    // Score trending basé sur des vraies métriques
-                    const noteScore = (parseFloat(scene.note_perso) || 0) * 200;
-                    const favoriteBonus = isFavorite ? 500 : 0;
-                    const viewBonus = viewCount * 100;
-                    const recentBonus = scene.date_ajout ?
-                        (new Date() - new Date(scene.date_ajout)) < 30 * 24 * 60 * 60 * 1000 ? 300 : 0 : 0;
-
-                    const trendingScore = noteScore + favoriteBonus + viewBonus + recentBonus;
-
-                    return {
-                        ...scene,
-                        viewCount: viewCount,
-                        likeCount: isFavorite ? 1 : 0,
-                        trendingScore: trendingScore,
-                        isFavorite: isFavorite,
-                        isInHistory: viewCount > 0
-                    };
+                // ✅ Score tendance calculé et indexé côté serveur
+                const trendingRes = await axios.get(`${apiBaseUrl}/api/scenes/trending`, {
+                    params: { limit: maxItems }
                 });
 
-                // Trier par score trending et garder les top
-                trendingScenes.sort((a, b) => b.trendingScore - a.trendingScore);
-                trendingScenes = trendingScenes.slice(0, maxItems);
+                const trendingScenes = trendingRes.data.map(scene => ({
+                    ...scene,
+                    viewCount: scene.nb_vues,
+                    likeCount: scene.is_favorite ? 1 : 0,
+                    trendingScore: scene.trending_score,
+                    isFavorite: scene.is_favorite,
+                    isInHistory: scene.nb_vues > 0
+                }));
 
                 setScenes(trendingScenes);
             } catch (err) {